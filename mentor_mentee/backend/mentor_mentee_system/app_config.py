@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class MentorMenteeSystemConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'mentor_mentee_system'
+
+    def ready(self):
+        from . import signals  # noqa: F401
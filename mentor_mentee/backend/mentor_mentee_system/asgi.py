@@ -2,6 +2,8 @@
 ASGI config for mentor_mentee_system project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+HTTP requests go to Django; WebSocket connections on ``/ws/`` receive
+real-time messages, read receipts and notifications (see realtime.py).
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
@@ -13,4 +15,16 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mentor_mentee_system.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Imported after Django is set up since it touches models and settings
+from mentor_mentee_system.realtime import WEBSOCKET_PATH, websocket_application  # noqa: E402
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'websocket':
+        if scope['path'] == WEBSOCKET_PATH:
+            return await websocket_application(scope, receive, send)
+        await receive()
+        return await send({'type': 'websocket.close'})
+    return await django_application(scope, receive, send)
@@ -0,0 +1,286 @@
+"""Attachment storage: resumable uploads and ranged downloads.
+
+An upload is created with its final size, then sent as any number of
+chunks, each a request body written at the current offset. Bodies are
+copied to the partial file COPY_BUFFER_SIZE bytes at a time, so memory use
+doesn't depend on the chunk size. A client that lost a connection asks for
+the offset and continues from there. Complete uploads become Attachments.
+
+Contents are stored once per SHA-256 as a Blob shared by every Attachment
+with the same bytes. A client that sends the hash when creating an upload
+of contents it already has an attachment of gets the new attachment at
+once and skips sending the bytes. Anyone else sends them, and they are
+hashed before the blob is shared: knowing a file's hash must not be enough
+to get its contents.
+"""
+import hashlib
+import os
+import re
+from datetime import timedelta
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.http import content_disposition_header
+from .models import Attachment, Blob, Upload
+
+COPY_BUFFER_SIZE = 64 * 1024
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class UploadOffsetMismatch(Exception):
+    """A chunk was sent for another offset than the one the upload is at"""
+
+    def __init__(self, offset):
+        super().__init__(f'Upload is at offset {offset}')
+        self.offset = offset
+
+
+def _part_path(upload):
+    return settings.ATTACHMENT_ROOT / 'uploads' / f'{upload.pk}.part'
+
+
+def attachment_path(attachment):
+    return settings.ATTACHMENT_ROOT / attachment.blob.path
+
+
+def blob_path(sha256):
+    """Storage path of a blob relative to ATTACHMENT_ROOT, fanned out by hash prefix"""
+    return os.path.join('blobs', sha256[:2], sha256[2:4], sha256)
+
+
+def hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for data in iter(lambda: f.read(COPY_BUFFER_SIZE), b''):
+            digest.update(data)
+    return digest.hexdigest()
+
+
+def write_chunk(upload_id, owner, offset, stream, length):
+    """Append length bytes read from stream to an upload at offset
+
+    Raises Upload.DoesNotExist for someone else's upload,
+    UploadOffsetMismatch when offset isn't where the upload stands and
+    ValueError for a chunk that is too large. Whatever arrived before the
+    stream ended is kept, so the client resumes from the returned upload's
+    offset.
+    """
+    if length > settings.ATTACHMENT_MAX_CHUNK_SIZE:
+        raise ValueError(f'Chunks may not exceed {settings.ATTACHMENT_MAX_CHUNK_SIZE} bytes')
+
+    with transaction.atomic():
+        # The row lock serialises concurrent chunks of the same upload
+        upload = Upload.objects.select_for_update().get(pk=upload_id, owner=owner)
+        if upload.status != Upload.Status.UPLOADING or offset != upload.offset:
+            raise UploadOffsetMismatch(upload.offset)
+        if offset + length > upload.size:
+            raise ValueError('Chunk goes past the declared upload size')
+
+        path = _part_path(upload)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'r+b' if path.exists() else 'wb') as part:
+            part.seek(offset)
+            # Drop bytes of an earlier attempt that were never acknowledged
+            part.truncate()
+            remaining = length
+            while remaining:
+                data = stream.read(min(COPY_BUFFER_SIZE, remaining))
+                if not data:
+                    break
+                part.write(data)
+                remaining -= len(data)
+
+        upload.offset = offset + length - remaining
+        if upload.offset == upload.size:
+            upload.attachment = _store(upload, path)
+            upload.status = Upload.Status.COMPLETE
+        upload.save(update_fields=['offset', 'status', 'attachment', 'updated_at'])
+    return upload
+
+
+def _store_blob(sha256, size, part_path):
+    """Return the locked Blob for sha256, moving part_path in if it is new
+
+    The row lock keeps collect_garbage from deleting the blob's file until
+    the caller's transaction has added its reference.
+    """
+    blob = Blob.objects.select_for_update().filter(sha256=sha256).first()
+    if blob is not None:
+        # Already stored; this copy isn't needed once the reference is saved
+        transaction.on_commit(lambda: os.remove(part_path))
+        return blob
+
+    relative_path = blob_path(sha256)
+    destination = settings.ATTACHMENT_ROOT / relative_path
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    os.replace(part_path, destination)
+    try:
+        with transaction.atomic():
+            return Blob.objects.create(sha256=sha256, size=size, path=relative_path)
+    except IntegrityError:
+        # Stored concurrently; the file we moved in has the same bytes
+        return Blob.objects.select_for_update().get(sha256=sha256)
+
+
+def _create_attachment(upload, blob):
+    return Attachment.objects.create(
+        owner_id=upload.owner_id,
+        blob=blob,
+        filename=upload.filename,
+        content_type=upload.content_type,
+        size=upload.size,
+    )
+
+
+def _store(upload, part_path):
+    """Record a finished upload as an Attachment of its content's Blob"""
+    sha256 = hash_file(part_path)
+    if upload.sha256 and upload.sha256 != sha256:
+        raise ValueError('Uploaded bytes do not match the announced sha256')
+    return _create_attachment(upload, _store_blob(sha256, upload.size, part_path))
+
+
+def complete_from_known_blob(upload):
+    """Finish an upload straight away if its owner already has an attachment
+    of a blob with the announced sha256 and size; returns whether it did"""
+    if not upload.sha256:
+        return False
+    with transaction.atomic():
+        blob = Blob.objects.select_for_update().filter(
+            sha256=upload.sha256,
+            size=upload.size,
+            attachments__owner_id=upload.owner_id,
+        ).first()
+        if blob is None:
+            return False
+        upload.attachment = _create_attachment(upload, blob)
+        upload.offset = upload.size
+        upload.status = Upload.Status.COMPLETE
+        upload.save(update_fields=['offset', 'status', 'attachment', 'updated_at'])
+    return True
+
+
+def collect_garbage(stale_upload_age=timedelta(days=7)):
+    """Delete unreferenced blobs and uploads abandoned for stale_upload_age
+
+    Returns (blobs removed, uploads removed).
+    """
+    blobs_removed = 0
+    for pk in list(Blob.objects.filter(ref_count=0).values_list('pk', flat=True)):
+        with transaction.atomic():
+            blob = Blob.objects.select_for_update().filter(pk=pk, ref_count=0).first()
+            if blob is None:
+                # Referenced again since it was listed
+                continue
+            referenced = blob.attachments.count()
+            if referenced:
+                # Counter drifted; repair it rather than lose the file
+                Blob.objects.filter(pk=pk).update(ref_count=referenced)
+                continue
+            try:
+                os.remove(settings.ATTACHMENT_ROOT / blob.path)
+            except FileNotFoundError:
+                pass
+            blob.delete()
+            blobs_removed += 1
+
+    stale = Upload.objects.filter(
+        status=Upload.Status.UPLOADING,
+        updated_at__lt=timezone.now() - stale_upload_age,
+    )
+    uploads_removed = 0
+    for upload in stale:
+        try:
+            os.remove(_part_path(upload))
+        except FileNotFoundError:
+            pass
+        upload.delete()
+        uploads_removed += 1
+    return blobs_removed, uploads_removed
+
+
+def can_access(user, attachment):
+    """Admins, the uploader and both ends of a communication carrying the
+    attachment may download it"""
+    if user.role == 'admin' or attachment.owner_id == user.pk:
+        return True
+    return attachment.communications.filter(Q(sender=user) | Q(receiver=user)).exists()
+
+
+def parse_range(header, size):
+    """Return the inclusive (start, end) byte range asked for by a Range header
+
+    None means the whole file is sent: no header, or one this server
+    doesn't serve partially (several ranges). Raises ValueError when the
+    range can't be satisfied.
+    """
+    match = RANGE_RE.match(header or '')
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if not length:
+            raise ValueError('Empty suffix range')
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError('Range not satisfiable')
+    return start, end
+
+
+def _read_range(path, start, length):
+    with open(path, 'rb') as f:
+        f.seek(start)
+        while length:
+            data = f.read(min(COPY_BUFFER_SIZE, length))
+            if not data:
+                return
+            length -= len(data)
+            yield data
+
+
+def download_response(attachment, range_header=None):
+    """Response serving an attachment, honouring a single-range Range header
+
+    Whole files go out as a FileResponse, which WSGI servers hand to
+    sendfile() through wsgi.file_wrapper; with
+    settings.ATTACHMENT_ACCEL_REDIRECT_PREFIX set, nginx serves the file
+    (ranges included) and Django only checks access.
+    """
+    disposition = content_disposition_header(True, attachment.filename)
+    if settings.ATTACHMENT_ACCEL_REDIRECT_PREFIX:
+        response = HttpResponse(content_type=attachment.content_type)
+        response['X-Accel-Redirect'] = settings.ATTACHMENT_ACCEL_REDIRECT_PREFIX + attachment.blob.path
+        response['Content-Disposition'] = disposition
+        return response
+
+    path = attachment_path(attachment)
+    try:
+        byte_range = parse_range(range_header, attachment.size)
+    except ValueError:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{attachment.size}'
+        return response
+
+    if byte_range is None:
+        response = FileResponse(open(path, 'rb'), content_type=attachment.content_type)
+    else:
+        start, end = byte_range
+        response = StreamingHttpResponse(
+            _read_range(path, start, end - start + 1),
+            status=206,
+            content_type=attachment.content_type,
+        )
+        response['Content-Length'] = end - start + 1
+        response['Content-Range'] = f'bytes {start}-{end}/{attachment.size}'
+    response['Accept-Ranges'] = 'bytes'
+    response['Content-Disposition'] = disposition
+    return response
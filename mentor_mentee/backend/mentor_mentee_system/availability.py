@@ -0,0 +1,275 @@
+"""Weekly availability as bitmaps of 15-minute slots.
+
+Bit weekday * SLOTS_PER_DAY + minute_of_day // SLOT_MINUTES is set when the
+person is available then, Monday 00:00 being bit 0, in the server time
+zone (settings.TIME_ZONE). A week fits in WEEK_BYTES bytes, stored in
+Mentor.availability and Mentee.availability; NULL means not known. Free and
+busy times of many people are combined with bitwise AND/OR on Python ints.
+"""
+import re
+from datetime import datetime, time, timedelta
+from django.db.models import Q
+from django.utils import timezone
+from .models import Mentor, Mentee
+from .scheduling import MAX_MEETING_DURATION, blocking_meetings, slot_end
+from .recurrence import blocking_occurrences
+
+SLOT_MINUTES = 15
+SLOTS_PER_DAY = 24 * 60 // SLOT_MINUTES
+WEEK_SLOTS = 7 * SLOTS_PER_DAY
+WEEK_BYTES = WEEK_SLOTS // 8
+FULL_WEEK = (1 << WEEK_SLOTS) - 1
+
+# Most users in one free/busy query
+MAX_FREE_BUSY_USERS = 200
+
+DAY_NAMES = ('monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday')
+DAY_GROUPS = {
+    'weekdays': range(5),
+    'weekends': range(5, 7),
+    'weekend': range(5, 7),
+    'daily': range(7),
+    'everyday': range(7),
+    'all week': range(7),
+}
+
+_TIME_RE = r'\d{1,2}(?:[:.]\d{2})?\s*(?:[ap]\.?m\.?)?|noon|midnight'
+_RANGE_RE = re.compile(rf'({_TIME_RE})\s*(?:-|–|to)\s*({_TIME_RE})', re.IGNORECASE)
+
+
+def to_bitmap(value):
+    """Bitmap int of a stored availability, None when not set"""
+    if value is None:
+        return None
+    return int.from_bytes(bytes(value), 'little')
+
+
+def to_bytes(bitmap):
+    return (bitmap & FULL_WEEK).to_bytes(WEEK_BYTES, 'little')
+
+
+def _runs(bitmap):
+    """(first slot, length) of each run of set bits, in order"""
+    slot = 0
+    while bitmap >> slot:
+        rest = bitmap >> slot
+        # Skip to the lowest set bit, then measure the run of ones from it
+        slot += (rest & -rest).bit_length() - 1
+        rest = bitmap >> slot
+        length = (~rest & (rest + 1)).bit_length() - 1
+        yield slot, length
+        slot += length
+
+
+def _time_of(slot):
+    minutes = slot % SLOTS_PER_DAY * SLOT_MINUTES
+    return time(minutes // 60, minutes % 60)
+
+
+def weekly_slots(bitmap):
+    """[(weekday, start, end)] of a bitmap, split at midnight; an end of
+    00:00 means the end of the day"""
+    slots = []
+    for first, length in _runs(bitmap):
+        last = first + length
+        while first < last:
+            day_end = (first // SLOTS_PER_DAY + 1) * SLOTS_PER_DAY
+            stop = min(last, day_end)
+            slots.append((first // SLOTS_PER_DAY, _time_of(first), _time_of(stop)))
+            first = stop
+    return slots
+
+
+def from_weekly_slots(slots):
+    bitmap = 0
+    for weekday, start, end in slots:
+        bitmap |= slot_range(weekday, start, end)
+    return bitmap
+
+
+def slot_range(weekday, start, end):
+    """Bitmap of weekday from time start up to time end (end of day if end
+    is midnight)"""
+    first = start.hour * 60 + start.minute
+    last = end.hour * 60 + end.minute or 24 * 60
+    first_slot = weekday * SLOTS_PER_DAY + first // SLOT_MINUTES
+    last_slot = weekday * SLOTS_PER_DAY + -(-last // SLOT_MINUTES)
+    if last_slot <= first_slot:
+        return 0
+    return ((1 << (last_slot - first_slot)) - 1) << first_slot
+
+
+def _parse_time(text):
+    # Dots of a.m./p.m. go; the one in 9.30 separates hours from minutes
+    text = re.sub(r'([ap])\.?m\.?$', r'\1m', text.lower().replace(' ', ''))
+    if text == 'noon':
+        return time(12, 0)
+    if text == 'midnight':
+        return time(0, 0)
+    match = re.fullmatch(r'(\d{1,2})(?::(\d{2}))?([ap]m)?', text.replace('.', ':'))
+    if not match:
+        raise ValueError(text)
+    hour, minute, meridiem = int(match.group(1)), int(match.group(2) or 0), match.group(3)
+    if meridiem:
+        if not 1 <= hour <= 12:
+            raise ValueError(text)
+        hour = hour % 12 + (12 if meridiem == 'pm' else 0)
+    return time(hour, minute)
+
+
+def _day_index(token):
+    token = token.strip().rstrip('.').lower()
+    for index, name in enumerate(DAY_NAMES):
+        if len(token) >= 3 and name.startswith(token):
+            return index
+    raise ValueError(token)
+
+
+def _parse_days(text):
+    text = text.strip().lower()
+    if text in DAY_GROUPS:
+        return set(DAY_GROUPS[text])
+    days = set()
+    for part in re.split(r',|&|\band\b|/', text):
+        part = part.strip()
+        if not part:
+            continue
+        bounds = re.split(r'\s*(?:-|–|to)\s*', part)
+        if len(bounds) == 2:
+            first, last = _day_index(bounds[0]), _day_index(bounds[1])
+            days.update(day % 7 for day in range(first, first + (last - first) % 7 + 1))
+        else:
+            days.add(_day_index(part))
+    return days
+
+
+def parse_timetable(text):
+    """Bitmap of a free-text timetable, or None if it can't be understood
+
+    Understands lines or ';'-separated entries such as
+    "Monday-Friday: 10 AM - 4 PM", "Mon, Wed 9:30am-12pm, 2pm-4pm" or
+    "Weekdays: 14:00 - 16:00".
+    """
+    if not text or not text.strip():
+        return None
+    bitmap = 0
+    for entry in re.split(r'[;\n]+', text):
+        entry = entry.strip()
+        if not entry:
+            continue
+        first_range = _RANGE_RE.search(entry)
+        if first_range is None:
+            return None
+        day_text = entry[:first_range.start()].strip().rstrip(':').strip()
+        if re.search(r'\d', day_text):
+            return None
+        try:
+            days = _parse_days(day_text) if day_text else set(range(7))
+            for match in _RANGE_RE.finditer(entry):
+                start, end = _parse_time(match.group(1)), _parse_time(match.group(2))
+                for day in days:
+                    bitmap |= slot_range(day, start, end)
+        except ValueError:
+            return None
+    return bitmap or None
+
+
+def _slot_index(moment):
+    moment = timezone.localtime(moment)
+    return moment.weekday() * SLOTS_PER_DAY + (moment.hour * 60 + moment.minute) // SLOT_MINUTES
+
+
+def interval_mask(start, end, week_start):
+    """Bitmap of the slots touched by [start, end) within the week beginning
+    at the aware datetime week_start"""
+    week_end = week_start + timedelta(days=7)
+    start, end = max(start, week_start), min(end, week_end)
+    if start >= end:
+        return 0
+    first = _slot_index(start)
+    last = WEEK_SLOTS if end == week_end else _slot_index(end - timedelta(microseconds=1)) + 1
+    return ((1 << (last - first)) - 1) << first
+
+
+def week_start_of(day):
+    """Aware Monday 00:00 of the week containing the date day"""
+    return timezone.make_aware(datetime.combine(day - timedelta(days=day.weekday()), time.min))
+
+
+def meeting_mask(start, duration):
+    """Weekly bitmap of the slots a meeting touches; one running past Sunday
+    midnight wraps to the start of the week"""
+    week_start = week_start_of(timezone.localtime(start).date())
+    end = slot_end(start, duration)
+    mask = 0
+    while week_start < end:
+        mask |= interval_mask(start, end, week_start)
+        week_start += timedelta(days=7)
+    return mask
+
+
+def is_available(bitmap, start, duration):
+    """Whether every slot of a meeting falls inside a weekly availability
+    bitmap; None (unknown availability) allows anything"""
+    if bitmap is None:
+        return True
+    mask = meeting_mask(start, duration)
+    return bitmap & mask == mask
+
+
+def load_availability(user_ids):
+    """{user_id: bitmap or None} read from the Mentor and Mentee profiles"""
+    availability = dict.fromkeys(user_ids)
+    for model in (Mentor, Mentee):
+        for user_id, value in model.objects.filter(user_id__in=user_ids).values_list('user_id', 'availability'):
+            availability[user_id] = to_bitmap(value)
+    return availability
+
+
+def busy_bitmaps(user_ids, week_start):
+    """{user_id: bitmap of slots taken by pending or accepted meetings} for
+    the week beginning at week_start, from one query plus the occurrences
+    of recurring meetings"""
+    busy = dict.fromkeys(user_ids, 0)
+    rows = blocking_meetings().filter(
+        Q(mentor_id__in=user_ids) | Q(mentee_id__in=user_ids),
+        scheduled_at__gt=week_start - timedelta(minutes=MAX_MEETING_DURATION),
+        scheduled_at__lt=week_start + timedelta(days=7),
+    ).values_list('mentor_id', 'mentee_id', 'scheduled_at', 'duration')
+    occurrences = blocking_occurrences(user_ids, week_start, week_start + timedelta(days=7))
+    for mentor_id, mentee_id, scheduled_at, duration in [*rows, *occurrences]:
+        mask = interval_mask(scheduled_at, slot_end(scheduled_at, duration), week_start)
+        for user_id in (mentor_id, mentee_id):
+            if user_id in busy:
+                busy[user_id] |= mask
+    return busy
+
+
+def to_intervals(bitmap, week_start):
+    """[{start, end}] datetimes of the runs of set bits in a week bitmap"""
+    return [
+        {
+            'start': week_start + timedelta(minutes=first * SLOT_MINUTES),
+            'end': week_start + timedelta(minutes=(first + length) * SLOT_MINUTES),
+        }
+        for first, length in _runs(bitmap)
+    ]
+
+
+def free_busy(user_ids, week_start):
+    """Availability, busy and free slots of each user for one week, plus the
+    slots free for all of them; unknown availability counts as always available"""
+    availability = load_availability(user_ids)
+    busy = busy_bitmaps(user_ids, week_start)
+    common = FULL_WEEK
+    users = {}
+    for user_id in user_ids:
+        available = FULL_WEEK if availability[user_id] is None else availability[user_id]
+        free = available & ~busy[user_id] & FULL_WEEK
+        common &= free
+        users[user_id] = {
+            'availability_known': availability[user_id] is not None,
+            'busy': to_intervals(busy[user_id], week_start),
+            'free': to_intervals(free, week_start),
+        }
+    return {'users': users, 'common_free': to_intervals(common, week_start)}
@@ -0,0 +1,131 @@
+from datetime import timedelta
+from django.db import connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from .models import User, Communication, BroadcastJob
+
+# A running job whose worker has not reported for this long is picked up again
+DEFAULT_STALE_AFTER = timedelta(minutes=5)
+
+
+def get_recipients(job):
+    """Users a broadcast job fans out to, in the order they are processed"""
+    recipients = User.objects.filter(role='mentee')
+    if job.audience == BroadcastJob.Audience.DEPARTMENT:
+        recipients = recipients.filter(mentee__mentor__department=job.department)
+    else:
+        recipients = recipients.filter(mentee__mentor__user_id=job.sender_id)
+    return recipients.exclude(pk=job.sender_id).order_by('pk')
+
+
+def enqueue_broadcast(sender, message_content, audience=BroadcastJob.Audience.MY_MENTEES,
+                      department=None, attached_file=None, attachment=None, chunk_size=None):
+    """Record a broadcast for the worker; nothing is fanned out here"""
+    job = BroadcastJob(
+        sender=sender,
+        message_content=message_content,
+        attached_file=attached_file,
+        attachment=attachment,
+        audience=audience,
+        department=department,
+    )
+    if chunk_size:
+        job.chunk_size = chunk_size
+    job.total_recipients = get_recipients(job).count()
+    job.save()
+    return job
+
+
+def claim_job(worker_id, stale_after=DEFAULT_STALE_AFTER):
+    """Lock the oldest pending job, or a running job whose worker died
+
+    Returns the claimed job or None. Workers skip rows locked by each other
+    where the database supports it.
+    """
+    stale_before = timezone.now() - stale_after
+    lock_kwargs = {}
+    if connection.features.has_select_for_update_skip_locked:
+        lock_kwargs['skip_locked'] = True
+
+    with transaction.atomic():
+        job = (
+            BroadcastJob.objects.select_for_update(**lock_kwargs)
+            .filter(
+                Q(status=BroadcastJob.Status.PENDING)
+                | Q(status=BroadcastJob.Status.RUNNING, heartbeat_at__lt=stale_before)
+            )
+            .order_by('pk')
+            .first()
+        )
+        if job is None:
+            return None
+        job.status = BroadcastJob.Status.RUNNING
+        job.locked_by = worker_id
+        job.heartbeat_at = timezone.now()
+        job.save(update_fields=['status', 'locked_by', 'heartbeat_at'])
+    return job
+
+
+def process_chunk(job, worker_id):
+    """Fan out the next chunk of a claimed job
+
+    The Communication rows and the job's progress are written in the same
+    transaction, so a worker dying mid-broadcast never duplicates or skips
+    recipients when the job is resumed. Returns the number of recipients
+    written, 0 once the job is finished and None if the job was taken over
+    by another worker.
+    """
+    with transaction.atomic():
+        job = BroadcastJob.objects.select_for_update().get(pk=job.pk)
+        if job.locked_by != worker_id or job.status != BroadcastJob.Status.RUNNING:
+            return None
+
+        recipient_ids = list(
+            get_recipients(job)
+            .filter(pk__gt=job.last_recipient_id)
+            .values_list('pk', flat=True)[:job.chunk_size]
+        )
+        now = timezone.now()
+        if not recipient_ids:
+            BroadcastJob.objects.filter(pk=job.pk).update(
+                status=BroadcastJob.Status.COMPLETED,
+                locked_by=None,
+                heartbeat_at=now,
+                finished_at=now,
+            )
+            return 0
+
+        Communication.objects.bulk_create([
+            Communication(
+                sender_id=job.sender_id,
+                receiver_id=recipient_id,
+                message_content=job.message_content,
+                attached_file=job.attached_file,
+                attachment_id=job.attachment_id,
+                type='broadcast',
+            )
+            for recipient_id in recipient_ids
+        ])
+        BroadcastJob.objects.filter(pk=job.pk).update(
+            last_recipient_id=recipient_ids[-1],
+            processed_recipients=F('processed_recipients') + len(recipient_ids),
+            heartbeat_at=now,
+        )
+    return len(recipient_ids)
+
+
+def run_job(job, worker_id):
+    """Process a claimed job chunk by chunk until it is done"""
+    try:
+        while True:
+            written = process_chunk(job, worker_id)
+            if not written:
+                return
+    except Exception as e:
+        BroadcastJob.objects.filter(pk=job.pk, locked_by=worker_id).update(
+            status=BroadcastJob.Status.FAILED,
+            locked_by=None,
+            error=str(e),
+            finished_at=timezone.now(),
+        )
+        raise
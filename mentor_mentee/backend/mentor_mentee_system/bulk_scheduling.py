@@ -0,0 +1,181 @@
+"""Schedule a round of one-on-one meetings between a mentor and all mentees.
+
+Existing meetings of everyone involved are read with one range query, slots
+are assigned in memory, and the new meetings are written with a single
+bulk_create. Slots outside the weekly availability of the mentor or a
+mentee are skipped for them. The side effects signals would have handled
+for each save (mentor stats, dashboard and calendar caches, notifications)
+are applied once for the batch.
+"""
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from datetime import datetime, timedelta
+from django.db import connection, transaction
+from django.db.models import Max, Q
+from django.utils import timezone
+from .models import User, Mentee, Meeting, Notification
+from .scheduling import MAX_MEETING_DURATION, blocking_meetings, slot_end
+from .availability import load_availability, meeting_mask
+from .recurrence import blocking_occurrences
+from .stats import adjust_mentor_stats_for_user
+from .dashboard import invalidate_mentor_dashboards
+from .calendar_feed import invalidate_calendar_feeds
+from .notifications import notify_many
+
+
+class BusyTimes:
+    """Blocked intervals per user: meetings loaded with one query, plus
+    unstored occurrences of recurring meetings"""
+
+    def __init__(self, user_ids, start, end):
+        self.lookback = timedelta(minutes=MAX_MEETING_DURATION)
+        intervals = defaultdict(list)
+        rows = blocking_meetings().filter(
+            Q(mentor_id__in=user_ids) | Q(mentee_id__in=user_ids),
+            scheduled_at__gt=start - self.lookback,
+            scheduled_at__lt=end,
+        ).values_list('mentor_id', 'mentee_id', 'scheduled_at', 'duration')
+        for mentor_id, mentee_id, scheduled_at, duration in [*rows, *blocking_occurrences(user_ids, start, end)]:
+            for user_id in {mentor_id, mentee_id}:
+                intervals[user_id].append((scheduled_at, slot_end(scheduled_at, duration)))
+        for busy in intervals.values():
+            busy.sort()
+        self.intervals = dict(intervals)
+        self.starts = {user_id: [start for start, _ in busy] for user_id, busy in self.intervals.items()}
+
+    def is_free(self, user_id, start, end):
+        busy = self.intervals.get(user_id)
+        if not busy:
+            return True
+        starts = self.starts[user_id]
+        first = bisect_right(starts, start - self.lookback)
+        last = bisect_left(starts, end)
+        return all(busy_end <= start for _, busy_end in busy[first:last])
+
+
+def candidate_slots(start_date, end_date, duration, day_start, day_end, weekdays):
+    """Back-to-back slots of duration minutes within the daily window, from
+    now on, in time order"""
+    step = timedelta(minutes=duration)
+    now = timezone.now()
+    day = start_date
+    while day <= end_date:
+        if day.weekday() in weekdays:
+            slot = timezone.make_aware(datetime.combine(day, day_start))
+            window_end = timezone.make_aware(datetime.combine(day, day_end))
+            while slot + step <= window_end:
+                if slot >= now:
+                    yield slot
+                slot += step
+        day += timedelta(days=1)
+
+
+def plan_round(mentor_user_id, mentee_user_ids, slots, duration, busy, availability=None):
+    """Assign each mentee the earliest slot free for both and inside both
+    availabilities ({user_id: bitmap or None}); returns
+    ([(mentee_user_id, start)], unscheduled mentee user ids)"""
+    availability = {
+        user_id: bitmap for user_id, bitmap in (availability or {}).items() if bitmap is not None
+    }
+    waiting = list(mentee_user_ids)
+    planned = []
+    for start in slots:
+        if not waiting:
+            break
+        end = slot_end(start, duration)
+        mask = meeting_mask(start, duration) if availability else 0
+
+        def available(user_id):
+            bitmap = availability.get(user_id)
+            return bitmap is None or bitmap & mask == mask
+
+        if not available(mentor_user_id) or not busy.is_free(mentor_user_id, start, end):
+            continue
+        for index, mentee_user_id in enumerate(waiting):
+            if available(mentee_user_id) and busy.is_free(mentee_user_id, start, end):
+                planned.append((mentee_user_id, start))
+                del waiting[index]
+                break
+    return planned, waiting
+
+
+def bulk_create_meetings(meetings):
+    """bulk_create meetings and return them with their ids
+
+    MySQL doesn't report the ids of bulk inserted rows, so there they are
+    read back: rows added after the latest id seen before the insert that
+    match a (mentor, mentee, scheduled_at) of the batch.
+    """
+    if not meetings:
+        return []
+    if connection.features.can_return_rows_from_bulk_insert:
+        return Meeting.objects.bulk_create(meetings)
+    last_pk = Meeting.objects.aggregate(last=Max('pk'))['last'] or 0
+    Meeting.objects.bulk_create(meetings)
+    keys = {(meeting.mentor_id, meeting.mentee_id, meeting.scheduled_at) for meeting in meetings}
+    created = Meeting.objects.filter(
+        pk__gt=last_pk,
+        mentor_id__in={key[0] for key in keys},
+        mentee_id__in={key[1] for key in keys},
+        scheduled_at__in={key[2] for key in keys},
+    ).order_by('scheduled_at', 'pk')
+    return [meeting for meeting in created if (meeting.mentor_id, meeting.mentee_id, meeting.scheduled_at) in keys]
+
+
+def schedule_round(mentor_user, start_date, end_date, duration, day_start, day_end,
+                   weekdays=range(5), title='One-on-one', skip_scheduled=True):
+    """Book a pending meeting for every mentee of mentor_user in the range
+
+    Mentees that already have a pending or accepted meeting with the mentor
+    in the range are skipped when skip_scheduled is set. Returns
+    (created meetings, user ids of mentees no free slot was found for).
+    """
+    range_start = timezone.make_aware(datetime.combine(start_date, day_start))
+    range_end = timezone.make_aware(datetime.combine(end_date, day_end))
+
+    with transaction.atomic():
+        # Lock the mentor so concurrent bookings wait for this round
+        User.objects.select_for_update().get(pk=mentor_user.pk)
+        mentee_user_ids = list(
+            Mentee.objects.filter(mentor__user=mentor_user).order_by('user_id').values_list('user_id', flat=True)
+        )
+        if skip_scheduled:
+            already = set(
+                blocking_meetings().filter(
+                    mentor=mentor_user,
+                    mentee_id__in=mentee_user_ids,
+                    scheduled_at__gte=range_start,
+                    scheduled_at__lt=range_end,
+                ).values_list('mentee_id', flat=True)
+            )
+            mentee_user_ids = [user_id for user_id in mentee_user_ids if user_id not in already]
+        if not mentee_user_ids:
+            return [], []
+
+        user_ids = [mentor_user.pk, *mentee_user_ids]
+        busy = BusyTimes(user_ids, range_start, range_end)
+        planned, unscheduled = plan_round(
+            mentor_user.pk, mentee_user_ids,
+            candidate_slots(start_date, end_date, duration, day_start, day_end, set(weekdays)),
+            duration, busy, load_availability(user_ids),
+        )
+        meetings = [
+            Meeting(mentor=mentor_user, mentee_id=mentee_user_id, title=title,
+                    scheduled_at=start, duration=duration)
+            for mentee_user_id, start in planned
+        ]
+        meetings = bulk_create_meetings(meetings)
+
+        adjust_mentor_stats_for_user(mentor_user.pk, upcoming_meetings=len(meetings))
+        notify_many([
+            Notification(
+                user_id=meeting.mentee_id,
+                notification_type=Notification.MEETING,
+                title=title,
+                message=f"Meeting scheduled for {timezone.localtime(meeting.scheduled_at):%Y-%m-%d %H:%M}",
+            )
+            for meeting in meetings
+        ])
+    invalidate_mentor_dashboards([mentor_user.pk])
+    invalidate_calendar_feeds([mentor_user.pk, *(meeting.mentee_id for meeting in meetings)])
+    return meetings, unscheduled
@@ -0,0 +1,11 @@
+from django.core.cache import cache
+
+
+def incr_counter(key):
+    """Increment a counter that may not exist yet (or was evicted)"""
+    cache.add(key, 0, timeout=None)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, timeout=None)
+        return 1
@@ -0,0 +1,249 @@
+"""iCalendar (RFC 5545) feeds of a user's meetings, one per User.calendar_id.
+
+Calendar apps poll feeds every few minutes, so the rendered feed is cached
+per user together with its ETag and Last-Modified, under a generation
+number bumped whenever one of the user's meetings or series changes (same
+scheme as the dashboard cache). A poll is then one indexed lookup of the
+calendar id and one cache read, and usually ends in a 304.
+
+The body only depends on the rows it is built from (DTSTAMP is the row's
+updated_at) and the current year, so a rebuild after expiry yields the same
+ETag. Recurring series are sent as one event with an RRULE and EXDATEs;
+stored occurrences override it by RECURRENCE-ID. Series times are in the
+server's time zone, described by a VTIMEZONE, or in UTC when that is the
+zone.
+"""
+import hashlib
+from datetime import datetime, timedelta
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from .models import Meeting, MeetingSeries
+from .cache_utils import incr_counter
+from .recurrence import exdates
+
+CALENDAR_CACHE_KEY = 'calendar:{user_id}:{generation}'
+CALENDAR_GENERATION_KEY = 'calendar:{user_id}:generation'
+# When the user's meetings last changed, for Last-Modified after deletions
+CALENDAR_CHANGED_KEY = 'calendar:{user_id}:changed'
+
+PRODID = '-//Mentor-Mentee System//Meetings//EN'
+
+STATUS = {
+    Meeting.Status.PENDING: 'TENTATIVE',
+    Meeting.Status.ACCEPTED: 'CONFIRMED',
+    Meeting.Status.COMPLETED: 'CONFIRMED',
+    Meeting.Status.REJECTED: 'CANCELLED',
+    Meeting.Status.EXPIRED: 'CANCELLED',
+}
+
+RRULES = {
+    MeetingSeries.Frequency.WEEKLY: 'FREQ=WEEKLY',
+    MeetingSeries.Frequency.BIWEEKLY: 'FREQ=WEEKLY;INTERVAL=2',
+    MeetingSeries.Frequency.MONTHLY: 'FREQ=MONTHLY',
+}
+
+
+def _escape(text):
+    return (text or '').replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,') \
+        .replace('\r\n', '\\n').replace('\n', '\\n')
+
+
+def _fold(line):
+    """Split a content line into 75-octet pieces, continuation lines
+    starting with a space"""
+    data = line.encode()
+    if len(data) <= 75:
+        return line
+    pieces = []
+    while data:
+        size = 75 if not pieces else 74
+        # Don't cut a UTF-8 sequence in half
+        while size < len(data) and (data[size] & 0xC0) == 0x80:
+            size -= 1
+        pieces.append(data[:size].decode())
+        data = data[size:]
+    return '\r\n '.join(pieces)
+
+
+def _utc(moment):
+    return moment.astimezone(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def _local(name, moment):
+    """A local-time property; series repeat on the server's wall clock"""
+    if settings.TIME_ZONE == 'UTC':
+        return f'{name}:{_utc(moment)}'
+    return f'{name};TZID={settings.TIME_ZONE}:{timezone.localtime(moment):%Y%m%dT%H%M%S}'
+
+
+def _offset(delta):
+    minutes = int(delta.total_seconds()) // 60
+    return f'{"-" if minutes < 0 else "+"}{abs(minutes) // 60:02d}{abs(minutes) % 60:02d}'
+
+
+def _transitions(zone, start, end):
+    """(moment, offset before, offset after) of each change of the zone's UTC
+    offset between two UTC moments"""
+    moment = start
+    offset = moment.astimezone(zone).utcoffset()
+    while moment < end:
+        following = moment + timedelta(days=1)
+        following_offset = following.astimezone(zone).utcoffset()
+        if following_offset != offset:
+            # Offsets change on a whole minute; find it
+            low, high = 0, 24 * 60
+            while high - low > 1:
+                middle = (low + high) // 2
+                if (moment + timedelta(minutes=middle)).astimezone(zone).utcoffset() == offset:
+                    low = middle
+                else:
+                    high = middle
+            yield moment + timedelta(minutes=high), offset, following_offset
+            offset = following_offset
+        moment = following
+
+
+def _vtimezone(first_year, last_year):
+    """VTIMEZONE of the server's time zone, with the offsets it used from the
+    start of first_year to the end of last_year"""
+    zone = timezone.get_default_timezone()
+    start = datetime(first_year, 1, 1, tzinfo=timezone.utc)
+    end = datetime(last_year + 1, 1, 1, tzinfo=timezone.utc)
+    offset = start.astimezone(zone).utcoffset()
+    observances = [(start, offset, offset), *_transitions(zone, start, end)]
+    lines = ['BEGIN:VTIMEZONE', f'TZID:{settings.TIME_ZONE}']
+    for moment, offset_from, offset_to in observances:
+        local = moment.astimezone(zone)
+        kind = 'DAYLIGHT' if local.dst() else 'STANDARD'
+        lines += [
+            f'BEGIN:{kind}',
+            f'DTSTART:{moment + offset_from:%Y%m%dT%H%M%S}',
+            f'TZOFFSETFROM:{_offset(offset_from)}',
+            f'TZOFFSETTO:{_offset(offset_to)}',
+            f'TZNAME:{local.tzname()}',
+            f'END:{kind}',
+        ]
+    lines.append('END:VTIMEZONE')
+    return lines
+
+
+def _event(uid, item, status, properties):
+    """VEVENT lines of a meeting or series; properties hold its timing"""
+    lines = [
+        'BEGIN:VEVENT',
+        f'UID:{uid}',
+        f'DTSTAMP:{_utc(item.updated_at)}',
+        *properties,
+        f'SUMMARY:{_escape(item.title)}',
+        f'STATUS:{STATUS[status]}',
+    ]
+    if item.description:
+        lines.append(f'DESCRIPTION:{_escape(item.description)}')
+    lines.append('END:VEVENT')
+    return lines
+
+
+def _meeting_timing(meeting):
+    end = meeting.scheduled_at + timedelta(minutes=meeting.duration)
+    return [f'DTSTART:{_utc(meeting.scheduled_at)}', f'DTEND:{_utc(end)}']
+
+
+def _series_event(series):
+    rule = RRULES[series.frequency]
+    if series.count:
+        rule += f';COUNT={series.count}'
+    elif series.until:
+        rule += f';UNTIL={_utc(series.until)}'
+    properties = [
+        _local('DTSTART', series.start_at),
+        _local('DTEND', series.start_at + timedelta(minutes=series.duration)),
+        f'RRULE:{rule}',
+        *(_local('EXDATE', moment) for moment in sorted(exdates(series))),
+    ]
+    return _event(_series_uid(series.pk), series, series.status, properties)
+
+
+def _series_uid(series_id):
+    return f'series-{series_id}@mentor-mentee'
+
+
+def build_feed(user):
+    """(body, last modified) of the user's calendar
+
+    Has meetings from CALENDAR_FEED_PAST_DAYS ago on and every series still
+    running then; rejected meetings are left out.
+    """
+    since = timezone.now() - timedelta(days=settings.CALENDAR_FEED_PAST_DAYS)
+    participant = Q(mentor=user) | Q(mentee=user)
+    series_list = list(
+        MeetingSeries.objects.filter(participant, Q(until__isnull=True) | Q(until__gte=since))
+        .exclude(status=Meeting.Status.REJECTED).order_by('pk')
+    )
+    series_ids = {series.pk for series in series_list}
+    meetings = Meeting.objects.filter(participant, scheduled_at__gte=since).order_by('scheduled_at', 'pk')
+
+    lines = ['BEGIN:VCALENDAR', 'VERSION:2.0', f'PRODID:{PRODID}', 'CALSCALE:GREGORIAN']
+    if series_list and settings.TIME_ZONE != 'UTC':
+        # Series run on for years, so the zone goes as far as they can be seen
+        last = max([timezone.now(), *(series.until for series in series_list if series.until)])
+        lines += _vtimezone(
+            min(timezone.localtime(series.start_at).year for series in series_list),
+            timezone.localtime(last).year + settings.CALENDAR_FEED_TIMEZONE_YEARS
+        )
+    stamps = [series.updated_at for series in series_list]
+    for series in series_list:
+        lines += _series_event(series)
+    for meeting in meetings:
+        if meeting.series_id in series_ids and meeting.occurrence_start:
+            # A changed occurrence replaces the one computed from the rule
+            lines += _event(
+                _series_uid(meeting.series_id), meeting, meeting.status,
+                [_local('RECURRENCE-ID', meeting.occurrence_start), *_meeting_timing(meeting)]
+            )
+        elif meeting.status != Meeting.Status.REJECTED:
+            lines += _event(
+                f'meeting-{meeting.pk}@mentor-mentee', meeting, meeting.status, _meeting_timing(meeting)
+            )
+        else:
+            continue
+        stamps.append(meeting.updated_at)
+    lines.append('END:VCALENDAR')
+    return ''.join(_fold(line) + '\r\n' for line in lines), max(stamps, default=None)
+
+
+def get_cached_feed(user):
+    """{'body', 'etag', 'last_modified'} of the user's feed, building it on a miss"""
+    generation = cache.get(CALENDAR_GENERATION_KEY.format(user_id=user.pk), 0)
+    key = CALENDAR_CACHE_KEY.format(user_id=user.pk, generation=generation)
+    feed = cache.get(key)
+    if feed is not None:
+        return feed
+
+    body, last_modified = build_feed(user)
+    changed = cache.get(CALENDAR_CHANGED_KEY.format(user_id=user.pk))
+    feed = {
+        'body': body,
+        'etag': '"%s"' % hashlib.sha256(body.encode()).hexdigest()[:32],
+        'last_modified': max(filter(None, (last_modified, changed)), default=None),
+    }
+    cache.set(key, feed, settings.CALENDAR_FEED_CACHE_TIMEOUT)
+    return feed
+
+
+def invalidate_calendar_feeds(user_ids):
+    """Drop the cached feeds of the given users once the current transaction
+    commits"""
+    user_ids = {user_id for user_id in user_ids if user_id}
+    if not user_ids:
+        return
+
+    def bump():
+        now = timezone.now()
+        for user_id in user_ids:
+            cache.set(CALENDAR_CHANGED_KEY.format(user_id=user_id), now, timeout=None)
+            incr_counter(CALENDAR_GENERATION_KEY.format(user_id=user_id))
+
+    transaction.on_commit(bump)
@@ -0,0 +1,118 @@
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Max, Q
+from .models import Conversation, Message
+
+
+def _pair(user_a_id, user_b_id):
+    return (user_a_id, user_b_id) if user_a_id < user_b_id else (user_b_id, user_a_id)
+
+
+def _unread_field(low, receiver_id):
+    return 'unread_low' if receiver_id == low else 'unread_high'
+
+
+def record_message(message):
+    """Move a new message to the top of its conversation"""
+    low, high = _pair(message.sender_id, message.receiver_id)
+    values = {
+        'last_message': message,
+        'last_activity_at': message.created_at,
+    }
+    unread_field = None
+    if not message.is_read and message.sender_id != message.receiver_id:
+        unread_field = _unread_field(low, message.receiver_id)
+
+    changes = dict(values)
+    if unread_field:
+        changes[unread_field] = F(unread_field) + 1
+
+    conversations = Conversation.objects.filter(user_low_id=low, user_high_id=high)
+    if conversations.update(**changes):
+        return
+    if unread_field:
+        values[unread_field] = 1
+    try:
+        with transaction.atomic():
+            Conversation.objects.create(user_low_id=low, user_high_id=high, **values)
+    except IntegrityError:
+        # The first message of this pair was recorded concurrently
+        conversations.update(**changes)
+
+
+def adjust_conversation_unread(message, delta):
+    """Add delta to the receiver's unread count in the message's conversation"""
+    if message.sender_id == message.receiver_id:
+        return
+    low, high = _pair(message.sender_id, message.receiver_id)
+    field = _unread_field(low, message.receiver_id)
+    Conversation.objects.filter(user_low_id=low, user_high_id=high).update(
+        **{field: F(field) + delta}
+    )
+
+
+def refresh_last_message(user_a_id, user_b_id):
+    """Point a conversation back at its newest message after a delete"""
+    low, high = _pair(user_a_id, user_b_id)
+    pair = Message.objects.order_by('-created_at', '-pk')
+    candidates = [
+        pair.filter(sender_id=low, receiver_id=high).first(),
+        pair.filter(sender_id=high, receiver_id=low).first(),
+    ]
+    candidates = [message for message in candidates if message is not None]
+    conversations = Conversation.objects.filter(user_low_id=low, user_high_id=high)
+    if not candidates:
+        conversations.delete()
+        return
+    latest = max(candidates, key=lambda message: (message.created_at, message.pk))
+    conversations.update(last_message=latest, last_activity_at=latest.created_at)
+
+
+def forget_message(message, was_unread):
+    """Update the conversation of a deleted message"""
+    if was_unread:
+        adjust_conversation_unread(message, -1)
+    low, high = _pair(message.sender_id, message.receiver_id)
+    # Deleting the newest message nulls the pointer (on_delete=SET_NULL)
+    if Conversation.objects.filter(user_low_id=low, user_high_id=high, last_message__isnull=True).exists():
+        refresh_last_message(low, high)
+
+
+def rebuild_conversations():
+    """Recreate every Conversation from the messages table
+
+    Meant for the initial backfill and for drift repair; it groups the
+    whole table once, which is exactly what the Conversation rows avoid on
+    the read path. Returns the number of conversations written.
+    """
+    conversations = {}
+    directions = (
+        Message.objects.order_by()
+        .values('sender_id', 'receiver_id')
+        .annotate(last_id=Max('pk'), unread=Count('pk', filter=Q(is_read=False)))
+    )
+    for direction in directions.iterator():
+        low, high = _pair(direction['sender_id'], direction['receiver_id'])
+        entry = conversations.setdefault((low, high), {'last_ids': [], 'unread_low': 0, 'unread_high': 0})
+        entry['last_ids'].append(direction['last_id'])
+        if direction['sender_id'] != direction['receiver_id']:
+            entry[_unread_field(low, direction['receiver_id'])] += direction['unread']
+
+    last_ids = [last_id for entry in conversations.values() for last_id in entry['last_ids']]
+    created = dict(Message.objects.filter(pk__in=last_ids).values_list('pk', 'created_at'))
+
+    rows = []
+    for (low, high), entry in conversations.items():
+        last_id = max(entry['last_ids'], key=lambda pk: (created[pk], pk))
+        rows.append(Conversation(
+            user_low_id=low,
+            user_high_id=high,
+            last_message_id=last_id,
+            last_activity_at=created[last_id],
+            unread_low=entry['unread_low'],
+            unread_high=entry['unread_high'],
+        ))
+
+    with transaction.atomic():
+        Conversation.objects.all().delete()
+        Conversation.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
@@ -0,0 +1,306 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Avg, Count, OuterRef
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from datetime import timedelta
+from .models import Mentor, MentorStats, Mentee, Meeting, Message, Achievement
+from .serializers import MenteeProfileSerializer
+from .stats import rebuild_mentor_stats, count_subquery
+from .cache_utils import incr_counter
+
+# Number of rows shown in the "upcoming" and "recent" lists
+DASHBOARD_LIST_LIMIT = 5
+
+# Queries issued by build_mentor_dashboard, independent of the mentee count:
+# mentor + stats, mentees, upcoming meetings, recent achievements
+MENTOR_DASHBOARD_QUERY_BUDGET = 4
+
+# Queries issued by build_mentee_dashboard: profile + mentor + counters,
+# upcoming meetings, unread messages, achievements
+MENTEE_DASHBOARD_QUERY_BUDGET = 4
+
+# Cached payloads are stored under a per-mentor generation number; bumping the
+# generation invalidates the entry and also discards a payload that was being
+# rebuilt while the invalidation happened.
+DASHBOARD_CACHE_KEY = 'dashboard:mentor:{user_id}:{generation}'
+DASHBOARD_GENERATION_KEY = 'dashboard:mentor:{user_id}:generation'
+DASHBOARD_CACHE_HITS_KEY = 'dashboard:mentor:hits'
+DASHBOARD_CACHE_MISSES_KEY = 'dashboard:mentor:misses'
+
+ADMIN_DASHBOARD_CACHE_KEY = 'dashboard:admin:{days}'
+
+
+def get_mentor_with_stats(user):
+    """Fetch the mentor profile of user together with its MentorStats row"""
+    mentor = Mentor.objects.select_related('stats').get(user=user)
+    try:
+        mentor.stats
+    except MentorStats.DoesNotExist:
+        # Mentor predates the stats table; compute its row once
+        rebuild_mentor_stats(Mentor.objects.filter(pk=mentor.pk))
+        mentor = Mentor.objects.select_related('stats').get(pk=mentor.pk)
+    return mentor
+
+
+def _full_name(user):
+    return f"{user.first_name} {user.last_name}"
+
+
+def build_mentor_dashboard(mentor):
+    """Build the mentor dashboard payload in MENTOR_DASHBOARD_QUERY_BUDGET queries
+
+    ``mentor`` must come from get_mentor_with_stats so its MentorStats row
+    is already loaded.
+    """
+    mentees = Mentee.objects.filter(mentor=mentor).select_related('user').order_by('id')
+
+    upcoming_meetings = list(
+        Meeting.objects.filter(mentor_id=mentor.user_id, status=Meeting.Status.PENDING)
+        .select_related('mentee')
+        .order_by('scheduled_at')[:DASHBOARD_LIST_LIMIT]
+    )
+
+    recent_achievements = list(
+        Achievement.objects.filter(mentor=mentor)
+        .select_related('mentee__user')
+        .order_by('-created_at')[:DASHBOARD_LIST_LIMIT]
+    )
+
+    mentee_data = [{
+        'id': mentee.id,
+        'user': {
+            'id': mentee.user.id,
+            'name': _full_name(mentee.user),
+            'email': mentee.user.email,
+            'profile_picture': mentee.user.profile_picture
+        },
+        'course': mentee.course,
+        'year': mentee.year,
+        'attendance': mentee.attendance,
+        'academic': mentee.academic,
+        'upcoming_event': mentee.upcoming_event
+    } for mentee in mentees]
+
+    return {
+        'mentees': mentee_data,
+        'stats': {
+            'total_mentees': mentor.stats.total_mentees,
+            'unread_messages': mentor.stats.unread_messages,
+            'upcoming_meetings': mentor.stats.upcoming_meetings,
+            'recent_achievements': mentor.stats.recent_achievements
+        },
+        'upcoming_meetings': [{
+            'id': meeting.id,
+            'title': meeting.title,
+            'scheduled_at': meeting.scheduled_at,
+            'mentee_name': _full_name(meeting.mentee),
+            'status': meeting.status
+        } for meeting in upcoming_meetings],
+        'recent_achievements': [{
+            'id': achievement.id,
+            'title': achievement.name,
+            'mentee_name': _full_name(achievement.mentee.user) if achievement.mentee else None,
+            'date_awarded': achievement.created_at
+        } for achievement in recent_achievements]
+    }
+
+
+def get_cached_mentor_dashboard(user):
+    """Return the dashboard payload for a mentor user, building it on a miss
+
+    Raises Mentor.DoesNotExist when the user has no mentor profile.
+    """
+    generation = cache.get(DASHBOARD_GENERATION_KEY.format(user_id=user.pk), 0)
+    key = DASHBOARD_CACHE_KEY.format(user_id=user.pk, generation=generation)
+
+    payload = cache.get(key)
+    if payload is not None:
+        incr_counter(DASHBOARD_CACHE_HITS_KEY)
+        return payload
+
+    incr_counter(DASHBOARD_CACHE_MISSES_KEY)
+    payload = build_mentor_dashboard(get_mentor_with_stats(user))
+    cache.set(key, payload, settings.DASHBOARD_CACHE_TIMEOUT)
+    return payload
+
+
+def invalidate_mentor_dashboards(user_ids):
+    """Drop the cached dashboards of the given mentor users once the current
+    transaction commits"""
+    keys = [DASHBOARD_GENERATION_KEY.format(user_id=user_id) for user_id in set(user_ids) if user_id]
+    if not keys:
+        return
+
+    def bump():
+        for key in keys:
+            incr_counter(key)
+
+    transaction.on_commit(bump)
+
+
+def invalidate_dashboards_for_mentors(mentor_ids):
+    """Same as invalidate_mentor_dashboards but keyed by Mentor primary key"""
+    mentor_ids = {mentor_id for mentor_id in mentor_ids if mentor_id}
+    if mentor_ids:
+        invalidate_mentor_dashboards(
+            Mentor.objects.filter(pk__in=mentor_ids).values_list('user_id', flat=True)
+        )
+
+
+def get_dashboard_cache_stats():
+    """Hit/miss counters of the mentor dashboard cache"""
+    counters = cache.get_many([DASHBOARD_CACHE_HITS_KEY, DASHBOARD_CACHE_MISSES_KEY])
+    hits = counters.get(DASHBOARD_CACHE_HITS_KEY, 0)
+    misses = counters.get(DASHBOARD_CACHE_MISSES_KEY, 0)
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': hits / total if total else None,
+    }
+
+
+def build_admin_dashboard(days):
+    """Build the admin-wide cohort dashboard with GROUP BY aggregation
+
+    Every block is a single aggregate query, so the cost depends on the
+    number of groups returned rather than on the number of students.
+    """
+    mentee_counts = list(
+        Mentor.objects.annotate(mentee_count=Count('mentee'))
+        .values('id', 'user__first_name', 'user__last_name', 'department', 'mentee_count')
+        .order_by('-mentee_count', 'id')
+    )
+
+    attendance = list(
+        Mentee.objects.values('course', 'year')
+        .annotate(mentees=Count('id'), average_attendance=Avg('attendance'))
+        .order_by('course', 'year')
+    )
+
+    meeting_statuses = list(
+        Meeting.objects.values('status')
+        .annotate(count=Count('id'))
+        .order_by('status')
+    )
+
+    since = timezone.now() - timedelta(days=days)
+    message_volume = list(
+        Message.objects.filter(created_at__gte=since)
+        .annotate(day=TruncDate('created_at'))
+        .values('day')
+        .annotate(count=Count('id'))
+        .order_by('day')
+    )
+
+    return {
+        'totals': {
+            'mentors': len(mentee_counts),
+            'mentees': sum(group['mentees'] for group in attendance),
+            'assigned_mentees': sum(mentor['mentee_count'] for mentor in mentee_counts),
+            'meetings': sum(group['count'] for group in meeting_statuses),
+            'recent_messages': sum(day['count'] for day in message_volume),
+        },
+        'mentee_counts': [{
+            'mentor_id': mentor['id'],
+            'name': f"{mentor['user__first_name']} {mentor['user__last_name']}",
+            'department': mentor['department'],
+            'mentee_count': mentor['mentee_count']
+        } for mentor in mentee_counts],
+        'attendance': attendance,
+        'meeting_statuses': {group['status']: group['count'] for group in meeting_statuses},
+        'message_volume': message_volume,
+        'days': days,
+    }
+
+
+def get_cached_admin_dashboard(days):
+    """Return the admin dashboard, recomputed at most every
+    ADMIN_DASHBOARD_CACHE_TIMEOUT seconds"""
+    return cache.get_or_set(
+        ADMIN_DASHBOARD_CACHE_KEY.format(days=days),
+        lambda: build_admin_dashboard(days),
+        settings.ADMIN_DASHBOARD_CACHE_TIMEOUT,
+    )
+
+
+def _mentee_upcoming_meetings(mentee_user):
+    return Meeting.objects.filter(
+        mentee=mentee_user,
+        status__in=[Meeting.Status.PENDING, Meeting.Status.ACCEPTED],
+        scheduled_at__gte=timezone.now(),
+    )
+
+
+def get_mentee_with_relations(user):
+    """Fetch the mentee profile of user with its mentor, user rows and
+    dashboard counters loaded in a single query"""
+    return Mentee.objects.select_related('user', 'mentor__user').annotate(
+        upcoming_meetings=count_subquery(_mentee_upcoming_meetings(OuterRef('user_id')), 'mentee'),
+        unread_messages=count_subquery(
+            Message.objects.filter(receiver=OuterRef('user_id'), is_read=False),
+            'receiver',
+        ),
+        total_achievements=count_subquery(
+            Achievement.objects.filter(mentee=OuterRef('pk')),
+            'mentee',
+        ),
+    ).get(user=user)
+
+
+def build_mentee_dashboard(mentee):
+    """Build the mentee dashboard payload in MENTEE_DASHBOARD_QUERY_BUDGET queries
+
+    ``mentee`` must come from get_mentee_with_relations.
+    """
+    upcoming_meetings = list(
+        _mentee_upcoming_meetings(mentee.user_id)
+        .select_related('mentor')
+        .order_by('scheduled_at')[:DASHBOARD_LIST_LIMIT]
+    )
+
+    unread_messages = list(
+        Message.objects.filter(receiver_id=mentee.user_id, is_read=False)
+        .select_related('sender')
+        .order_by('-created_at')[:DASHBOARD_LIST_LIMIT]
+    )
+
+    achievements = list(
+        Achievement.objects.filter(mentee=mentee)
+        .order_by('-created_at')[:DASHBOARD_LIST_LIMIT]
+    )
+
+    profile = MenteeProfileSerializer(mentee).data
+    return {
+        'profile': profile,
+        'mentor': profile['mentor'],
+        'stats': {
+            'unread_messages': mentee.unread_messages,
+            'upcoming_meetings': mentee.upcoming_meetings,
+            'achievements': mentee.total_achievements
+        },
+        'upcoming_meetings': [{
+            'id': meeting.id,
+            'title': meeting.title,
+            'scheduled_at': meeting.scheduled_at,
+            'duration': meeting.duration,
+            'mentor_name': _full_name(meeting.mentor),
+            'status': meeting.status
+        } for meeting in upcoming_meetings],
+        'unread_messages': [{
+            'id': message.id,
+            'sender_id': message.sender_id,
+            'sender_name': _full_name(message.sender),
+            'content': message.content,
+            'created_at': message.created_at
+        } for message in unread_messages],
+        'achievements': [{
+            'id': achievement.id,
+            'title': achievement.name,
+            'description': achievement.description,
+            'badge_icon': achievement.badge_icon,
+            'date_awarded': achievement.created_at
+        } for achievement in achievements]
+    }
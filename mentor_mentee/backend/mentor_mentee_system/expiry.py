@@ -0,0 +1,84 @@
+"""Closing meetings whose time has passed.
+
+Once a meeting has ended, an accepted one becomes completed and one still
+pending becomes expired, so neither shows up as upcoming any more. Rows are
+moved in batches of batch_size: one locked keyset read on (status,
+scheduled_at), one UPDATE by primary key and one bulk insert of activity
+log entries per batch. Bulk updates bypass the signals, so the pending
+counters and dashboard and calendar caches are adjusted here, and
+updated_at is set for the reminder scheduler's watermark.
+"""
+from collections import Counter
+from datetime import timedelta
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from .models import ActivityLog, Meeting
+from .calendar_feed import invalidate_calendar_feeds
+from .dashboard import invalidate_mentor_dashboards
+from .stats import adjust_mentor_stats_for_user
+
+# Status a meeting moves to once it has ended, and its activity log key
+TRANSITIONS = {
+    Meeting.Status.ACCEPTED: (Meeting.Status.COMPLETED, 'meeting_completed'),
+    Meeting.Status.PENDING: (Meeting.Status.EXPIRED, 'meeting_expired'),
+}
+
+
+def _close_batch(from_status, now, after, batch_size):
+    """Close one batch of ended from_status meetings that start after the
+    (scheduled_at, pk) cursor; returns (closed, new cursor or None when
+    the last batch was read)"""
+    to_status, key = TRANSITIONS[from_status]
+    rows = Meeting.objects.select_for_update().filter(status=from_status, scheduled_at__lt=now)
+    if after:
+        rows = rows.filter(Q(scheduled_at__gt=after[0]) | Q(scheduled_at=after[0], pk__gt=after[1]))
+    rows = list(
+        rows.order_by('scheduled_at', 'pk')
+        .values_list('pk', 'mentor_id', 'mentee_id', 'title', 'scheduled_at', 'duration')[:batch_size]
+    )
+    if not rows:
+        return [], None
+
+    # Meetings still running are left for a later run
+    ended = [row for row in rows if row[4] + timedelta(minutes=row[5]) <= now]
+    if ended:
+        Meeting.objects.filter(pk__in=[row[0] for row in ended]).update(status=to_status, updated_at=now)
+        label = to_status.label.lower()
+        ActivityLog.objects.bulk_create([
+            ActivityLog(
+                user_id=user_id,
+                in_time=now,
+                out_time=now,
+                activity_done=f'Meeting "{title}" of {timezone.localtime(scheduled_at):%Y-%m-%d %H:%M} {label}',
+                key=key,
+            )
+            for _, mentor_id, mentee_id, title, scheduled_at, _ in ended
+            for user_id in (mentor_id, mentee_id)
+        ])
+        if from_status == Meeting.Status.PENDING:
+            for mentor_id, closed in Counter(row[1] for row in ended).items():
+                adjust_mentor_stats_for_user(mentor_id, upcoming_meetings=-closed)
+        invalidate_mentor_dashboards({row[1] for row in ended})
+        invalidate_calendar_feeds({user_id for row in ended for user_id in row[1:3]})
+
+    last = rows[-1]
+    return ended, (last[4], last[0]) if len(rows) == batch_size else None
+
+
+def close_past_meetings(now=None, batch_size=500):
+    """Complete ended accepted meetings and expire ended pending ones
+
+    Each batch commits on its own, so a long backlog never holds many row
+    locks. Returns {'completed': n, 'expired': n}.
+    """
+    now = now or timezone.now()
+    totals = {}
+    for from_status, (to_status, _) in TRANSITIONS.items():
+        totals[to_status.value] = 0
+        cursor = ()
+        while cursor is not None:
+            with transaction.atomic():
+                ended, cursor = _close_batch(from_status, now, cursor, batch_size)
+            totals[to_status.value] += len(ended)
+    return totals
@@ -0,0 +1,24 @@
+from django_filters import rest_framework as filters
+from .models import Meeting
+
+
+class CharInFilter(filters.BaseInFilter, filters.CharFilter):
+    """Comma-separated values, e.g. ?status=pending,accepted"""
+
+
+class MeetingWindowFilter(filters.FilterSet):
+    """Meetings starting in [start, end) with one of the given statuses
+
+    Together with the (mentor|mentee, status, scheduled_at) indexes a
+    calendar page is one index range scan.
+    """
+    # Dates are accepted too and mean midnight
+    start = filters.DateTimeFilter(field_name='scheduled_at', lookup_expr='gte')
+    end = filters.DateTimeFilter(field_name='scheduled_at', lookup_expr='lt')
+    status = CharInFilter(field_name='status', lookup_expr='in')
+
+
+class MeetingFilter(MeetingWindowFilter):
+    class Meta:
+        model = Meeting
+        fields = ['mentor', 'mentee', 'scheduled_at']
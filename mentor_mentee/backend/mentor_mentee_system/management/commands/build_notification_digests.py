@@ -0,0 +1,25 @@
+from datetime import date, timedelta
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from mentor_mentee_system.notifications import build_digests
+
+class Command(BaseCommand):
+    help = 'Builds the daily notification digest of every user; schedule it once a day'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--date',
+            type=date.fromisoformat,
+            help='Day to summarise (YYYY-MM-DD), yesterday by default',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of users summarised per query',
+        )
+
+    def handle(self, *args, **options):
+        day = options['date'] or timezone.localdate() - timedelta(days=1)
+        written = build_digests(day, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Wrote {written} digest(s) for {day}'))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from mentor_mentee_system.expiry import close_past_meetings
+
+class Command(BaseCommand):
+    help = 'Completes accepted meetings and expires pending ones once they have ended'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Meetings closed per transaction',
+        )
+
+    def handle(self, *args, **options):
+        totals = close_past_meetings(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Completed {totals['completed']} meeting(s), expired {totals['expired']} meeting(s)"
+        ))
@@ -0,0 +1,18 @@
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from mentor_mentee_system.attachments import collect_garbage
+
+class Command(BaseCommand):
+    help = 'Deletes attachment blobs no longer referenced and abandoned partial uploads'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--upload-age',
+            type=int,
+            default=7,
+            help='Days after which an unfinished upload is considered abandoned',
+        )
+
+    def handle(self, *args, **options):
+        blobs, uploads = collect_garbage(timedelta(days=options['upload_age']))
+        self.stdout.write(self.style.SUCCESS(f'Removed {blobs} blob(s) and {uploads} abandoned upload(s)'))
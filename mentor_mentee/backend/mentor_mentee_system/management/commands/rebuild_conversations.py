@@ -0,0 +1,9 @@
+from django.core.management.base import BaseCommand
+from mentor_mentee_system.conversations import rebuild_conversations
+
+class Command(BaseCommand):
+    help = 'Rebuilds the Conversation list rows from the messages table'
+
+    def handle(self, *args, **options):
+        written = rebuild_conversations()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {written} conversation(s)'))
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from mentor_mentee_system.models import Mentor
+from mentor_mentee_system.stats import rebuild_mentor_stats
+
+class Command(BaseCommand):
+    help = 'Recomputes the denormalized MentorStats counters from the source tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--mentor',
+            type=int,
+            action='append',
+            dest='mentors',
+            help='Only rebuild the mentor with this id (may be repeated)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Number of mentors recomputed per query',
+        )
+
+    def handle(self, *args, **options):
+        queryset = Mentor.objects.all()
+        if options['mentors']:
+            queryset = queryset.filter(pk__in=options['mentors'])
+
+        rebuilt = rebuild_mentor_stats(queryset, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt stats for {rebuilt} mentor(s)'))
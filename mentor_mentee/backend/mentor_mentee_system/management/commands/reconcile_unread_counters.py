@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from mentor_mentee_system.models import User
+from mentor_mentee_system.unread import reconcile_unread_counters
+
+class Command(BaseCommand):
+    help = 'Repairs drift in the per-user unread message and notification counters'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user',
+            type=int,
+            action='append',
+            dest='users',
+            help='Only reconcile the user with this id (may be repeated)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of users recomputed per query',
+        )
+
+    def handle(self, *args, **options):
+        queryset = User.objects.all()
+        if options['users']:
+            queryset = queryset.filter(pk__in=options['users'])
+
+        checked, fixed = reconcile_unread_counters(queryset, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Checked {checked} user(s), fixed {fixed} counter(s)'))
@@ -0,0 +1,48 @@
+import os
+import socket
+import time
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from mentor_mentee_system.broadcasts import claim_job, run_job
+
+class Command(BaseCommand):
+    help = 'Fans out queued broadcast communications in fixed-size chunks'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Exit when no job is waiting instead of polling for new ones',
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=2.0,
+            help='Seconds to wait between polls when the queue is empty',
+        )
+        parser.add_argument(
+            '--stale-after',
+            type=int,
+            default=300,
+            help='Seconds after which a running job without heartbeat is resumed',
+        )
+
+    def handle(self, *args, **options):
+        worker_id = f'{socket.gethostname()}:{os.getpid()}'
+        stale_after = timedelta(seconds=options['stale_after'])
+
+        while True:
+            job = claim_job(worker_id, stale_after)
+            if job is None:
+                if options['once']:
+                    return
+                time.sleep(options['poll_interval'])
+                continue
+
+            self.stdout.write(f'Broadcast {job.pk}: resuming after recipient {job.last_recipient_id}')
+            try:
+                run_job(job, worker_id)
+            except Exception as e:
+                self.stderr.write(self.style.ERROR(f'Broadcast {job.pk} failed: {e}'))
+            else:
+                self.stdout.write(self.style.SUCCESS(f'Broadcast {job.pk} done'))
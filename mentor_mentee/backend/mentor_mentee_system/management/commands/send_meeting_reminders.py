@@ -0,0 +1,60 @@
+import time
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from mentor_mentee_system.reminders import ReminderScheduler
+
+class Command(BaseCommand):
+    help = 'Reminds mentors and mentees of their upcoming meetings'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Send the reminders due now and exit instead of running as a worker',
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=30.0,
+            help='Longest wait in seconds between looks for changed meetings',
+        )
+        parser.add_argument(
+            '--lead',
+            type=int,
+            default=30,
+            help='Minutes before a meeting starts that its reminder is sent',
+        )
+        parser.add_argument(
+            '--lookahead',
+            type=int,
+            default=6,
+            help='Hours of upcoming reminders kept in memory',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Meetings reminded per transaction',
+        )
+
+    def handle(self, *args, **options):
+        scheduler = ReminderScheduler(
+            lead=timedelta(minutes=options['lead']),
+            lookahead=timedelta(hours=options['lookahead']),
+            batch_size=options['batch_size'],
+        )
+
+        while True:
+            sent = scheduler.tick()
+            if sent:
+                self.stdout.write(self.style.SUCCESS(f'Reminded {sent} meetings'))
+            if options['once']:
+                return
+
+            # Wake up for the next reminder if it's due before the next poll
+            wait = options['poll_interval']
+            next_due = scheduler.next_due()
+            if next_due is not None:
+                wait = min(wait, max((next_due - timezone.now()).total_seconds(), 0))
+            time.sleep(wait)
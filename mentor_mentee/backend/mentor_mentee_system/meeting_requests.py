@@ -0,0 +1,140 @@
+"""Accepting and rejecting meeting requests in batches.
+
+A meeting request is a Communication of type 'meeting_req' sent by a
+mentee to their mentor, pending while its meeting_status is unset. An
+accepted request becomes 'scheduled' with an accepted Meeting at its date
+and time; a rejected one becomes 'cancelled'.
+
+A whole batch is checked in one pass: one range query for the meetings
+and one series expansion for the occurrences around all requested slots,
+plus a sweep over the accepted requests in start order, since they all
+share the mentor and may not overlap one another. Requests that would
+overlap stay pending. The meetings are written with one bulk_create and
+the mentees notified with one notify_many.
+"""
+from datetime import datetime
+from django.db import transaction
+from django.utils import timezone
+from .models import User, Communication, Meeting, Notification
+from .bulk_scheduling import bulk_create_meetings
+from .calendar_feed import invalidate_calendar_feeds
+from .dashboard import invalidate_mentor_dashboards
+from .notifications import notify_many
+from .recurrence import occurrence_conflicts
+from .scheduling import Slot, blocking_meetings, find_slot_conflicts, slot_end
+
+MEETING_REQUEST = 'meeting_req'
+
+
+def pending_requests(mentor_user):
+    return Communication.objects.filter(
+        type=MEETING_REQUEST, receiver=mentor_user, meeting_status__isnull=True
+    )
+
+
+def _requested_start(request):
+    if request.meeting_date is None or request.meeting_time is None:
+        return None
+    return timezone.make_aware(datetime.combine(request.meeting_date, request.meeting_time))
+
+
+def _title(request):
+    return f'{request.get_meeting_mode_display()} meeting' if request.meeting_mode else 'Meeting'
+
+
+def review_meeting_requests(mentor_user, accept_ids, reject_ids, duration):
+    """Accept and reject pending meeting requests sent to mentor_user
+
+    Returns (created meetings, rejected request ids, skipped), skipped
+    being {'request', 'reason'} dicts, plus 'conflicts', 'series_conflicts'
+    and 'requests' (of this batch) for requests overlapping other meetings.
+    """
+    accept_ids, reject_ids = set(accept_ids), set(reject_ids)
+    now = timezone.now()
+    skipped = []
+
+    with transaction.atomic():
+        requests = pending_requests(mentor_user).select_for_update().in_bulk(accept_ids | reject_ids)
+        skipped += [
+            {'request': pk, 'reason': 'not a pending request to you'}
+            for pk in sorted((accept_ids | reject_ids) - requests.keys())
+        ]
+        rejected = sorted(pk for pk in reject_ids if pk in requests)
+
+        candidates = []
+        for pk in sorted(accept_ids & requests.keys()):
+            start = _requested_start(requests[pk])
+            if start is None:
+                skipped.append({'request': pk, 'reason': 'no meeting date and time'})
+            elif start <= now:
+                skipped.append({'request': pk, 'reason': 'in the past'})
+            else:
+                candidates.append((requests[pk], Slot(start, duration, mentor_user.pk, requests[pk].sender_id)))
+
+        # Same lock order as scheduling.ensure_no_conflict
+        list(User.objects.select_for_update().filter(
+            pk__in={mentor_user.pk, *(slot.mentee_id for _, slot in candidates)}
+        ).order_by('pk'))
+        slots = [slot for _, slot in candidates]
+        conflicts = find_slot_conflicts(blocking_meetings(), slots)
+        series_conflicts = occurrence_conflicts(slots)
+
+        accepted = []
+        ordered = sorted(zip(candidates, conflicts, series_conflicts), key=lambda item: item[0][1].start)
+        for (request, slot), found, series_found in ordered:
+            # Only the latest accepted request of the batch can reach this slot
+            batch_found = [
+                previous.pk for previous, previous_slot in accepted[-1:]
+                if slot_end(previous_slot.start, previous_slot.duration) > slot.start
+            ]
+            if found or series_found or batch_found:
+                skipped.append({
+                    'request': request.pk,
+                    'reason': 'overlaps another meeting',
+                    'conflicts': found,
+                    'series_conflicts': series_found,
+                    'requests': batch_found,
+                })
+                continue
+            accepted.append((request, slot))
+
+        meetings = [
+            Meeting(
+                mentor=mentor_user,
+                mentee_id=request.sender_id,
+                title=_title(request),
+                description=request.meeting_agenda,
+                scheduled_at=slot.start,
+                duration=duration,
+                status=Meeting.Status.ACCEPTED,
+            )
+            for request, slot in accepted
+        ]
+        meetings = bulk_create_meetings(meetings)
+
+        pending_requests(mentor_user).filter(pk__in=[request.pk for request, _ in accepted]) \
+            .update(meeting_status='scheduled')
+        pending_requests(mentor_user).filter(pk__in=rejected).update(meeting_status='cancelled')
+
+        notify_many([
+            Notification(
+                user_id=meeting.mentee_id,
+                notification_type=Notification.MEETING,
+                title='Meeting request accepted',
+                message=f'Meeting scheduled for {timezone.localtime(meeting.scheduled_at):%Y-%m-%d %H:%M}',
+            )
+            for meeting in meetings
+        ] + [
+            Notification(
+                user_id=requests[pk].sender_id,
+                notification_type=Notification.MEETING,
+                title='Meeting request declined',
+                message=f'{mentor_user.get_full_name() or mentor_user.username} declined your meeting request',
+            )
+            for pk in rejected
+        ])
+    if meetings:
+        invalidate_mentor_dashboards([mentor_user.pk])
+    invalidate_calendar_feeds([mentor_user.pk, *(meeting.mentee_id for meeting in meetings)])
+    skipped.sort(key=lambda item: item['request'])
+    return meetings, rejected, skipped
@@ -0,0 +1,26 @@
+# Generated by Django 4.2.9 on 2026-10-18 17:42
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mentor_mentee_system', '0002_achievement_badge_icon_user_calendar_id_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MentorStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_mentees', models.IntegerField(default=0)),
+                ('unread_messages', models.IntegerField(default=0)),
+                ('upcoming_meetings', models.IntegerField(default=0)),
+                ('recent_achievements', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('mentor', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='stats', to='mentor_mentee_system.mentor')),
+            ],
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.9 on 2026-10-18 17:45
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mentor_mentee_system', '0004_message_created_at_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Notification',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('notification_type', models.CharField(choices=[('meeting', 'Meeting'), ('achievement', 'Achievement'), ('message', 'Message')], default='message', max_length=20)),
+                ('title', models.CharField(default='Notification', max_length=200)),
+                ('message', models.TextField(default='You have a new notification')),
+                ('is_read', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notifications_main', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
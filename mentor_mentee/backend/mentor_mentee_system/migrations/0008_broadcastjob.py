@@ -0,0 +1,39 @@
+# Generated by Django 4.2.9 on 2026-10-18 17:47
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mentor_mentee_system', '0007_unreadcounter'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BroadcastJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('message_content', models.TextField()),
+                ('attached_file', models.CharField(blank=True, max_length=255, null=True)),
+                ('audience', models.CharField(choices=[('my_mentees', 'My mentees'), ('department', 'Department')], default='my_mentees', max_length=20)),
+                ('department', models.CharField(blank=True, max_length=255, null=True)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('completed', 'Completed'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('chunk_size', models.PositiveIntegerField(default=500)),
+                ('total_recipients', models.PositiveIntegerField(default=0)),
+                ('processed_recipients', models.PositiveIntegerField(default=0)),
+                ('last_recipient_id', models.BigIntegerField(default=0)),
+                ('locked_by', models.CharField(blank=True, max_length=100, null=True)),
+                ('heartbeat_at', models.DateTimeField(blank=True, null=True)),
+                ('error', models.TextField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('sender', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='broadcast_jobs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'heartbeat_at'], name='broadcast_status_idx')],
+            },
+        ),
+    ]
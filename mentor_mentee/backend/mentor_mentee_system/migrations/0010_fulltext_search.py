@@ -0,0 +1,71 @@
+from django.db import migrations
+
+# Full-text indexes used by search.py. MySQL maintains its FULLTEXT indexes
+# itself; on SQLite the FTS5 tables mirror the source tables through triggers.
+# Other backends get no index and search falls back to LIKE.
+INDEXED_COLUMNS = {
+    'Message': ('message_fts', ['content']),
+    'Communication': ('communication_fts', ['message_content', 'meeting_agenda', 'notes']),
+}
+
+
+def _tables(apps):
+    for model_name, (index_name, columns) in INDEXED_COLUMNS.items():
+        yield apps.get_model('mentor_mentee_system', model_name)._meta.db_table, index_name, columns
+
+
+def create_indexes(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    quote = schema_editor.quote_name
+    for table, index_name, columns in _tables(apps):
+        column_list = ', '.join(quote(column) for column in columns)
+        if vendor == 'mysql':
+            schema_editor.execute(
+                f'ALTER TABLE {quote(table)} ADD FULLTEXT INDEX {quote(index_name)} ({column_list})'
+            )
+        elif vendor == 'sqlite':
+            old_values = ', '.join(f'old.{quote(column)}' for column in columns)
+            new_values = ', '.join(f'new.{quote(column)}' for column in columns)
+            schema_editor.execute(
+                f"CREATE VIRTUAL TABLE {index_name} USING fts5({column_list}, "
+                f"content='{table}', content_rowid='id', prefix='2 3')"
+            )
+            schema_editor.execute(
+                f'CREATE TRIGGER {index_name}_ai AFTER INSERT ON {quote(table)} BEGIN '
+                f'INSERT INTO {index_name}(rowid, {column_list}) VALUES (new.id, {new_values}); END'
+            )
+            schema_editor.execute(
+                f'CREATE TRIGGER {index_name}_ad AFTER DELETE ON {quote(table)} BEGIN '
+                f"INSERT INTO {index_name}({index_name}, rowid, {column_list}) "
+                f"VALUES ('delete', old.id, {old_values}); END"
+            )
+            schema_editor.execute(
+                f'CREATE TRIGGER {index_name}_au AFTER UPDATE OF {column_list} ON {quote(table)} BEGIN '
+                f"INSERT INTO {index_name}({index_name}, rowid, {column_list}) "
+                f"VALUES ('delete', old.id, {old_values}); "
+                f'INSERT INTO {index_name}(rowid, {column_list}) VALUES (new.id, {new_values}); END'
+            )
+            schema_editor.execute(f"INSERT INTO {index_name}({index_name}) VALUES ('rebuild')")
+
+
+def drop_indexes(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    quote = schema_editor.quote_name
+    for table, index_name, columns in _tables(apps):
+        if vendor == 'mysql':
+            schema_editor.execute(f'ALTER TABLE {quote(table)} DROP INDEX {quote(index_name)}')
+        elif vendor == 'sqlite':
+            for suffix in ('ai', 'ad', 'au'):
+                schema_editor.execute(f'DROP TRIGGER IF EXISTS {index_name}_{suffix}')
+            schema_editor.execute(f'DROP TABLE IF EXISTS {index_name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mentor_mentee_system', '0009_conversation'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
@@ -0,0 +1,76 @@
+# Generated by Django 4.2.9 on 2026-10-18 18:02
+
+import hashlib
+import os
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def move_files_into_blobs(apps, schema_editor):
+    """Hash the files of existing attachments and store them as blobs"""
+    Attachment = apps.get_model('mentor_mentee_system', 'Attachment')
+    Blob = apps.get_model('mentor_mentee_system', 'Blob')
+    root = settings.ATTACHMENT_ROOT
+
+    for attachment in Attachment.objects.order_by('pk'):
+        source = root / attachment.path
+        digest = hashlib.sha256()
+        with open(source, 'rb') as f:
+            for data in iter(lambda: f.read(64 * 1024), b''):
+                digest.update(data)
+        sha256 = digest.hexdigest()
+
+        blob = Blob.objects.filter(sha256=sha256).first()
+        if blob is None:
+            path = os.path.join('blobs', sha256[:2], sha256[2:4], sha256)
+            (root / path).parent.mkdir(parents=True, exist_ok=True)
+            os.replace(source, root / path)
+            blob = Blob.objects.create(sha256=sha256, size=attachment.size, path=path)
+        else:
+            os.remove(source)
+        blob.ref_count += 1
+        blob.save(update_fields=['ref_count'])
+        attachment.blob = blob
+        attachment.save(update_fields=['blob'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mentor_mentee_system', '0012_attachments'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Blob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sha256', models.CharField(max_length=64, unique=True)),
+                ('size', models.BigIntegerField()),
+                ('path', models.CharField(max_length=255)),
+                ('ref_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='upload',
+            name='sha256',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='attachment',
+            name='blob',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='attachments', to='mentor_mentee_system.blob'),
+        ),
+        migrations.RunPython(move_files_into_blobs, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='attachment',
+            name='path',
+        ),
+        migrations.AlterField(
+            model_name='attachment',
+            name='blob',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='attachments', to='mentor_mentee_system.blob'),
+        ),
+    ]
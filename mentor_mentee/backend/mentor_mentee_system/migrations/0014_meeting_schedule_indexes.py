@@ -0,0 +1,21 @@
+# Generated by Django 4.2.9 on 2026-10-18 18:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mentor_mentee_system', '0013_attachment_blobs'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='meeting',
+            index=models.Index(fields=['mentor', 'scheduled_at'], name='meeting_mentor_scheduled_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='meeting',
+            index=models.Index(fields=['mentee', 'scheduled_at'], name='meeting_mentee_scheduled_idx'),
+        ),
+    ]
@@ -0,0 +1,138 @@
+# Generated by Django 4.2.9 on 2026-10-18 18:04
+
+import re
+from datetime import time
+from django.db import migrations, models
+
+# Frozen copy of the timetable parser in availability.py as of this migration
+
+SLOT_MINUTES = 15
+SLOTS_PER_DAY = 24 * 60 // SLOT_MINUTES
+WEEK_SLOTS = 7 * SLOTS_PER_DAY
+WEEK_BYTES = WEEK_SLOTS // 8
+FULL_WEEK = (1 << WEEK_SLOTS) - 1
+
+DAY_NAMES = ('monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday')
+DAY_GROUPS = {
+    'weekdays': range(5),
+    'weekends': range(5, 7),
+    'weekend': range(5, 7),
+    'daily': range(7),
+    'everyday': range(7),
+    'all week': range(7),
+}
+
+_TIME_RE = r'\d{1,2}(?:[:.]\d{2})?\s*(?:[ap]\.?m\.?)?|noon|midnight'
+_RANGE_RE = re.compile(rf'({_TIME_RE})\s*(?:-|–|to)\s*({_TIME_RE})', re.IGNORECASE)
+
+
+def _slot_range(weekday, start, end):
+    first = start.hour * 60 + start.minute
+    last = end.hour * 60 + end.minute or 24 * 60
+    first_slot = weekday * SLOTS_PER_DAY + first // SLOT_MINUTES
+    last_slot = weekday * SLOTS_PER_DAY + -(-last // SLOT_MINUTES)
+    if last_slot <= first_slot:
+        return 0
+    return ((1 << (last_slot - first_slot)) - 1) << first_slot
+
+
+def _parse_time(text):
+    # Dots of a.m./p.m. go; the one in 9.30 separates hours from minutes
+    text = re.sub(r'([ap])\.?m\.?$', r'\1m', text.lower().replace(' ', ''))
+    if text == 'noon':
+        return time(12, 0)
+    if text == 'midnight':
+        return time(0, 0)
+    match = re.fullmatch(r'(\d{1,2})(?::(\d{2}))?([ap]m)?', text.replace('.', ':'))
+    if not match:
+        raise ValueError(text)
+    hour, minute, meridiem = int(match.group(1)), int(match.group(2) or 0), match.group(3)
+    if meridiem:
+        if not 1 <= hour <= 12:
+            raise ValueError(text)
+        hour = hour % 12 + (12 if meridiem == 'pm' else 0)
+    return time(hour, minute)
+
+
+def _day_index(token):
+    token = token.strip().rstrip('.').lower()
+    for index, name in enumerate(DAY_NAMES):
+        if len(token) >= 3 and name.startswith(token):
+            return index
+    raise ValueError(token)
+
+
+def _parse_days(text):
+    text = text.strip().lower()
+    if text in DAY_GROUPS:
+        return set(DAY_GROUPS[text])
+    days = set()
+    for part in re.split(r',|&|\band\b|/', text):
+        part = part.strip()
+        if not part:
+            continue
+        bounds = re.split(r'\s*(?:-|–|to)\s*', part)
+        if len(bounds) == 2:
+            first, last = _day_index(bounds[0]), _day_index(bounds[1])
+            days.update(day % 7 for day in range(first, first + (last - first) % 7 + 1))
+        else:
+            days.add(_day_index(part))
+    return days
+
+
+def _parse_timetable(text):
+    if not text or not text.strip():
+        return None
+    bitmap = 0
+    for entry in re.split(r'[;\n]+', text):
+        entry = entry.strip()
+        if not entry:
+            continue
+        first_range = _RANGE_RE.search(entry)
+        if first_range is None:
+            return None
+        day_text = entry[:first_range.start()].strip().rstrip(':').strip()
+        if re.search(r'\d', day_text):
+            return None
+        try:
+            days = _parse_days(day_text) if day_text else set(range(7))
+            for match in _RANGE_RE.finditer(entry):
+                start, end = _parse_time(match.group(1)), _parse_time(match.group(2))
+                for day in days:
+                    bitmap |= _slot_range(day, start, end)
+        except ValueError:
+            return None
+    return bitmap or None
+
+
+def parse_timetables(apps, schema_editor):
+    """Fill mentor availability from the timetable text where it can be parsed"""
+    Mentor = apps.get_model('mentor_mentee_system', 'Mentor')
+    mentors = []
+    for mentor in Mentor.objects.exclude(timetable__isnull=True).exclude(timetable='').only('pk', 'timetable'):
+        bitmap = _parse_timetable(mentor.timetable)
+        if bitmap is not None:
+            mentor.availability = (bitmap & FULL_WEEK).to_bytes(WEEK_BYTES, 'little')
+            mentors.append(mentor)
+    Mentor.objects.bulk_update(mentors, ['availability'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mentor_mentee_system', '0014_meeting_schedule_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mentee',
+            name='availability',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='mentor',
+            name='availability',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.RunPython(parse_timetables, migrations.RunPython.noop),
+    ]
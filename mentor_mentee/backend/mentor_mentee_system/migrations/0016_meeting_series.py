@@ -0,0 +1,67 @@
+# Generated by Django 4.2.9 on 2026-10-18 18:07
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mentor_mentee_system', '0015_availability'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MeetingSeries',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(default='Meeting', max_length=255)),
+                ('description', models.TextField(blank=True, null=True)),
+                ('start_at', models.DateTimeField()),
+                ('duration', models.IntegerField(default=30)),
+                ('frequency', models.CharField(choices=[('weekly', 'Weekly'), ('biweekly', 'Every two weeks'), ('monthly', 'Monthly')], default='weekly', max_length=10)),
+                ('until', models.DateTimeField(blank=True, null=True)),
+                ('count', models.PositiveIntegerField(blank=True, null=True)),
+                ('exdates', models.JSONField(blank=True, default=list)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('accepted', 'Accepted'), ('rejected', 'Rejected'), ('completed', 'Completed')], default='pending', max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'meeting series',
+            },
+        ),
+        migrations.AddField(
+            model_name='meeting',
+            name='occurrence_start',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='meetingseries',
+            name='mentee',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='mentee_meeting_series', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='meetingseries',
+            name='mentor',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='mentor_meeting_series', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='meeting',
+            name='series',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='occurrences', to='mentor_mentee_system.meetingseries'),
+        ),
+        migrations.AddIndex(
+            model_name='meetingseries',
+            index=models.Index(fields=['mentor', 'status'], name='series_mentor_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='meetingseries',
+            index=models.Index(fields=['mentee', 'status'], name='series_mentee_status_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='meeting',
+            constraint=models.UniqueConstraint(fields=('series', 'occurrence_start'), name='meeting_series_occurrence_unique'),
+        ),
+    ]
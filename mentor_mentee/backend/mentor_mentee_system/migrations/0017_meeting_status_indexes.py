@@ -0,0 +1,21 @@
+# Generated by Django 4.2.9 on 2026-10-18 18:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mentor_mentee_system', '0016_meeting_series'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='meeting',
+            index=models.Index(fields=['mentor', 'status', 'scheduled_at'], name='meeting_mentor_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='meeting',
+            index=models.Index(fields=['mentee', 'status', 'scheduled_at'], name='meeting_mentee_status_idx'),
+        ),
+    ]
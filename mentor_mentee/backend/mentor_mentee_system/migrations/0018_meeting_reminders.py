@@ -0,0 +1,30 @@
+# Generated by Django 4.2.9 on 2026-10-18 18:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mentor_mentee_system', '0017_meeting_status_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='meeting',
+            name='reminded_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='meeting',
+            index=models.Index(fields=['status', 'scheduled_at'], name='meeting_status_scheduled_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='meeting',
+            index=models.Index(fields=['updated_at'], name='meeting_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='meetingseries',
+            index=models.Index(fields=['updated_at'], name='series_updated_idx'),
+        ),
+    ]
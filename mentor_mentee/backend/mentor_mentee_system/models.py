@@ -25,6 +25,8 @@ class Mentor(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     room_no = models.CharField(max_length=50, null=True, blank=True)
     timetable = models.TextField(null=True, blank=True)
+    # Weekly bitmap of 15-minute slots, see availability.py
+    availability = models.BinaryField(null=True, blank=True)
     department = models.CharField(max_length=255, null=True, blank=True)
     academic_background = models.TextField(null=True, blank=True)
     post_in_hand = models.CharField(max_length=255, null=True, blank=True)
@@ -38,6 +40,17 @@ class Mentee(models.Model):
     academic = models.TextField(null=True, blank=True)
     upcoming_event = models.TextField(null=True, blank=True)
     alternate_contact = models.CharField(max_length=15, unique=True, null=True, blank=True)
+    # Weekly bitmap of 15-minute slots, see availability.py
+    availability = models.BinaryField(null=True, blank=True)
+
+class MentorStats(models.Model):
+    """Denormalized dashboard counters, kept up to date by signals.py"""
+    mentor = models.OneToOneField(Mentor, on_delete=models.CASCADE, related_name='stats')
+    total_mentees = models.IntegerField(default=0)
+    unread_messages = models.IntegerField(default=0)
+    upcoming_meetings = models.IntegerField(default=0)
+    recent_achievements = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
 
 class Achievement(models.Model):
     mentor = models.ForeignKey(Mentor, on_delete=models.CASCADE, null=True)
@@ -83,6 +96,13 @@ class Communication(models.Model):
     message_content = models.TextField(null=True, blank=True)
     message_status = models.CharField(max_length=20, choices=MESSAGE_STATUS_CHOICES, default='sent')
     attached_file = models.CharField(max_length=255, null=True, blank=True)
+    attachment = models.ForeignKey(
+        'Attachment',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='communications'
+    )
     timestamp = models.DateTimeField(auto_now_add=True)
     type = models.CharField(max_length=20, choices=MESSAGE_TYPE_CHOICES, default='one-to-one')
     
@@ -94,6 +114,47 @@ class Communication(models.Model):
     meeting_agenda = models.TextField(null=True, blank=True)
     notes = models.TextField(null=True, blank=True)
 
+class BroadcastJob(models.Model):
+    """A broadcast Communication waiting to be fanned out to its recipients"""
+    class Status(models.TextChoices):
+        PENDING = 'pending', _('Pending')
+        RUNNING = 'running', _('Running')
+        COMPLETED = 'completed', _('Completed')
+        FAILED = 'failed', _('Failed')
+
+    class Audience(models.TextChoices):
+        MY_MENTEES = 'my_mentees', _('My mentees')
+        DEPARTMENT = 'department', _('Department')
+
+    sender = models.ForeignKey(User, on_delete=models.CASCADE, related_name='broadcast_jobs')
+    message_content = models.TextField()
+    attached_file = models.CharField(max_length=255, null=True, blank=True)
+    attachment = models.ForeignKey(
+        'Attachment',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='broadcast_jobs'
+    )
+    audience = models.CharField(max_length=20, choices=Audience.choices, default=Audience.MY_MENTEES)
+    department = models.CharField(max_length=255, null=True, blank=True)
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.PENDING)
+    chunk_size = models.PositiveIntegerField(default=500)
+    total_recipients = models.PositiveIntegerField(default=0)
+    processed_recipients = models.PositiveIntegerField(default=0)
+    # Recipients are fanned out in User id order; everything up to this id is done
+    last_recipient_id = models.BigIntegerField(default=0)
+    locked_by = models.CharField(max_length=100, null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    error = models.TextField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'heartbeat_at'], name='broadcast_status_idx'),
+        ]
+
 class ActivityLog(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     in_time = models.DateTimeField(default=timezone.now)
@@ -107,6 +168,8 @@ class Meeting(models.Model):
         ACCEPTED = 'accepted', _('Accepted')
         REJECTED = 'rejected', _('Rejected')
         COMPLETED = 'completed', _('Completed')
+        # Still pending when it ended (expiry.close_past_meetings)
+        EXPIRED = 'expired', _('Expired')
 
     mentor = models.ForeignKey(User, on_delete=models.CASCADE, related_name='mentor_meetings_main')
     mentee = models.ForeignKey(User, on_delete=models.CASCADE, related_name='mentee_meetings_main')
@@ -115,16 +178,211 @@ class Meeting(models.Model):
     scheduled_at = models.DateTimeField(default=timezone.now)
     duration = models.IntegerField(default=30)  # in minutes
     status = models.CharField(max_length=20, choices=Status.choices, default=Status.PENDING)
+    # Set on occurrences of a MeetingSeries stored once they were changed
+    series = models.ForeignKey(
+        'MeetingSeries',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='occurrences'
+    )
+    occurrence_start = models.DateTimeField(null=True, blank=True)
+    # Set once reminders.ReminderScheduler has reminded both participants
+    reminded_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Overlap checks in scheduling.find_slot_conflicts
+            models.Index(fields=['mentor', 'scheduled_at'], name='meeting_mentor_scheduled_idx'),
+            models.Index(fields=['mentee', 'scheduled_at'], name='meeting_mentee_scheduled_idx'),
+            # Status-filtered calendar windows (filters.MeetingFilter)
+            models.Index(fields=['mentor', 'status', 'scheduled_at'], name='meeting_mentor_status_idx'),
+            models.Index(fields=['mentee', 'status', 'scheduled_at'], name='meeting_mentee_status_idx'),
+            # Reminder scheduler: upcoming window and changes since its watermark
+            models.Index(fields=['status', 'scheduled_at'], name='meeting_status_scheduled_idx'),
+            models.Index(fields=['updated_at'], name='meeting_updated_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['series', 'occurrence_start'], name='meeting_series_occurrence_unique'
+            ),
+        ]
+
+class MeetingSeries(models.Model):
+    """A recurring meeting. Occurrences are computed from the rule when
+    listed and only stored as Meetings once changed (see recurrence.py)"""
+    class Frequency(models.TextChoices):
+        WEEKLY = 'weekly', _('Weekly')
+        BIWEEKLY = 'biweekly', _('Every two weeks')
+        MONTHLY = 'monthly', _('Monthly')
+
+    mentor = models.ForeignKey(User, on_delete=models.CASCADE, related_name='mentor_meeting_series')
+    mentee = models.ForeignKey(User, on_delete=models.CASCADE, related_name='mentee_meeting_series')
+    title = models.CharField(max_length=255, default='Meeting')
+    description = models.TextField(null=True, blank=True)
+    start_at = models.DateTimeField()
+    duration = models.IntegerField(default=30)  # in minutes
+    frequency = models.CharField(max_length=10, choices=Frequency.choices, default=Frequency.WEEKLY)
+    until = models.DateTimeField(null=True, blank=True)
+    count = models.PositiveIntegerField(null=True, blank=True)
+    # Starts of cancelled occurrences, as ISO 8601 strings
+    exdates = models.JSONField(default=list, blank=True)
+    status = models.CharField(max_length=20, choices=Meeting.Status.choices, default=Meeting.Status.PENDING)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = 'meeting series'
+        indexes = [
+            models.Index(fields=['mentor', 'status'], name='series_mentor_status_idx'),
+            models.Index(fields=['mentee', 'status'], name='series_mentee_status_idx'),
+            models.Index(fields=['updated_at'], name='series_updated_idx'),
+        ]
+
 class Message(models.Model):
     sender = models.ForeignKey(User, on_delete=models.CASCADE, related_name='sent_messages_main')
     receiver = models.ForeignKey(User, on_delete=models.CASCADE, related_name='received_messages_main')
     content = models.TextField(default='')
     is_read = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            # Inbox, outbox and conversation pages (see pagination.KeysetPagination)
+            models.Index(fields=['receiver', 'created_at'], name='message_receiver_created_idx'),
+            models.Index(fields=['sender', 'created_at'], name='message_sender_created_idx'),
+            models.Index(fields=['sender', 'receiver', 'created_at'], name='message_pair_created_idx'),
+        ]
+
+class Notification(models.Model):
+    MEETING = 'meeting'
+    ACHIEVEMENT = 'achievement'
+    MESSAGE = 'message'
+    
+    NOTIFICATION_TYPES = [
+        (MEETING, 'Meeting'),
+        (ACHIEVEMENT, 'Achievement'),
+        (MESSAGE, 'Message'),
+    ]
+    
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='notifications_main')
+    notification_type = models.CharField(max_length=20, choices=NOTIFICATION_TYPES, default=MESSAGE)
+    title = models.CharField(max_length=200, default='Notification')
+    message = models.TextField(default='You have a new notification')
+    is_read = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+    # Notifications with the same type and source_key merge into one unread
+    # row while they arrive within settings.NOTIFICATION_COALESCE_WINDOW
+    # (see notifications.notify_many); count is how many were merged
+    source_key = models.CharField(max_length=100, blank=True, default='')
+    count = models.PositiveIntegerField(default=1)
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'notification_type', 'source_key', 'is_read'],
+                         name='notification_coalesce_idx'),
+            models.Index(fields=['user', 'updated_at'], name='notification_user_updated_idx'),
+        ]
+
+class NotificationDigest(models.Model):
+    """Per-user daily summary of notifications, written by build_notification_digests"""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='notification_digests')
+    date = models.DateField()
+    # Notifications received that day, merged ones counted individually
+    total = models.PositiveIntegerField(default=0)
+    # {notification_type: {'items': rows, 'events': notifications, 'unread': unread rows}}
+    summary = models.JSONField(default=dict)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'date'], name='notification_digest_user_date_unique'),
+        ]
+
+class UnreadCounter(models.Model):
+    """Per-user badge counts, kept up to date by signals.py"""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='unread_counter')
+    messages = models.IntegerField(default=0)
+    notifications = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+class Conversation(models.Model):
+    """One row per pair of users who exchanged messages, updated on every send"""
+    # The pair is stored with user_low.id < user_high.id so it is unique
+    user_low = models.ForeignKey(User, on_delete=models.CASCADE, related_name='conversations_low')
+    user_high = models.ForeignKey(User, on_delete=models.CASCADE, related_name='conversations_high')
+    last_message = models.ForeignKey(
+        Message,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+    last_activity_at = models.DateTimeField()
+    unread_low = models.IntegerField(default=0)
+    unread_high = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user_low', 'user_high'], name='conversation_pair_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['user_low', 'last_activity_at'], name='conversation_low_activity_idx'),
+            models.Index(fields=['user_high', 'last_activity_at'], name='conversation_high_activity_idx'),
+        ]
+
+    def other_user(self, user):
+        return self.user_high if user.pk == self.user_low_id else self.user_low
+
+    def unread_for(self, user):
+        return self.unread_low if user.pk == self.user_low_id else self.unread_high
+
+class Blob(models.Model):
+    """File contents stored once per SHA-256; path is relative to settings.ATTACHMENT_ROOT"""
+    sha256 = models.CharField(max_length=64, unique=True)
+    size = models.BigIntegerField()
+    path = models.CharField(max_length=255)
+    # Attachments pointing at this blob, kept up to date by signals.py;
+    # blobs at zero are removed by collect_attachment_garbage
+    ref_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+class Attachment(models.Model):
+    """A file as uploaded by a user; identical contents share one Blob"""
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='attachments')
+    blob = models.ForeignKey(Blob, on_delete=models.PROTECT, related_name='attachments')
+    filename = models.CharField(max_length=255)
+    content_type = models.CharField(max_length=100, default='application/octet-stream')
+    size = models.BigIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+class Upload(models.Model):
+    """A resumable upload; chunks are appended at offset until it reaches size"""
+    class Status(models.TextChoices):
+        UPLOADING = 'uploading', _('Uploading')
+        COMPLETE = 'complete', _('Complete')
+
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='uploads')
+    filename = models.CharField(max_length=255)
+    content_type = models.CharField(max_length=100, default='application/octet-stream')
+    size = models.BigIntegerField()
+    # Optional SHA-256 announced by the client, checked once all bytes arrived
+    sha256 = models.CharField(max_length=64, blank=True, default='')
+    offset = models.BigIntegerField(default=0)
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.UPLOADING)
+    attachment = models.OneToOneField(
+        Attachment,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='upload'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
 class UserAchievement(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='user_achievements_main')
     achievement = models.ForeignKey(Achievement, on_delete=models.CASCADE, null=True)
@@ -0,0 +1,146 @@
+from collections import Counter, defaultdict
+from datetime import datetime, time, timedelta
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+from .models import User, Notification, NotificationDigest
+from .unread import adjust_unread_many
+from . import realtime
+
+
+def _coalesce_key(notification):
+    return (notification.user_id, notification.notification_type, notification.source_key)
+
+
+def notify_many(notifications):
+    """Save unsaved Notification instances, merging repeats
+
+    Notifications sharing a user, type and non-empty source_key are merged
+    into the newest unread row with that key updated within
+    settings.NOTIFICATION_COALESCE_WINDOW, or into one new row; its count
+    grows by the number merged and its title and message become the latest.
+    New rows are written with a single bulk insert, so the unread counters
+    and realtime events that signals would handle are applied here.
+    Returns the created and updated rows.
+    """
+    if not notifications:
+        return []
+    now = timezone.now()
+
+    groups = {}
+    new_rows = []
+    for notification in notifications:
+        notification.updated_at = now
+        if notification.source_key:
+            groups.setdefault(_coalesce_key(notification), []).append(notification)
+        else:
+            new_rows.append(notification)
+
+    with transaction.atomic():
+        existing = {}
+        if groups:
+            candidates = Notification.objects.select_for_update().filter(
+                user_id__in={key[0] for key in groups},
+                source_key__in={key[2] for key in groups},
+                is_read=False,
+                updated_at__gte=now - timedelta(seconds=settings.NOTIFICATION_COALESCE_WINDOW),
+            ).order_by('-updated_at', '-pk')
+            for row in candidates:
+                existing.setdefault(_coalesce_key(row), row)
+
+        updated_rows = []
+        for key, group in groups.items():
+            latest = group[-1]
+            row = existing.get(key)
+            if row is None:
+                latest.count = len(group)
+                new_rows.append(latest)
+                continue
+            row.count += len(group)
+            row.title = latest.title
+            row.message = latest.message
+            row.updated_at = now
+            updated_rows.append(row)
+
+        if updated_rows:
+            Notification.objects.bulk_update(updated_rows, ['count', 'title', 'message', 'updated_at'])
+        if new_rows:
+            Notification.objects.bulk_create(new_rows)
+            if not connection.features.can_return_rows_from_bulk_insert:
+                # MySQL doesn't report the ids of bulk inserted rows
+                new_rows = list(Notification.objects.filter(
+                    user_id__in={row.user_id for row in new_rows},
+                    updated_at=now,
+                ).exclude(pk__in=[row.pk for row in updated_rows]))
+            users_by_count = defaultdict(list)
+            for user_id, created in Counter(row.user_id for row in new_rows).items():
+                users_by_count[created].append(user_id)
+            for created, user_ids in users_by_count.items():
+                adjust_unread_many(user_ids, notifications=created)
+
+    for row in new_rows:
+        realtime.publish([row.user_id], 'notification.created', realtime.notification_data(row))
+    for row in updated_rows:
+        realtime.publish([row.user_id], 'notification.updated', realtime.notification_data(row))
+    return new_rows + updated_rows
+
+
+def notify(user_id, notification_type, title, message, source_key=''):
+    """Create (or merge, see notify_many) a single notification"""
+    return notify_many([Notification(
+        user_id=user_id,
+        notification_type=notification_type,
+        title=title,
+        message=message,
+        source_key=source_key,
+    )])[0]
+
+
+def build_digests(day, batch_size=1000):
+    """Write the NotificationDigest of every user who got notifications on day
+
+    Users are processed batch_size at a time in primary key order, with one
+    aggregate query and one bulk upsert per batch; rerunning a day replaces
+    its digests. Returns the number of digests written.
+    """
+    tz = timezone.get_current_timezone()
+    start = timezone.make_aware(datetime.combine(day, time.min), tz)
+    end = start + timedelta(days=1)
+    upsert = {
+        'update_conflicts': True,
+        'update_fields': ['total', 'summary'],
+    }
+    if connection.features.supports_update_conflicts_with_target:
+        upsert['unique_fields'] = ['user', 'date']
+
+    written = 0
+    last_pk = 0
+    while True:
+        user_ids = list(
+            User.objects.filter(pk__gt=last_pk).order_by('pk').values_list('pk', flat=True)[:batch_size]
+        )
+        if not user_ids:
+            return written
+        last_pk = user_ids[-1]
+
+        rows = (
+            Notification.objects.filter(user_id__in=user_ids, updated_at__gte=start, updated_at__lt=end)
+            .values('user_id', 'notification_type')
+            .annotate(items=Count('id'), events=Sum('count'), unread=Count('id', filter=Q(is_read=False)))
+            .order_by()
+        )
+        digests = {}
+        for row in rows:
+            digest = digests.setdefault(
+                row['user_id'], NotificationDigest(user_id=row['user_id'], date=day, summary={})
+            )
+            digest.total += row['events']
+            digest.summary[row['notification_type']] = {
+                'items': row['items'],
+                'events': row['events'],
+                'unread': row['unread'],
+            }
+        if digests:
+            NotificationDigest.objects.bulk_create(digests.values(), **upsert)
+            written += len(digests)
@@ -0,0 +1,149 @@
+import heapq
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """Newest-first cursor pagination over (ordering_field, id)
+
+    The cursor holds the key of the last row of the previous page, so every
+    page is an index range scan of page_size rows no matter how deep the
+    client has scrolled.
+    """
+    ordering_field = 'created_at'
+    descending = True
+    page_size = 50
+    max_page_size = 200
+    page_size_query_param = 'page_size'
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except ValueError:
+            return self.page_size
+        return min(max(page_size, 1), self.max_page_size)
+
+    def row_pk(self, row):
+        return row.pk
+
+    def _key(self, row):
+        return getattr(row, self.ordering_field), self.row_pk(row)
+
+    def encode_cursor(self, row):
+        raw = f'{getattr(row, self.ordering_field).isoformat()}|{self.row_pk(row)}'
+        return urlsafe_b64encode(raw.encode()).decode()
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            value, pk = urlsafe_b64decode(encoded.encode()).decode().split('|')
+            value = parse_datetime(value)
+            pk = int(pk)
+        except (TypeError, ValueError, UnicodeDecodeError):
+            raise NotFound(self.invalid_cursor_message)
+        if value is None:
+            raise NotFound(self.invalid_cursor_message)
+        return value, pk
+
+    def _page(self, queryset, cursor):
+        field = self.ordering_field
+        after, order = ('lt', '-') if self.descending else ('gt', '')
+        if cursor is not None:
+            value, pk = cursor
+            queryset = queryset.filter(
+                Q(**{f'{field}__{after}': value}) | Q(**{field: value, f'pk__{after}': pk})
+            )
+        return queryset.order_by(f'{order}{field}', f'{order}pk')[:self.page_size + 1]
+
+    def _finish(self, rows):
+        self.has_next = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        self.next_cursor = self.encode_cursor(rows[-1]) if self.has_next else None
+        return rows
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        return self._finish(list(self._page(queryset, self.decode_cursor(request))))
+
+    def paginate_union(self, querysets, request):
+        """Paginate the union of disjoint querysets
+
+        Each queryset is paged on its own index and the pages are merged,
+        which avoids an OR across columns that no single index covers.
+        """
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        cursor = self.decode_cursor(request)
+        merged = heapq.merge(
+            *(list(self._page(queryset, cursor)) for queryset in querysets),
+            key=self._key,
+            reverse=self.descending,
+        )
+        return self._finish(list(merged)[:self.page_size + 1])
+
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+        return replace_query_param(
+            self.request.build_absolute_uri(), self.cursor_query_param, self.next_cursor
+        )
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True},
+                'results': schema,
+            },
+        }
+
+
+class ConversationPagination(KeysetPagination):
+    """Conversations ordered by most recent activity"""
+    ordering_field = 'last_activity_at'
+
+
+class MeetingPagination(KeysetPagination):
+    """Meetings soonest first
+
+    Occurrences of recurring meetings that aren't stored have no id; they
+    are keyed by the negated series id instead, which keeps keys unique and
+    puts them before stored meetings starting at the same time.
+    """
+    ordering_field = 'scheduled_at'
+    descending = False
+
+    def row_pk(self, row):
+        return row.pk if row.pk is not None else -row.series_id
+
+    def paginate_with_occurrences(self, queryset, occurrences, request):
+        """Paginate queryset merged with computed occurrences
+
+        occurrences is called with the start of the page (None on the first
+        page) and returns the unsaved meetings from then on, so each page
+        only expands series from where it begins.
+        """
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        cursor = self.decode_cursor(request)
+        rows = list(self._page(queryset, cursor))
+        extra = occurrences(cursor[0] if cursor else None)
+        if cursor is not None:
+            extra = [meeting for meeting in extra if self._key(meeting) > cursor]
+        return self._finish(sorted([*rows, *extra], key=self._key)[:self.page_size + 1])
@@ -0,0 +1,200 @@
+"""Real-time push of messages, read receipts and notifications.
+
+Events are published to a per-user hub and forwarded to every WebSocket
+connected for that user. The default InProcessBackend only reaches
+connections served by the same process, so the ASGI server must handle
+both the HTTP writes and the sockets; a backend with the same
+subscribe/unsubscribe/publish interface (e.g. one relaying through a
+broker) can be plugged in through settings.REALTIME_BACKEND.
+"""
+import asyncio
+import json
+import threading
+from collections import defaultdict
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils.module_loading import import_string
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+
+WEBSOCKET_PATH = '/ws/'
+
+# Close code sent when the connection has no valid access token
+WEBSOCKET_UNAUTHORIZED = 4401
+
+# Events buffered per connection before the client is told to resync
+SUBSCRIPTION_QUEUE_SIZE = 256
+
+RESYNC_EVENT = json.dumps({'type': 'resync'})
+PONG_EVENT = json.dumps({'type': 'pong'})
+
+
+class Subscription:
+    """Queue of encoded events for one connection of one user"""
+
+    def __init__(self, backend, user_id):
+        self.backend = backend
+        self.user_id = user_id
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=SUBSCRIPTION_QUEUE_SIZE)
+        self.overflowed = False
+
+    def deliver(self, text):
+        """Hand an event to the connection; safe to call from any thread"""
+        try:
+            self.loop.call_soon_threadsafe(self._put, text)
+        except RuntimeError:
+            # Event loop already closed, the connection is gone
+            pass
+
+    def _put(self, text):
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(text)
+        except asyncio.QueueFull:
+            # Slow consumer: drop what is queued and ask the client to refetch
+            self.overflowed = True
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC_EVENT)
+
+    async def get(self):
+        text = await self.queue.get()
+        if text is RESYNC_EVENT:
+            self.overflowed = False
+        return text
+
+    def close(self):
+        self.backend.unsubscribe(self)
+
+
+class InProcessBackend:
+    """Fan events out to the subscriptions living in this process"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscriptions = defaultdict(set)
+
+    def subscribe(self, user_id):
+        subscription = Subscription(self, user_id)
+        with self._lock:
+            self._subscriptions[user_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.user_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.user_id]
+
+    def publish(self, user_id, text):
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(user_id, ()))
+        for subscription in subscriptions:
+            subscription.deliver(text)
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = import_string(settings.REALTIME_BACKEND)()
+    return _backend
+
+
+def publish(user_ids, event_type, data):
+    """Push an event to users once the current transaction commits
+
+    The event is encoded once and shared by every receiving connection.
+    """
+    user_ids = {user_id for user_id in user_ids if user_id}
+    if not user_ids:
+        return
+    text = json.dumps({'type': event_type, 'data': data}, cls=DjangoJSONEncoder)
+
+    def send():
+        backend = get_backend()
+        for user_id in user_ids:
+            backend.publish(user_id, text)
+
+    transaction.on_commit(send)
+
+
+def notification_data(notification):
+    """Payload of notification.created and notification.updated events"""
+    return {
+        'id': notification.id,
+        'notification_type': notification.notification_type,
+        'title': notification.title,
+        'message': notification.message,
+        'is_read': notification.is_read,
+        'source_key': notification.source_key,
+        'count': notification.count,
+        'created_at': notification.created_at,
+        'updated_at': notification.updated_at,
+    }
+
+
+def authenticate_token(raw_token):
+    """Return the user id for a JWT access token, or None"""
+    if not raw_token:
+        return None
+
+    authentication = JWTAuthentication()
+    try:
+        user = authentication.get_user(authentication.get_validated_token(raw_token))
+    except (InvalidToken, TokenError, AuthenticationFailed):
+        return None
+    return user.pk if user.is_active else None
+
+
+def _authenticate(scope):
+    """Return the user id for the ?token= access token, or None"""
+    params = parse_qs(scope.get('query_string', b'').decode())
+    return authenticate_token(params.get('token', [None])[0])
+
+
+async def _forward(subscription, send):
+    while True:
+        text = await subscription.get()
+        await send({'type': 'websocket.send', 'text': text})
+
+
+async def websocket_application(scope, receive, send):
+    """ASGI application serving WEBSOCKET_PATH"""
+    message = await receive()
+    if message['type'] != 'websocket.connect':
+        return
+
+    user_id = await sync_to_async(_authenticate)(scope)
+    if user_id is None:
+        await send({'type': 'websocket.close', 'code': WEBSOCKET_UNAUTHORIZED})
+        return
+
+    await send({'type': 'websocket.accept'})
+    subscription = get_backend().subscribe(user_id)
+    forwarder = asyncio.ensure_future(_forward(subscription, send))
+    try:
+        while True:
+            message = await receive()
+            if message['type'] == 'websocket.disconnect':
+                break
+            if message['type'] == 'websocket.receive' and message.get('text') == 'ping':
+                # Goes through the queue so only the forwarder ever sends
+                subscription.deliver(PONG_EVENT)
+    finally:
+        forwarder.cancel()
+        subscription.close()
@@ -0,0 +1,135 @@
+import atexit
+import threading
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F
+from .models import Communication, Conversation, Message, Notification
+from .dashboard import invalidate_mentor_dashboards
+from .stats import adjust_mentor_stats_for_user
+from .unread import adjust_unread
+from . import realtime
+
+# Communication statuses that a read receipt moves to 'read'
+UNREAD_COMMUNICATION_STATUSES = ('sent', 'delivered')
+
+
+def mark_messages_read(reader_id, sender_id, up_to_id):
+    """Mark every unread message from sender to reader up to up_to_id as read
+
+    Runs as a single UPDATE. Signals don't fire for it, so the counters
+    they maintain are adjusted here by the number of rows changed.
+    Returns that number.
+    """
+    with transaction.atomic():
+        updated = Message.objects.filter(
+            receiver_id=reader_id,
+            sender_id=sender_id,
+            pk__lte=up_to_id,
+            is_read=False,
+        ).update(is_read=True)
+        if not updated:
+            return 0
+
+        adjust_unread(reader_id, messages=-updated)
+        adjust_mentor_stats_for_user(reader_id, unread_messages=-updated)
+        low, high = sorted((reader_id, sender_id))
+        if low != high:
+            field = 'unread_low' if reader_id == low else 'unread_high'
+            Conversation.objects.filter(user_low_id=low, user_high_id=high).update(
+                **{field: F(field) - updated}
+            )
+
+    invalidate_mentor_dashboards([reader_id])
+    realtime.publish([sender_id], 'messages.read', {
+        'reader': reader_id,
+        'up_to': up_to_id,
+        'count': updated,
+    })
+    return updated
+
+
+def mark_notifications_read(user_id, ids=None):
+    """Mark the given notifications of a user (all when ids is None) as read
+    in a single UPDATE; returns the number of rows changed"""
+    notifications = Notification.objects.filter(user_id=user_id, is_read=False)
+    if ids is not None:
+        notifications = notifications.filter(pk__in=ids)
+
+    with transaction.atomic():
+        updated = notifications.update(is_read=True)
+        if updated:
+            adjust_unread(user_id, notifications=-updated)
+    return updated
+
+
+def mark_communications_read(receiver_id, sender_id, up_to_id):
+    """Move sent/delivered communications from sender to receiver up to
+    up_to_id to 'read' in a single UPDATE"""
+    return Communication.objects.filter(
+        receiver_id=receiver_id,
+        sender_id=sender_id,
+        pk__lte=up_to_id,
+        message_status__in=UNREAD_COMMUNICATION_STATUSES,
+    ).update(message_status='read')
+
+
+class ReadReceiptBuffer:
+    """Coalesce read receipts and apply them in batches
+
+    A client scrolling through a conversation reports many receipts in
+    quick succession; only the highest id per (kind, reader, sender) is
+    kept, and the buffer is flushed after flush_interval seconds or once
+    max_pending keys are waiting, whichever comes first.
+    """
+    MARKERS = {
+        'message': mark_messages_read,
+        'communication': mark_communications_read,
+    }
+
+    def __init__(self, flush_interval, max_pending):
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._timer = None
+
+    def add(self, kind, reader_id, sender_id, up_to_id):
+        key = (kind, reader_id, sender_id)
+        with self._lock:
+            self._pending[key] = max(up_to_id, self._pending.get(key, 0))
+            flush_now = len(self._pending) >= self.max_pending
+            if not flush_now and self._timer is None:
+                self._timer = threading.Timer(self.flush_interval, self._flush_in_thread)
+                self._timer.daemon = True
+                self._timer.start()
+        if flush_now:
+            self.flush()
+
+    def _take(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        return pending
+
+    def flush(self):
+        """Apply every buffered receipt; returns the number of rows updated"""
+        updated = 0
+        for (kind, reader_id, sender_id), up_to_id in self._take().items():
+            updated += self.MARKERS[kind](reader_id, sender_id, up_to_id)
+        return updated
+
+    def _flush_in_thread(self):
+        close_old_connections()
+        try:
+            self.flush()
+        finally:
+            close_old_connections()
+
+
+read_receipts = ReadReceiptBuffer(
+    flush_interval=settings.READ_RECEIPT_FLUSH_INTERVAL,
+    max_pending=settings.READ_RECEIPT_MAX_PENDING,
+)
+atexit.register(read_receipts.flush)
@@ -0,0 +1,242 @@
+"""Recurring meetings, expanded lazily.
+
+A MeetingSeries stores its rule once: a first start, a frequency (weekly,
+every two weeks or monthly on the same day, RRULE FREQ=WEEKLY/INTERVAL=2/
+MONTHLY), an optional end (until or count) and cancelled starts (EXDATE).
+Occurrences are computed for the window being looked at, jumping straight
+to it instead of walking from the first one, in the server time zone so
+the wall-clock time holds across DST changes. An occurrence becomes a
+Meeting row (series and occurrence_start set) only when it is edited,
+accepted or completed; expansion skips starts that have a row, so each
+occurrence appears once.
+"""
+from bisect import bisect_left, bisect_right
+from calendar import monthrange
+from datetime import datetime, timedelta
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from .models import User, Meeting, MeetingSeries
+from .scheduling import (
+    MAX_MEETING_DURATION, BLOCKING_STATUSES, Slot, MeetingConflict,
+    blocking_meetings, slot_end, find_slot_conflicts
+)
+
+# Days of occurrences listed when no window is asked for
+DEFAULT_EXPANSION_DAYS = 30
+
+# Longest window a listing expands series over, in days
+MAX_EXPANSION_DAYS = 366
+
+WEEKS = {MeetingSeries.Frequency.WEEKLY: 1, MeetingSeries.Frequency.BIWEEKLY: 2}
+
+
+def exdates(series):
+    return {parse_datetime(value) for value in series.exdates}
+
+
+def _nth(series, first, index):
+    """Start of occurrence index, or None for a month without that day"""
+    if series.frequency in WEEKS:
+        day = first.date() + timedelta(weeks=index * WEEKS[series.frequency])
+    else:
+        month = first.month - 1 + index
+        year, month = first.year + month // 12, month % 12 + 1
+        if first.day > monthrange(year, month)[1]:
+            return None
+        day = first.date().replace(year=year, month=month, day=first.day)
+    return timezone.make_aware(datetime.combine(day, first.time()))
+
+
+def _first_index(series, first, start):
+    """An occurrence index no later than the first one at or after start"""
+    if start <= series.start_at:
+        return 0
+    if series.frequency in WEEKS:
+        index = (start - series.start_at).days // (7 * WEEKS[series.frequency])
+    else:
+        local = timezone.localtime(start)
+        index = (local.year - first.year) * 12 + local.month - first.month
+    # One step back covers DST shifts of the wall-clock time
+    return max(index - 1, 0)
+
+
+def occurrences(series, start, end, skip=()):
+    """Starts of the series' occurrences in [start, end), minus cancelled
+    ones and those in skip"""
+    first = timezone.localtime(series.start_at)
+    cancelled = exdates(series)
+    index = _first_index(series, first, start)
+    while series.count is None or index < series.count:
+        occurrence = _nth(series, first, index)
+        index += 1
+        if occurrence is None or occurrence < start:
+            continue
+        if occurrence >= end or (series.until and occurrence > series.until):
+            return
+        if occurrence not in cancelled and occurrence not in skip:
+            yield occurrence
+
+
+def expand(series_list, start, end):
+    """Unsaved Meetings for the occurrences of series_list in [start, end)
+    that have no row yet, sorted by start"""
+    series_list = list(series_list)
+    if not series_list:
+        return []
+    stored = set(Meeting.objects.filter(
+        series__in=series_list,
+        occurrence_start__gte=start,
+        occurrence_start__lt=end,
+    ).values_list('series_id', 'occurrence_start'))
+    meetings = []
+    for series in series_list:
+        skip = {occurrence for series_id, occurrence in stored if series_id == series.pk}
+        for occurrence in occurrences(series, start, end, skip):
+            meetings.append(occurrence_meeting(series, occurrence))
+    meetings.sort(key=lambda meeting: meeting.scheduled_at)
+    return meetings
+
+
+def occurrence_meeting(series, occurrence):
+    return Meeting(
+        mentor_id=series.mentor_id,
+        mentee_id=series.mentee_id,
+        title=series.title,
+        description=series.description,
+        scheduled_at=occurrence,
+        duration=series.duration,
+        status=series.status,
+        series=series,
+        occurrence_start=occurrence,
+    )
+
+
+def series_for(user):
+    if user.role == 'admin':
+        return MeetingSeries.objects.all()
+    return MeetingSeries.objects.filter(Q(mentor=user) | Q(mentee=user))
+
+
+def blocking_series(user_ids):
+    return MeetingSeries.objects.filter(
+        Q(mentor_id__in=user_ids) | Q(mentee_id__in=user_ids),
+        status__in=BLOCKING_STATUSES,
+    )
+
+
+def blocking_occurrences(user_ids, start, end, exclude_series=None):
+    """(mentor_id, mentee_id, start, duration) of unstored occurrences of
+    blocking series of user_ids overlapping [start, end)"""
+    series_list = blocking_series(user_ids)
+    if exclude_series is not None:
+        series_list = series_list.exclude(pk=exclude_series)
+    return [
+        (meeting.mentor_id, meeting.mentee_id, meeting.scheduled_at, meeting.duration)
+        for meeting in expand(series_list, start - timedelta(minutes=MAX_MEETING_DURATION), end)
+        if slot_end(meeting.scheduled_at, meeting.duration) > start
+    ]
+
+
+def occurrence_conflicts(slots, exclude_series=None):
+    """For each Slot, the ids of blocking series with an unstored
+    occurrence overlapping it for its mentor or mentee"""
+    if not slots:
+        return []
+    user_ids = {slot.mentor_id for slot in slots} | {slot.mentee_id for slot in slots}
+    series_list = blocking_series(user_ids)
+    if exclude_series is not None:
+        series_list = series_list.exclude(pk=exclude_series)
+    busy = expand(
+        series_list,
+        min(slot.start for slot in slots) - timedelta(minutes=MAX_MEETING_DURATION),
+        max(slot_end(slot.start, slot.duration) for slot in slots),
+    )
+    starts = [meeting.scheduled_at for meeting in busy]
+    lookback = timedelta(minutes=MAX_MEETING_DURATION)
+
+    results = []
+    for slot in slots:
+        end = slot_end(slot.start, slot.duration)
+        conflicts = {
+            meeting.series_id
+            for meeting in busy[bisect_right(starts, slot.start - lookback):bisect_left(starts, end)]
+            if slot_end(meeting.scheduled_at, meeting.duration) > slot.start
+            and {meeting.mentor_id, meeting.mentee_id} & {slot.mentor_id, slot.mentee_id}
+        }
+        results.append(sorted(conflicts))
+    return results
+
+
+def ensure_series_free(series):
+    """Raise MeetingConflict if an occurrence of a blocking series in the
+    coming MAX_EXPANSION_DAYS overlaps another meeting or series of its
+    mentor or mentee
+
+    Like scheduling.ensure_no_conflict, must run inside the saving
+    transaction.
+    """
+    if series.status not in BLOCKING_STATUSES:
+        return
+    list(User.objects.select_for_update().filter(pk__in=[series.mentor_id, series.mentee_id]).order_by('pk'))
+    start = max(series.start_at, timezone.now())
+    slots = [
+        Slot(occurrence, series.duration, series.mentor_id, series.mentee_id)
+        for occurrence in occurrences(series, start, start + timedelta(days=MAX_EXPANSION_DAYS))
+    ]
+    meetings = blocking_meetings()
+    if series.pk:
+        meetings = meetings.exclude(series=series.pk)
+    conflicts = sorted({pk for found in find_slot_conflicts(meetings, slots) for pk in found})
+    series_conflicts = sorted({
+        pk for found in occurrence_conflicts(slots, exclude_series=series.pk) for pk in found
+    })
+    if conflicts or series_conflicts:
+        raise MeetingConflict(conflicts, series_conflicts)
+
+
+def ensure_no_occurrence_conflict(mentor_id, mentee_id, start, duration):
+    """Raise MeetingConflict if a meeting slot overlaps an occurrence of a
+    blocking series of either participant"""
+    series_conflicts = occurrence_conflicts([Slot(start, duration, mentor_id, mentee_id)])[0]
+    if series_conflicts:
+        raise MeetingConflict([], series_conflicts)
+
+
+def materialize(series, occurrence_start):
+    """The Meeting row of an occurrence, created from the series if needed
+
+    Raises ValueError if occurrence_start isn't a live occurrence.
+    """
+    with transaction.atomic():
+        meeting = Meeting.objects.filter(series=series, occurrence_start=occurrence_start).first()
+        if meeting is not None:
+            return meeting
+        # Lock the series so an occurrence is stored once and not while cancelled
+        series = MeetingSeries.objects.select_for_update().get(pk=series.pk)
+        if not any(occurrences(series, occurrence_start, occurrence_start + timedelta(seconds=1))):
+            raise ValueError('Not an occurrence of this series')
+        meeting, _ = Meeting.objects.get_or_create(
+            series=series,
+            occurrence_start=occurrence_start,
+            defaults={
+                'mentor_id': series.mentor_id,
+                'mentee_id': series.mentee_id,
+                'title': series.title,
+                'description': series.description,
+                'scheduled_at': occurrence_start,
+                'duration': series.duration,
+                'status': series.status,
+            },
+        )
+    return meeting
+
+
+def cancel_occurrence(series_id, occurrence_start):
+    """Leave an occurrence out of its series from now on"""
+    with transaction.atomic():
+        series = MeetingSeries.objects.select_for_update().get(pk=series_id)
+        if occurrence_start not in exdates(series):
+            series.exdates = [*series.exdates, occurrence_start.isoformat()]
+            series.save(update_fields=['exdates', 'updated_at'])
@@ -0,0 +1,222 @@
+"""Meeting reminders from a timer heap.
+
+ReminderScheduler keeps the reminders due within the next `lookahead` in a
+min-heap keyed on reminder time (meeting start minus `lead`). Each tick:
+
+- rows changed since the updated_at watermark are read (an index range on
+  updated_at) and pushed again; the superseded heap entry is skipped when
+  popped, so a rescheduled meeting never has to be found in the heap;
+- due entries are popped, re-read in one query and reminded in batches
+  through notify_many, and the meetings' reminded_at is set;
+- once the horizon is half used up, the next window is loaded with one
+  range query on (status, scheduled_at).
+
+No tick reads more than the rows that changed or fell due. Unstored
+occurrences of recurring meetings are reminded too; having no row to mark,
+they are recognised by their notification's source_key instead.
+"""
+import heapq
+from datetime import timedelta
+from itertools import count
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+from .models import Meeting, MeetingSeries, Notification
+from .notifications import notify_many
+from .recurrence import expand
+from .scheduling import BLOCKING_STATUSES
+
+# Rows committed slightly out of updated_at order are still picked up by
+# re-reading this far behind the watermark
+WATERMARK_OVERLAP = timedelta(seconds=5)
+
+
+def occurrence_key(series_id, start):
+    return f'meeting-reminder:series:{series_id}:{int(start.timestamp())}'
+
+
+def reminder_key(meeting):
+    """Heap and source_key identity of a stored meeting or an occurrence"""
+    if meeting.pk is not None:
+        return f'meeting-reminder:{meeting.pk}'
+    return occurrence_key(meeting.series_id, meeting.scheduled_at)
+
+
+def _reminder_notifications(meeting, key):
+    when = f'{timezone.localtime(meeting.scheduled_at):%Y-%m-%d %H:%M}'
+    return [
+        Notification(
+            user_id=user_id,
+            notification_type=Notification.MEETING,
+            title=f'Upcoming: {meeting.title}',
+            message=f'Your meeting starts at {when}',
+            source_key=key,
+        )
+        for user_id in (meeting.mentor_id, meeting.mentee_id)
+    ]
+
+
+class ReminderScheduler:
+    def __init__(self, lead=timedelta(minutes=30), lookahead=timedelta(hours=6), batch_size=500):
+        self.lead = lead
+        self.lookahead = lookahead
+        self.batch_size = batch_size
+        self.heap = []
+        # Reminder time of each key's live heap entry; others are stale
+        self.scheduled = {}
+        # key -> unsaved occurrence, for reminders that have no row
+        self.occurrences = {}
+        self.sequence = count()
+        self.horizon = None
+        self.watermark = None
+        self.series_watermark = None
+
+    def _push(self, key, remind_at):
+        if self.scheduled.get(key) == remind_at:
+            return
+        self.scheduled[key] = remind_at
+        heapq.heappush(self.heap, (remind_at, next(self.sequence), key))
+
+    def _forget(self, key):
+        self.scheduled.pop(key, None)
+        self.occurrences.pop(key, None)
+
+    def _track(self, meeting, now):
+        """Schedule, reschedule or drop the reminder of a meeting"""
+        key = reminder_key(meeting)
+        remind_at = meeting.scheduled_at - self.lead
+        if (meeting.status not in BLOCKING_STATUSES or meeting.reminded_at is not None
+                or meeting.scheduled_at <= now or remind_at >= self.horizon):
+            self._forget(key)
+            return
+        if meeting.pk is None:
+            self.occurrences[key] = meeting
+        self._push(key, remind_at)
+
+    def _track_series(self, series_list, now):
+        for occurrence in expand(series_list, now, self.horizon + self.lead):
+            self._track(occurrence, now)
+
+    def load(self, now=None):
+        """Rebuild the heap with the reminders due before now + lookahead"""
+        now = now or timezone.now()
+        self.heap, self.scheduled, self.occurrences = [], {}, {}
+        self.horizon = now + self.lookahead
+        # Read the watermarks first so changes made during the load are seen again
+        self.watermark = Meeting.objects.aggregate(latest=Max('updated_at'))['latest'] or now
+        self.series_watermark = MeetingSeries.objects.aggregate(latest=Max('updated_at'))['latest'] or now
+        upcoming = Meeting.objects.filter(
+            status__in=BLOCKING_STATUSES,
+            scheduled_at__gt=now,
+            scheduled_at__lt=self.horizon + self.lead,
+            reminded_at__isnull=True,
+        ).only('pk', 'scheduled_at', 'status', 'reminded_at')
+        for meeting in upcoming:
+            self._track(meeting, now)
+        self._track_series(MeetingSeries.objects.filter(status__in=BLOCKING_STATUSES), now)
+
+    def refresh(self, now=None):
+        """Pick up meetings and series changed since the last look"""
+        now = now or timezone.now()
+        changed = Meeting.objects.filter(
+            updated_at__gte=self.watermark - WATERMARK_OVERLAP
+        ).only('pk', 'scheduled_at', 'status', 'reminded_at', 'updated_at', 'series', 'occurrence_start')
+        for meeting in changed:
+            self.watermark = max(self.watermark, meeting.updated_at)
+            if meeting.series_id and meeting.occurrence_start:
+                # A stored occurrence is reminded as a meeting from now on
+                self._forget(occurrence_key(meeting.series_id, meeting.occurrence_start))
+            self._track(meeting, now)
+
+        changed_series = list(MeetingSeries.objects.filter(
+            updated_at__gte=self.series_watermark - WATERMARK_OVERLAP
+        ))
+        if changed_series:
+            self.series_watermark = max(series.updated_at for series in changed_series)
+            ids = {series.pk for series in changed_series}
+            # Drop what the old rules produced, then expand the current ones
+            for key in [key for key, meeting in self.occurrences.items() if meeting.series_id in ids]:
+                self._forget(key)
+            self._track_series([s for s in changed_series if s.status in BLOCKING_STATUSES], now)
+
+    def pop_due(self, now=None):
+        """Keys of the reminders due by now, at most batch_size of them"""
+        now = now or timezone.now()
+        due = []
+        while self.heap and self.heap[0][0] <= now and len(due) < self.batch_size:
+            remind_at, _, key = heapq.heappop(self.heap)
+            if self.scheduled.get(key) == remind_at:
+                del self.scheduled[key]
+                due.append(key)
+        return due
+
+    def fire(self, keys, now=None):
+        """Send the reminders of keys; returns how many meetings were reminded"""
+        now = now or timezone.now()
+        occurrences = [self.occurrences.pop(key) for key in keys if key in self.occurrences]
+        meeting_ids = [int(key.rsplit(':', 1)[1]) for key in keys if not key.startswith('meeting-reminder:series:')]
+
+        lock_kwargs = {}
+        if connection.features.has_select_for_update_skip_locked:
+            lock_kwargs['skip_locked'] = True
+
+        with transaction.atomic():
+            # Re-read: the meeting may have changed since it was queued, and
+            # skip_locked leaves rows another scheduler is reminding to it
+            meetings = list(
+                Meeting.objects.select_for_update(**lock_kwargs).filter(
+                    pk__in=meeting_ids,
+                    status__in=BLOCKING_STATUSES,
+                    reminded_at__isnull=True,
+                    scheduled_at__gt=now,
+                    scheduled_at__lte=now + self.lead,
+                )
+            )
+            if occurrences:
+                # Skip occurrences reminded before a restart or stored since;
+                # user and type keep this on the notification source index
+                participants = {occurrence.mentor_id for occurrence in occurrences} \
+                    | {occurrence.mentee_id for occurrence in occurrences}
+                sent = set(Notification.objects.filter(
+                    user_id__in=participants,
+                    notification_type=Notification.MEETING,
+                    source_key__in=[reminder_key(occurrence) for occurrence in occurrences],
+                ).values_list('source_key', flat=True))
+                sent.update(
+                    occurrence_key(series_id, start)
+                    for series_id, start in Meeting.objects.filter(
+                        series_id__in={occurrence.series_id for occurrence in occurrences},
+                        occurrence_start__in=[occurrence.scheduled_at for occurrence in occurrences],
+                    ).values_list('series_id', 'occurrence_start')
+                )
+                occurrences = [
+                    occurrence for occurrence in occurrences
+                    if reminder_key(occurrence) not in sent and occurrence.scheduled_at > now
+                ]
+
+            notify_many([
+                notification
+                for meeting in meetings + occurrences
+                for notification in _reminder_notifications(meeting, reminder_key(meeting))
+            ])
+            # update() leaves updated_at alone, so this doesn't come back through refresh()
+            Meeting.objects.filter(pk__in=[meeting.pk for meeting in meetings]).update(reminded_at=now)
+        return len(meetings) + len(occurrences)
+
+    def tick(self, now=None):
+        """Reload or refresh, then send everything due; returns reminders sent"""
+        now = now or timezone.now()
+        if self.horizon is None or now >= self.horizon - self.lookahead / 2:
+            self.load(now)
+        else:
+            self.refresh(now)
+        sent = 0
+        while True:
+            due = self.pop_due(now)
+            if not due:
+                return sent
+            sent += self.fire(due, now)
+
+    def next_due(self):
+        """Reminder time of the earliest heap entry (possibly stale), or None"""
+        return self.heap[0][0] if self.heap else None
@@ -0,0 +1,109 @@
+"""Meeting overlap detection.
+
+A meeting blocks [scheduled_at, scheduled_at + duration) for both its
+mentor and its mentee. Durations are capped at MAX_MEETING_DURATION, so
+anything overlapping a slot starts less than that long before the slot
+begins. Finding overlaps is then one range scan per participant on the
+(mentor, scheduled_at) and (mentee, scheduled_at) indexes, never a scan of
+all meetings. Works on any meeting model with mentor, mentee, scheduled_at
+and duration fields.
+"""
+from bisect import bisect_left, bisect_right
+from collections import defaultdict, namedtuple
+from datetime import timedelta
+from django.db.models import Q
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from .models import User, Meeting
+
+# Longest meeting accepted, in minutes
+MAX_MEETING_DURATION = 8 * 60
+
+# Statuses of main-app meetings that occupy their time slot
+BLOCKING_STATUSES = (Meeting.Status.PENDING, Meeting.Status.ACCEPTED)
+
+# Most slots checked in one request
+MAX_CHECKED_SLOTS = 500
+
+Slot = namedtuple('Slot', ['start', 'duration', 'mentor_id', 'mentee_id'])
+
+
+class MeetingConflict(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = 'The meeting overlaps another meeting of the mentor or mentee.'
+    default_code = 'meeting_conflict'
+
+    def __init__(self, conflicts, series_conflicts=None):
+        super().__init__()
+        # Set after __init__ so the ids aren't turned into strings
+        self.detail = {'detail': self.detail, 'conflicts': conflicts}
+        if series_conflicts:
+            self.detail['series_conflicts'] = series_conflicts
+
+
+def blocking_meetings():
+    """Main-app meetings that occupy their slot"""
+    return Meeting.objects.filter(status__in=BLOCKING_STATUSES)
+
+
+def slot_end(start, duration):
+    return start + timedelta(minutes=duration)
+
+
+def find_slot_conflicts(meetings, slots, exclude_pk=None):
+    """Return, for each slot, the sorted ids of meetings overlapping it for
+    its mentor or mentee
+
+    meetings is a queryset of the meetings that block a slot. All slots are
+    answered from one range query spanning them.
+    """
+    if not slots:
+        return []
+    user_ids = {slot.mentor_id for slot in slots} | {slot.mentee_id for slot in slots}
+    user_ids.discard(None)
+    lookback = timedelta(minutes=MAX_MEETING_DURATION)
+
+    rows = meetings.filter(
+        Q(mentor_id__in=user_ids) | Q(mentee_id__in=user_ids),
+        scheduled_at__gt=min(slot.start for slot in slots) - lookback,
+        scheduled_at__lt=max(slot_end(slot.start, slot.duration) for slot in slots),
+    )
+    if exclude_pk is not None:
+        rows = rows.exclude(pk=exclude_pk)
+
+    # Each participant's meetings, ordered by start
+    by_user = defaultdict(list)
+    for row in rows.order_by('scheduled_at').values_list('pk', 'mentor_id', 'mentee_id', 'scheduled_at', 'duration'):
+        for user_id in {row[1], row[2]} & user_ids:
+            by_user[user_id].append(row)
+    starts = {user_id: [row[3] for row in user_rows] for user_id, user_rows in by_user.items()}
+
+    results = []
+    for slot in slots:
+        end = slot_end(slot.start, slot.duration)
+        conflicts = set()
+        for user_id in (slot.mentor_id, slot.mentee_id):
+            if user_id not in by_user:
+                continue
+            first = bisect_right(starts[user_id], slot.start - lookback)
+            last = bisect_left(starts[user_id], end)
+            for pk, _, _, scheduled_at, duration in by_user[user_id][first:last]:
+                if slot_end(scheduled_at, duration) > slot.start:
+                    conflicts.add(pk)
+        results.append(sorted(conflicts))
+    return results
+
+
+def ensure_no_conflict(meetings, mentor_id, mentee_id, start, duration, exclude_pk=None):
+    """Raise MeetingConflict if the slot overlaps a meeting of either participant
+
+    Must run inside the transaction that saves the meeting: both users'
+    rows are locked so concurrent bookings for them are checked one at a
+    time.
+    """
+    list(User.objects.select_for_update().filter(pk__in=[mentor_id, mentee_id]).order_by('pk'))
+    conflicts = find_slot_conflicts(
+        meetings, [Slot(start, duration, mentor_id, mentee_id)], exclude_pk=exclude_pk
+    )[0]
+    if conflicts:
+        raise MeetingConflict(conflicts)
@@ -0,0 +1,104 @@
+"""Full-text search over messages and communications.
+
+Backed by the indexes created in migration 0010: MySQL FULLTEXT in boolean
+mode, SQLite FTS5 elsewhere. Every term is matched as a prefix and must be
+present; results are ordered by relevance and restricted to rows the
+searching user sent or received. Other backends fall back to LIKE.
+"""
+import re
+from functools import reduce
+from operator import and_, or_
+from django.db import connection
+from django.db.models import Q
+from .models import Message, Communication
+
+# Cap on the number of words taken from a query
+MAX_SEARCH_TERMS = 8
+
+SEARCH_RESULT_LIMIT = 20
+MAX_SEARCH_RESULT_LIMIT = 100
+
+MESSAGE_INDEX = ('message_fts', ('content',))
+COMMUNICATION_INDEX = ('communication_fts', ('message_content', 'meeting_agenda', 'notes'))
+
+
+def search_terms(query):
+    """Split a query into the lower-cased words that are searched for"""
+    return re.findall(r'\w+', query.lower())[:MAX_SEARCH_TERMS]
+
+
+def _ranked_ids(model, index, user_id, terms, limit):
+    """[(pk, score)] of the best matches visible to user_id, best first"""
+    index_name, columns = index
+    quote = connection.ops.quote_name
+    table = quote(model._meta.db_table)
+    visible = f'({table}.sender_id = %s OR {table}.receiver_id = %s)'
+
+    if connection.vendor == 'mysql':
+        match = 'MATCH({}) AGAINST (%s IN BOOLEAN MODE)'.format(
+            ', '.join(f'{table}.{quote(column)}' for column in columns)
+        )
+        expression = ' '.join(f'+{term}*' for term in terms)
+        sql = (
+            f'SELECT {table}.id, {match} AS score FROM {table} '
+            f'WHERE {match} AND {visible} ORDER BY score DESC, {table}.id DESC LIMIT %s'
+        )
+        params = [expression, expression, user_id, user_id, limit]
+    else:
+        expression = ' '.join(f'"{term}"*' for term in terms)
+        # bm25() is lower for better matches
+        sql = (
+            f'SELECT {table}.id, -bm25({index_name}) AS score FROM {index_name} '
+            f'JOIN {table} ON {table}.id = {index_name}.rowid '
+            f'WHERE {index_name} MATCH %s AND {visible} '
+            f'ORDER BY bm25({index_name}), {table}.id DESC LIMIT %s'
+        )
+        params = [expression, user_id, user_id, limit]
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchall()
+
+
+def _like_search(model, index, user_id, terms, limit):
+    _, columns = index
+    matches = [
+        reduce(or_, (Q(**{f'{column}__icontains': term}) for column in columns))
+        for term in terms
+    ]
+    rows = (
+        model.objects.filter(Q(sender_id=user_id) | Q(receiver_id=user_id), reduce(and_, matches))
+        .order_by('-pk')
+        .values_list('pk', flat=True)[:limit]
+    )
+    return [(pk, None) for pk in rows]
+
+
+def _search(model, index, user, query, limit):
+    terms = search_terms(query)
+    if not terms:
+        return []
+    if connection.vendor in ('mysql', 'sqlite'):
+        ranked = _ranked_ids(model, index, user.pk, terms, limit)
+    else:
+        ranked = _like_search(model, index, user.pk, terms, limit)
+
+    objects = model.objects.in_bulk([pk for pk, _ in ranked])
+    results = []
+    for pk, score in ranked:
+        if pk in objects:
+            objects[pk].score = score
+            results.append(objects[pk])
+    return results
+
+
+def search_messages(user, query, limit=SEARCH_RESULT_LIMIT):
+    """Messages sent or received by user matching query, best match first;
+    each one carries its relevance as .score"""
+    return _search(Message, MESSAGE_INDEX, user, query, limit)
+
+
+def search_communications(user, query, limit=SEARCH_RESULT_LIMIT):
+    """Communications sent or received by user matching query in their content,
+    meeting agenda or notes, best match first"""
+    return _search(Communication, COMMUNICATION_INDEX, user, query, limit)
@@ -1,7 +1,15 @@
+import re
+from datetime import time
 from rest_framework import serializers
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from django.contrib.auth import get_user_model
-from .models import User, Mentor, Mentee, Admin
+from django.conf import settings
+from .models import (
+    User, Mentor, Mentee, Admin, Message, Communication, BroadcastJob, Conversation,
+    NotificationDigest, Attachment, Upload, Meeting, MeetingSeries
+)
+from .scheduling import MAX_MEETING_DURATION, MAX_CHECKED_SLOTS
+from .availability import parse_timetable, from_weekly_slots
 
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
@@ -81,4 +89,246 @@ class AdminProfileSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Admin
-        fields = ('id', 'user', 'privileges') 
\ No newline at end of file
+        fields = ('id', 'user', 'privileges') 
+
+class MessageSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Message
+        fields = ('id', 'sender', 'receiver', 'content', 'is_read', 'created_at')
+        read_only_fields = ('id', 'sender', 'is_read', 'created_at')
+
+class BroadcastJobSerializer(serializers.ModelSerializer):
+    progress = serializers.SerializerMethodField()
+
+    class Meta:
+        model = BroadcastJob
+        fields = ('id', 'sender', 'message_content', 'attached_file', 'attachment', 'audience', 'department',
+                 'status', 'total_recipients', 'processed_recipients', 'progress',
+                 'error', 'created_at', 'finished_at')
+        read_only_fields = ('id', 'sender', 'status', 'total_recipients', 'processed_recipients',
+                           'error', 'created_at', 'finished_at')
+
+    def get_progress(self, obj):
+        if obj.status == BroadcastJob.Status.COMPLETED:
+            return 1.0
+        if not obj.total_recipients:
+            return 0.0
+        return min(obj.processed_recipients / obj.total_recipients, 1.0)
+
+    def validate(self, data):
+        if data.get('audience') == BroadcastJob.Audience.DEPARTMENT and not data.get('department'):
+            raise serializers.ValidationError("A department broadcast needs a department")
+        return data
+
+class ConversationSerializer(serializers.ModelSerializer):
+    """A conversation seen from the requesting user (context['request'])"""
+    other_user = serializers.SerializerMethodField()
+    last_message = MessageSerializer(read_only=True)
+    unread_count = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Conversation
+        fields = ('id', 'other_user', 'last_message', 'last_activity_at', 'unread_count')
+
+    def get_other_user(self, obj):
+        other = obj.other_user(self.context['request'].user)
+        return {
+            'id': other.id,
+            'name': f"{other.first_name} {other.last_name}",
+            'email': other.email,
+            'role': other.role,
+            'profile_picture': other.profile_picture
+        }
+
+    def get_unread_count(self, obj):
+        return obj.unread_for(self.context['request'].user)
+
+class ReadUpToSerializer(serializers.Serializer):
+    """Everything another user sent up to and including message/communication up_to"""
+    user = serializers.IntegerField(min_value=1)
+    up_to = serializers.IntegerField(min_value=1)
+
+class NotificationReadSerializer(serializers.Serializer):
+    """Notification ids to mark as read; all of them when omitted"""
+    ids = serializers.ListField(child=serializers.IntegerField(min_value=1), required=False,
+                                max_length=1000)
+
+class CommunicationSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Communication
+        fields = ('id', 'sender', 'receiver', 'message_content', 'message_status', 'attached_file',
+                 'attachment', 'timestamp', 'type', 'meeting_date', 'meeting_time', 'meeting_mode',
+                 'meeting_status', 'meeting_agenda', 'notes')
+
+class MessageSearchResultSerializer(MessageSerializer):
+    score = serializers.FloatField(read_only=True, allow_null=True)
+
+    class Meta(MessageSerializer.Meta):
+        fields = MessageSerializer.Meta.fields + ('score',)
+
+class CommunicationSearchResultSerializer(CommunicationSerializer):
+    score = serializers.FloatField(read_only=True, allow_null=True)
+
+    class Meta(CommunicationSerializer.Meta):
+        fields = CommunicationSerializer.Meta.fields + ('score',)
+
+class NotificationDigestSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = NotificationDigest
+        fields = ('id', 'date', 'total', 'summary', 'created_at')
+
+class AttachmentSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Attachment
+        fields = ('id', 'owner', 'filename', 'content_type', 'size', 'created_at')
+
+class UploadSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Upload
+        fields = ('id', 'filename', 'content_type', 'size', 'sha256', 'offset', 'status', 'attachment',
+                 'created_at', 'updated_at')
+        read_only_fields = ('id', 'offset', 'status', 'attachment', 'created_at', 'updated_at')
+
+    def validate_size(self, value):
+        if value <= 0:
+            raise serializers.ValidationError("Size must be positive")
+        if value > settings.ATTACHMENT_MAX_SIZE:
+            raise serializers.ValidationError(
+                f"Attachments may not exceed {settings.ATTACHMENT_MAX_SIZE} bytes"
+            )
+        return value
+
+    def validate_sha256(self, value):
+        value = value.lower()
+        if value and not re.fullmatch(r'[0-9a-f]{64}', value):
+            raise serializers.ValidationError("sha256 must be 64 hexadecimal characters")
+        return value
+
+class MeetingSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Meeting
+        fields = ('id', 'mentor', 'mentee', 'title', 'description', 'scheduled_at', 'duration',
+                 'status', 'series', 'occurrence_start', 'created_at', 'updated_at')
+        read_only_fields = ('id', 'series', 'occurrence_start', 'created_at', 'updated_at')
+        extra_kwargs = {'mentor': {'required': False}, 'mentee': {'required': False}}
+
+    def validate_duration(self, value):
+        if not 0 < value <= MAX_MEETING_DURATION:
+            raise serializers.ValidationError(
+                f"Duration must be between 1 and {MAX_MEETING_DURATION} minutes"
+            )
+        return value
+
+    def validate(self, data):
+        # The participants are fixed once the meeting exists
+        if self.instance is not None:
+            for field in ('mentor', 'mentee'):
+                if field in data and data[field] != getattr(self.instance, field):
+                    raise serializers.ValidationError({field: "The participants of a meeting can't be changed"})
+        return data
+
+class MeetingSeriesSerializer(serializers.ModelSerializer):
+    exdates = serializers.ListField(child=serializers.DateTimeField(), required=False)
+
+    class Meta:
+        model = MeetingSeries
+        fields = ('id', 'mentor', 'mentee', 'title', 'description', 'start_at', 'duration',
+                 'frequency', 'until', 'count', 'exdates', 'status', 'created_at', 'updated_at')
+        read_only_fields = ('id', 'created_at', 'updated_at')
+        extra_kwargs = {'mentor': {'required': False}, 'mentee': {'required': False}}
+
+    validate_duration = MeetingSerializer.validate_duration
+
+    def validate_exdates(self, value):
+        return [moment.isoformat() for moment in value]
+
+    def validate(self, data):
+        start_at = data.get('start_at', getattr(self.instance, 'start_at', None))
+        until = data.get('until', getattr(self.instance, 'until', None))
+        if until and start_at and until < start_at:
+            raise serializers.ValidationError("until must not be before start_at")
+        return MeetingSerializer.validate(self, data)
+
+class OccurrenceSerializer(serializers.Serializer):
+    occurrence_start = serializers.DateTimeField()
+
+class SlotSerializer(serializers.Serializer):
+    scheduled_at = serializers.DateTimeField()
+    duration = serializers.IntegerField(min_value=1, max_value=MAX_MEETING_DURATION)
+    mentee = serializers.IntegerField(required=False)
+
+class SlotCheckSerializer(serializers.Serializer):
+    """Proposed slots for the scheduler UI; mentor defaults to the current user"""
+    mentor = serializers.IntegerField(required=False)
+    slots = SlotSerializer(many=True, allow_empty=False, max_length=MAX_CHECKED_SLOTS)
+
+class AutoScheduleSerializer(serializers.Serializer):
+    """A round of one-on-ones; slots are duration minutes long within
+    day_start-day_end on the given weekdays (0 = Monday)"""
+    mentor = serializers.IntegerField(required=False)
+    start_date = serializers.DateField()
+    end_date = serializers.DateField()
+    duration = serializers.IntegerField(min_value=5, max_value=MAX_MEETING_DURATION)
+    day_start = serializers.TimeField(default=time(9, 0))
+    day_end = serializers.TimeField(default=time(17, 0))
+    weekdays = serializers.ListField(
+        child=serializers.IntegerField(min_value=0, max_value=6), default=[0, 1, 2, 3, 4]
+    )
+    title = serializers.CharField(max_length=255, default='One-on-one')
+    skip_scheduled = serializers.BooleanField(default=True)
+
+    def validate(self, data):
+        if data['end_date'] < data['start_date']:
+            raise serializers.ValidationError("end_date must not be before start_date")
+        if (data['end_date'] - data['start_date']).days > 92:
+            raise serializers.ValidationError("A round may span at most 92 days")
+        if data['day_end'] <= data['day_start']:
+            raise serializers.ValidationError("day_end must be after day_start")
+        return data
+
+class MeetingRequestReviewSerializer(serializers.Serializer):
+    """Meeting request ids to accept and to reject; accepted requests become
+    meetings of duration minutes"""
+    accept = serializers.ListField(child=serializers.IntegerField(min_value=1), default=list,
+                                   max_length=MAX_CHECKED_SLOTS)
+    reject = serializers.ListField(child=serializers.IntegerField(min_value=1), default=list,
+                                   max_length=MAX_CHECKED_SLOTS)
+    duration = serializers.IntegerField(min_value=5, max_value=MAX_MEETING_DURATION, default=30)
+
+    def validate(self, data):
+        if not data['accept'] and not data['reject']:
+            raise serializers.ValidationError("Nothing to accept or reject")
+        if set(data['accept']) & set(data['reject']):
+            raise serializers.ValidationError("A request can't be both accepted and rejected")
+        return data
+
+class AvailabilitySlotSerializer(serializers.Serializer):
+    """Available from start to end on weekday (0 = Monday); an end of 00:00
+    means midnight at the end of the day"""
+    weekday = serializers.IntegerField(min_value=0, max_value=6)
+    start = serializers.TimeField()
+    end = serializers.TimeField()
+
+    def validate(self, data):
+        if data['end'] != time(0, 0) and data['end'] <= data['start']:
+            raise serializers.ValidationError("end must be after start")
+        return data
+
+class AvailabilitySerializer(serializers.Serializer):
+    """Weekly availability as slots, or as timetable text to be parsed"""
+    slots = AvailabilitySlotSerializer(many=True, required=False)
+    timetable = serializers.CharField(required=False)
+
+    def validate(self, data):
+        if ('slots' in data) == ('timetable' in data):
+            raise serializers.ValidationError("Send either slots or timetable")
+        if 'timetable' in data:
+            bitmap = parse_timetable(data['timetable'])
+            if bitmap is None:
+                raise serializers.ValidationError({'timetable': "Could not understand the timetable"})
+        else:
+            bitmap = from_weekly_slots(
+                (slot['weekday'], slot['start'], slot['end']) for slot in data['slots']
+            )
+        data['bitmap'] = bitmap
+        return data
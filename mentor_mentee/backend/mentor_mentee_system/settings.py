@@ -44,7 +44,7 @@ INSTALLED_APPS = [
     'rest_framework_simplejwt',
     
     # Local apps
-    'mentor_mentee_system',
+    'mentor_mentee_system.app_config.MentorMenteeSystemConfig',
 ]
 
 MIDDLEWARE = [
@@ -77,6 +77,11 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'mentor_mentee_system.wsgi.application'
+ASGI_APPLICATION = 'mentor_mentee_system.asgi.application'
+
+# Pub/sub backend used to push events to WebSocket connections. The default
+# only reaches sockets held by the same process.
+REALTIME_BACKEND = os.getenv('REALTIME_BACKEND', 'mentor_mentee_system.realtime.InProcessBackend')
 
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
@@ -96,6 +101,54 @@ DATABASES = {
     }
 }
 
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# Local-memory by default; point DJANGO_CACHE_LOCATION at a directory to share
+# the cache between worker processes through the file-based backend.
+
+if os.getenv('DJANGO_CACHE_LOCATION'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.getenv('DJANGO_CACHE_LOCATION'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'mentor-mentee',
+        }
+    }
+
+# Seconds a cached mentor dashboard may live before it is rebuilt even if no
+# invalidation signal arrived
+DASHBOARD_CACHE_TIMEOUT = int(os.getenv('DASHBOARD_CACHE_TIMEOUT', '300'))
+
+# Seconds the admin cohort dashboard is served from cache
+ADMIN_DASHBOARD_CACHE_TIMEOUT = int(os.getenv('ADMIN_DASHBOARD_CACHE_TIMEOUT', '60'))
+
+# Read receipts are coalesced in memory and applied at most this many seconds
+# later, or as soon as this many conversations are waiting
+READ_RECEIPT_FLUSH_INTERVAL = float(os.getenv('READ_RECEIPT_FLUSH_INTERVAL', '1.0'))
+READ_RECEIPT_MAX_PENDING = int(os.getenv('READ_RECEIPT_MAX_PENDING', '500'))
+
+# Seconds during which notifications of the same type and source are merged
+# into a single unread row
+NOTIFICATION_COALESCE_WINDOW = int(os.getenv('NOTIFICATION_COALESCE_WINDOW', '3600'))
+
+# Seconds a rendered calendar feed is cached (meeting changes drop it sooner),
+# and seconds calendar apps are told they may reuse it without asking
+CALENDAR_FEED_CACHE_TIMEOUT = int(os.getenv('CALENDAR_FEED_CACHE_TIMEOUT', '3600'))
+CALENDAR_FEED_MAX_AGE = int(os.getenv('CALENDAR_FEED_MAX_AGE', '300'))
+
+# Days of past meetings included in calendar feeds
+CALENDAR_FEED_PAST_DAYS = int(os.getenv('CALENDAR_FEED_PAST_DAYS', '30'))
+
+# Years past the last series end (or now) that a feed's VTIMEZONE covers,
+# when TIME_ZONE isn't UTC
+CALENDAR_FEED_TIMEZONE_YEARS = int(os.getenv('CALENDAR_FEED_TIMEZONE_YEARS', '5'))
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -118,6 +171,17 @@ USE_TZ = True
 STATIC_URL = '/static/'
 STATIC_ROOT = BASE_DIR / 'static'
 
+# Uploaded attachments, stored outside the static files
+ATTACHMENT_ROOT = Path(os.getenv('ATTACHMENT_ROOT', BASE_DIR / 'attachments'))
+
+# Largest attachment accepted, and largest chunk accepted per upload request
+ATTACHMENT_MAX_SIZE = int(os.getenv('ATTACHMENT_MAX_SIZE', str(512 * 1024 * 1024)))
+ATTACHMENT_MAX_CHUNK_SIZE = int(os.getenv('ATTACHMENT_MAX_CHUNK_SIZE', str(16 * 1024 * 1024)))
+
+# When set (e.g. '/protected-attachments/'), downloads are handed to nginx via
+# X-Accel-Redirect to an internal location aliased to ATTACHMENT_ROOT
+ATTACHMENT_ACCEL_REDIRECT_PREFIX = os.getenv('ATTACHMENT_ACCEL_REDIRECT_PREFIX')
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
@@ -0,0 +1,205 @@
+from collections import Counter
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_init, post_save, post_delete
+from django.dispatch import receiver
+from .models import (
+    Mentor, Mentee, MentorStats, Meeting, MeetingSeries, Message, Achievement, Notification,
+    Attachment, Blob
+)
+from .dashboard import invalidate_mentor_dashboards, invalidate_dashboards_for_mentors
+from .calendar_feed import invalidate_calendar_feeds
+from .stats import adjust_mentor_stats, adjust_mentor_stats_for_user
+from .unread import adjust_unread
+from .conversations import record_message, adjust_conversation_unread, forget_message
+from . import realtime
+
+# Fields whose previous value the handlers below need to see after a save
+TRACKED_FIELDS = {
+    Mentee: ('mentor_id',),
+    Meeting: ('mentor_id', 'mentee_id', 'status'),
+    Message: ('is_read',),
+    Notification: ('is_read',),
+    Achievement: ('mentor_id',),
+}
+
+
+def _remember(instance):
+    # Read straight from __dict__ so deferred fields don't trigger a query
+    instance._original = {
+        field: instance.__dict__.get(field) for field in TRACKED_FIELDS[type(instance)]
+    }
+
+
+def _original(instance, field):
+    return getattr(instance, '_original', {}).get(field)
+
+
+@receiver(post_init, sender=Mentee)
+@receiver(post_init, sender=Meeting)
+@receiver(post_init, sender=Message)
+@receiver(post_init, sender=Achievement)
+@receiver(post_init, sender=Notification)
+def remember_original_values(sender, instance, **kwargs):
+    _remember(instance)
+
+
+@receiver(post_save, sender=Mentor)
+def create_mentor_stats(sender, instance, created, **kwargs):
+    if created:
+        MentorStats.objects.get_or_create(mentor=instance)
+
+
+def _mentee_moved(old, new):
+    if old != new:
+        with transaction.atomic():
+            adjust_mentor_stats(old, total_mentees=-1)
+            adjust_mentor_stats(new, total_mentees=1)
+    invalidate_dashboards_for_mentors([old, new])
+
+
+@receiver(post_save, sender=Mentee)
+def mentee_saved(sender, instance, created, **kwargs):
+    old = None if created else _original(instance, 'mentor_id')
+    _mentee_moved(old, instance.mentor_id)
+    _remember(instance)
+
+
+@receiver(post_delete, sender=Mentee)
+def mentee_deleted(sender, instance, **kwargs):
+    _mentee_moved(_original(instance, 'mentor_id'), None)
+
+
+def _achievement_moved(old, new):
+    if old != new:
+        with transaction.atomic():
+            adjust_mentor_stats(old, recent_achievements=-1)
+            adjust_mentor_stats(new, recent_achievements=1)
+    invalidate_dashboards_for_mentors([old, new])
+
+
+@receiver(post_save, sender=Achievement)
+def achievement_saved(sender, instance, created, **kwargs):
+    old = None if created else _original(instance, 'mentor_id')
+    _achievement_moved(old, instance.mentor_id)
+    _remember(instance)
+
+
+@receiver(post_delete, sender=Achievement)
+def achievement_deleted(sender, instance, **kwargs):
+    _achievement_moved(_original(instance, 'mentor_id'), None)
+
+
+def _meeting_changed(old, new):
+    """old and new are (mentor_id, status) pairs, None when absent"""
+    pending = Counter()
+    if old and old[1] == Meeting.Status.PENDING:
+        pending[old[0]] -= 1
+    if new and new[1] == Meeting.Status.PENDING:
+        pending[new[0]] += 1
+
+    with transaction.atomic():
+        for mentor_user_id, delta in pending.items():
+            adjust_mentor_stats_for_user(mentor_user_id, upcoming_meetings=delta)
+    invalidate_mentor_dashboards([pair[0] for pair in (old, new) if pair])
+
+
+@receiver(post_save, sender=Meeting)
+def meeting_saved(sender, instance, created, **kwargs):
+    old = None if created else (_original(instance, 'mentor_id'), _original(instance, 'status'))
+    _meeting_changed(old, (instance.mentor_id, instance.status))
+    invalidate_calendar_feeds([
+        instance.mentor_id, instance.mentee_id,
+        _original(instance, 'mentor_id'), _original(instance, 'mentee_id')
+    ])
+    _remember(instance)
+
+
+@receiver(post_delete, sender=Meeting)
+def meeting_deleted(sender, instance, **kwargs):
+    _meeting_changed((_original(instance, 'mentor_id'), _original(instance, 'status')), None)
+    invalidate_calendar_feeds([instance.mentor_id, instance.mentee_id])
+
+
+@receiver(post_save, sender=MeetingSeries)
+@receiver(post_delete, sender=MeetingSeries)
+def meeting_series_changed(sender, instance, **kwargs):
+    # Series aren't reassigned to other users, so the current pair suffices
+    invalidate_calendar_feeds([instance.mentor_id, instance.mentee_id])
+
+
+def _message_read_state_changed(message, was_unread, is_unread, created=False, deleted=False):
+    if was_unread != is_unread:
+        delta = 1 if is_unread else -1
+        with transaction.atomic():
+            adjust_mentor_stats_for_user(message.receiver_id, unread_messages=delta)
+            adjust_unread(message.receiver_id, create_missing=not deleted, messages=delta)
+            # record_message and forget_message handle the conversation then
+            if not created and not deleted:
+                adjust_conversation_unread(message, delta)
+    invalidate_mentor_dashboards([message.receiver_id])
+
+
+@receiver(post_save, sender=Message)
+def message_saved(sender, instance, created, **kwargs):
+    was_unread = not created and _original(instance, 'is_read') is False
+    if created:
+        record_message(instance)
+    _message_read_state_changed(instance, was_unread, not instance.is_read, created=created)
+    if created:
+        realtime.publish([instance.sender_id, instance.receiver_id], 'message.created', {
+            'id': instance.id,
+            'sender': instance.sender_id,
+            'receiver': instance.receiver_id,
+            'content': instance.content,
+            'is_read': instance.is_read,
+            'created_at': instance.created_at,
+        })
+    elif was_unread and instance.is_read:
+        realtime.publish([instance.sender_id], 'message.read', {
+            'id': instance.id,
+            'reader': instance.receiver_id,
+        })
+    _remember(instance)
+
+
+@receiver(post_delete, sender=Message)
+def message_deleted(sender, instance, **kwargs):
+    was_unread = _original(instance, 'is_read') is False
+    _message_read_state_changed(instance, was_unread, False, deleted=True)
+    forget_message(instance, was_unread)
+
+
+def _notification_read_state_changed(notification, was_unread, is_unread, deleted=False):
+    if was_unread != is_unread:
+        adjust_unread(
+            notification.user_id, create_missing=not deleted,
+            notifications=1 if is_unread else -1
+        )
+
+
+@receiver(post_save, sender=Notification)
+def notification_saved(sender, instance, created, **kwargs):
+    was_unread = not created and _original(instance, 'is_read') is False
+    _notification_read_state_changed(instance, was_unread, not instance.is_read)
+    if created:
+        realtime.publish([instance.user_id], 'notification.created',
+                         realtime.notification_data(instance))
+    _remember(instance)
+
+
+@receiver(post_delete, sender=Notification)
+def notification_deleted(sender, instance, **kwargs):
+    _notification_read_state_changed(instance, _original(instance, 'is_read') is False, False, deleted=True)
+
+
+@receiver(post_save, sender=Attachment)
+def attachment_saved(sender, instance, created, **kwargs):
+    if created:
+        Blob.objects.filter(pk=instance.blob_id).update(ref_count=F('ref_count') + 1)
+
+
+@receiver(post_delete, sender=Attachment)
+def attachment_deleted(sender, instance, **kwargs):
+    # Never below zero, even if the counter drifted; collect_garbage repairs it
+    Blob.objects.filter(pk=instance.blob_id, ref_count__gt=0).update(ref_count=F('ref_count') - 1)
@@ -0,0 +1,111 @@
+"""Server-Sent Events stream of notifications for clients without WebSockets.
+
+Connections subscribe to the same realtime hub as the WebSocket endpoint,
+so an idle stream costs a queue and a timer, not a database cursor; the
+database is only read once per connection to replay what was missed since
+the Last-Event-ID the browser sends when it reconnects. Like the WebSocket
+endpoint this needs the ASGI application (asgi.py).
+"""
+import asyncio
+import json
+
+from asgiref.sync import sync_to_async
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse, StreamingHttpResponse
+from .models import Notification
+from .realtime import authenticate_token, get_backend, notification_data
+
+# Seconds of silence after which a comment line keeps proxies from closing the stream
+HEARTBEAT_INTERVAL = 15
+
+# Reconnection delay suggested to the browser, in milliseconds
+RETRY_INTERVAL = 5000
+
+# Notifications replayed on reconnect; beyond that the client is told to resync
+BACKFILL_LIMIT = 100
+
+
+def _format_event(event, data, event_id=None):
+    lines = []
+    if event_id is not None:
+        lines.append(f'id: {event_id}')
+    lines.append(f'event: {event}')
+    lines.append(f'data: {data}')
+    return '\n'.join(lines) + '\n\n'
+
+
+def _notification_event(data):
+    return _format_event('notification', json.dumps(data, cls=DjangoJSONEncoder), event_id=data['id'])
+
+
+def _missed_notifications(user_id, last_event_id):
+    """Payloads of the notifications created after last_event_id, oldest first"""
+    notifications = Notification.objects.filter(user_id=user_id, pk__gt=last_event_id).order_by('pk')
+    return [notification_data(notification) for notification in notifications[:BACKFILL_LIMIT + 1]]
+
+
+def _last_event_id(request):
+    raw = request.headers.get('Last-Event-ID') or request.GET.get('last_event_id')
+    try:
+        return int(raw) if raw else None
+    except ValueError:
+        return None
+
+
+async def _stream(user_id, last_event_id):
+    # Subscribe before reading the backlog so nothing created in between is lost
+    subscription = get_backend().subscribe(user_id)
+    try:
+        yield f'retry: {RETRY_INTERVAL}\n\n'
+
+        last_id = last_event_id or 0
+        if last_event_id is not None:
+            missed = await sync_to_async(_missed_notifications)(user_id, last_event_id)
+            if len(missed) > BACKFILL_LIMIT:
+                yield _format_event('resync', '{}')
+            else:
+                for data in missed:
+                    yield _notification_event(data)
+            if missed:
+                last_id = missed[-1]['id']
+
+        while True:
+            try:
+                text = await asyncio.wait_for(subscription.get(), HEARTBEAT_INTERVAL)
+            except asyncio.TimeoutError:
+                yield ': heartbeat\n\n'
+                continue
+
+            event = json.loads(text)
+            if event['type'] == 'resync':
+                yield _format_event('resync', '{}')
+            elif event['type'] == 'notification.created' and event['data']['id'] > last_id:
+                last_id = event['data']['id']
+                yield _notification_event(event['data'])
+    finally:
+        subscription.close()
+
+
+async def notification_stream(request):
+    """Stream the current user's new notifications as text/event-stream
+
+    EventSource can't send headers, so the access token may also be passed
+    as ?token=.
+    """
+    raw_token = request.GET.get('token')
+    authorization = request.headers.get('Authorization', '')
+    if authorization.startswith('Bearer '):
+        raw_token = authorization[len('Bearer '):]
+
+    user_id = await sync_to_async(authenticate_token)(raw_token)
+    if user_id is None:
+        return JsonResponse({'detail': 'Authentication credentials were not provided'}, status=401)
+
+    response = StreamingHttpResponse(
+        _stream(user_id, _last_event_id(request)),
+        content_type='text/event-stream',
+    )
+    response['Cache-Control'] = 'no-cache'
+    # Stop nginx from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
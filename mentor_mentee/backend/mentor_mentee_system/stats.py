@@ -0,0 +1,97 @@
+from django.db import transaction
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value, F
+from django.db.models.functions import Coalesce
+from .models import Mentor, MentorStats, Meeting, Message, Achievement
+
+STAT_FIELDS = ('total_mentees', 'unread_messages', 'upcoming_meetings', 'recent_achievements')
+
+
+def count_subquery(queryset, group_field):
+    """Correlated COUNT(*) over queryset, usable as an annotation"""
+    counts = (
+        queryset.order_by()
+        .values(group_field)
+        .annotate(total=Count('pk'))
+        .values('total')
+    )
+    return Coalesce(Subquery(counts, output_field=IntegerField()), Value(0))
+
+
+def annotate_mentor_stats(queryset):
+    """Annotate every STAT_FIELDS counter onto a Mentor queryset"""
+    return queryset.annotate(
+        total_mentees=Count('mentee'),
+        unread_messages=count_subquery(
+            Message.objects.filter(receiver=OuterRef('user_id'), is_read=False),
+            'receiver',
+        ),
+        upcoming_meetings=count_subquery(
+            Meeting.objects.filter(mentor=OuterRef('user_id'), status=Meeting.Status.PENDING),
+            'mentor',
+        ),
+        recent_achievements=count_subquery(
+            Achievement.objects.filter(mentor=OuterRef('pk')),
+            'mentor',
+        ),
+    )
+
+
+def _apply(queryset, deltas):
+    changes = {field: F(field) + delta for field, delta in deltas.items() if delta}
+    if changes:
+        queryset.update(**changes)
+
+
+def adjust_mentor_stats(mentor_id, **deltas):
+    """Add deltas to the counters of the mentor with this Mentor primary key"""
+    if mentor_id:
+        _apply(MentorStats.objects.filter(mentor_id=mentor_id), deltas)
+
+
+def adjust_mentor_stats_for_user(user_id, **deltas):
+    """Add deltas to the counters of the mentor whose User id is user_id"""
+    if user_id:
+        _apply(MentorStats.objects.filter(mentor__user_id=user_id), deltas)
+
+
+def rebuild_mentor_stats(queryset=None, batch_size=500):
+    """Recompute MentorStats from scratch for every mentor in queryset
+
+    Mentors are processed in primary key order, batch_size at a time; each
+    batch costs one aggregate query plus one bulk write per table.
+    Returns the number of mentors rebuilt.
+    """
+    if queryset is None:
+        queryset = Mentor.objects.all()
+    queryset = queryset.order_by('pk')
+
+    rebuilt = 0
+    last_pk = 0
+    while True:
+        rows = list(
+            annotate_mentor_stats(queryset.filter(pk__gt=last_pk))
+            .values('pk', *STAT_FIELDS)[:batch_size]
+        )
+        if not rows:
+            break
+        last_pk = rows[-1]['pk']
+
+        with transaction.atomic():
+            existing = MentorStats.objects.select_for_update().in_bulk(
+                [row['pk'] for row in rows], field_name='mentor_id'
+            )
+            to_update, to_create = [], []
+            for row in rows:
+                values = {field: row[field] for field in STAT_FIELDS}
+                stats = existing.get(row['pk'])
+                if stats is None:
+                    to_create.append(MentorStats(mentor_id=row['pk'], **values))
+                else:
+                    for field, value in values.items():
+                        setattr(stats, field, value)
+                    to_update.append(stats)
+            MentorStats.objects.bulk_update(to_update, STAT_FIELDS)
+            MentorStats.objects.bulk_create(to_create)
+
+        rebuilt += len(rows)
+    return rebuilt
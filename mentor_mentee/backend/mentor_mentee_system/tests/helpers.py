@@ -0,0 +1,28 @@
+from rest_framework.test import APIClient
+from ..models import User, Mentor, Mentee, MentorStats
+
+
+def make_user(username, role):
+    return User.objects.create_user(
+        username=username, email=f'{username}@example.com', password='password', role=role,
+        first_name=username.title(), last_name='Test'
+    )
+
+
+def make_mentor(username='mentor'):
+    user = make_user(username, 'mentor')
+    mentor = Mentor.objects.create(user=user, department='CS')
+    MentorStats.objects.get_or_create(mentor=mentor)
+    return user
+
+
+def make_mentee(mentor_user, username='mentee'):
+    user = make_user(username, 'mentee')
+    Mentee.objects.create(user=user, mentor=mentor_user.mentor, course='BTech', year=1, attendance=90)
+    return user
+
+
+def client_for(user):
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
@@ -0,0 +1,120 @@
+import hashlib
+import shutil
+import tempfile
+from pathlib import Path
+from django.conf import settings
+from django.test import TestCase, override_settings
+from ..attachments import collect_garbage
+from ..models import Attachment, Blob, Communication, Upload
+from .helpers import make_mentor, make_mentee, client_for
+
+CONTENT = b'minutes of the meeting\n' * 100
+SHA256 = hashlib.sha256(CONTENT).hexdigest()
+
+
+class AttachmentTestCase(TestCase):
+    def setUp(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+        settings_override = override_settings(ATTACHMENT_ROOT=Path(root))
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.mentor = make_mentor()
+        self.owner = make_mentee(self.mentor, 'owner')
+        self.other = make_mentee(self.mentor, 'other')
+
+    def create_upload(self, user, sha256=SHA256, size=len(CONTENT)):
+        return client_for(user).post('/api/attachments/uploads/', {
+            'filename': 'notes.txt', 'content_type': 'text/plain', 'size': size, 'sha256': sha256,
+        }, format='json')
+
+    def send(self, user, upload_id, data, offset=0):
+        return client_for(user).generic(
+            'PATCH', f'/api/attachments/uploads/{upload_id}/', data,
+            content_type='application/offset+octet-stream', HTTP_UPLOAD_OFFSET=str(offset)
+        )
+
+    def upload(self, user, data=CONTENT):
+        response = self.create_upload(user, hashlib.sha256(data).hexdigest(), len(data))
+        if response.data['status'] == Upload.Status.UPLOADING:
+            response = self.send(user, response.data['id'], data)
+        return response.data['attachment']
+
+
+class DedupTests(AttachmentTestCase):
+    def test_bytes_are_stored_once(self):
+        first = self.upload(self.owner)
+        second = self.upload(self.other)
+        self.assertNotEqual(first, second)
+        self.assertEqual(Blob.objects.count(), 1)
+        self.assertEqual(Blob.objects.get().ref_count, 2)
+
+    def test_owner_may_skip_sending_known_bytes(self):
+        self.upload(self.owner)
+        response = self.create_upload(self.owner)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['status'], Upload.Status.COMPLETE)
+
+    def test_hash_alone_does_not_give_others_the_bytes(self):
+        self.upload(self.owner)
+        response = self.create_upload(self.other)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['status'], Upload.Status.UPLOADING)
+        self.assertIsNone(response.data['attachment'])
+        self.assertFalse(Attachment.objects.filter(owner=self.other).exists())
+
+    def test_bytes_not_matching_the_hash_are_refused(self):
+        self.upload(self.owner)
+        response = self.create_upload(self.other)
+        forged = b'x' * len(CONTENT)
+        response = self.send(self.other, response.data['id'], forged)
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Attachment.objects.filter(owner=self.other).exists())
+        self.assertEqual(Blob.objects.get().ref_count, 1)
+
+
+class DownloadTests(AttachmentTestCase):
+    def test_range_request(self):
+        attachment = self.upload(self.owner)
+        response = client_for(self.owner).get(
+            f'/api/attachments/{attachment}/download/', HTTP_RANGE='bytes=0-9'
+        )
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b''.join(response.streaming_content), CONTENT[:10])
+
+    def test_others_cannot_download(self):
+        attachment = self.upload(self.owner)
+        response = client_for(self.other).get(f'/api/attachments/{attachment}/download/')
+        self.assertEqual(response.status_code, 404)
+
+
+class DeleteTests(AttachmentTestCase):
+    def test_blob_is_freed_after_its_last_attachment_is_deleted(self):
+        first = self.upload(self.owner)
+        second = self.upload(self.other)
+        blob = Blob.objects.get()
+        path = settings.ATTACHMENT_ROOT / blob.path
+
+        self.assertEqual(client_for(self.owner).delete(f'/api/attachments/{first}/').status_code, 204)
+        blob.refresh_from_db()
+        self.assertEqual(blob.ref_count, 1)
+        self.assertEqual(collect_garbage(), (0, 0))
+
+        self.assertEqual(client_for(self.other).delete(f'/api/attachments/{second}/').status_code, 204)
+        self.assertEqual(collect_garbage(), (1, 0))
+        self.assertFalse(Blob.objects.exists())
+        self.assertFalse(path.exists())
+
+    def test_only_the_uploader_may_delete(self):
+        attachment = self.upload(self.owner)
+        Communication.objects.create(sender=self.owner, receiver=self.other, attachment_id=attachment)
+        response = client_for(self.other).delete(f'/api/attachments/{attachment}/')
+        self.assertEqual(response.status_code, 403)
+        self.assertTrue(Attachment.objects.filter(pk=attachment).exists())
+
+    def test_ref_count_does_not_go_below_zero(self):
+        attachment = self.upload(self.owner)
+        Blob.objects.update(ref_count=0)
+        Attachment.objects.get(pk=attachment).delete()
+        self.assertEqual(Blob.objects.get().ref_count, 0)
@@ -0,0 +1,98 @@
+from datetime import date, time, timedelta
+from importlib import import_module
+from django.apps import apps
+from django.test import SimpleTestCase, TestCase
+from ..availability import (
+    parse_timetable, slot_range, weekly_slots, from_weekly_slots, to_bitmap,
+    meeting_mask, week_start_of, free_busy
+)
+from ..models import Meeting, Mentor
+from .helpers import make_mentor, make_mentee, client_for
+
+frozen = import_module('mentor_mentee_system.migrations.0015_availability')
+
+
+def hours(weekday, start, end):
+    return slot_range(weekday, time(*start), time(*end))
+
+
+class ParseTimetableTests(SimpleTestCase):
+    def test_documented_formats(self):
+        weekdays_10_to_4 = 0
+        for day in range(5):
+            weekdays_10_to_4 |= hours(day, (10,), (16,))
+        self.assertEqual(parse_timetable('Monday-Friday: 10 AM - 4 PM'), weekdays_10_to_4)
+
+        mon_wed = 0
+        for day in (0, 2):
+            mon_wed |= hours(day, (9, 30), (12,)) | hours(day, (14,), (16,))
+        self.assertEqual(parse_timetable('Mon, Wed 9:30am-12pm, 2pm-4pm'), mon_wed)
+
+        afternoons = 0
+        for day in range(5):
+            afternoons |= hours(day, (14,), (16,))
+        self.assertEqual(parse_timetable('Weekdays: 14:00 - 16:00'), afternoons)
+
+    def test_dotted_times(self):
+        expected = hours(0, (9, 30), (12,))
+        for text in ('Mon 9.30am-12pm', 'Mon 9.30 a.m. - 12 p.m.', 'Mon 9.30-12.00', 'Mon 9:30a.m.-noon'):
+            with self.subTest(text=text):
+                self.assertEqual(parse_timetable(text), expected)
+
+    def test_several_entries(self):
+        self.assertEqual(
+            parse_timetable('Sat & Sun noon to 6pm; Fri 9-11'),
+            hours(5, (12,), (18,)) | hours(6, (12,), (18,)) | hours(4, (9,), (11,))
+        )
+
+    def test_unparseable_text(self):
+        for text in ('', 'By appointment', 'Mon 13pm-2pm', 'Funday 9-5'):
+            with self.subTest(text=text):
+                self.assertIsNone(parse_timetable(text))
+
+    def test_migration_parser_matches(self):
+        for text in ('Monday-Friday: 10 AM - 4 PM', 'Mon, Wed 9:30am-12pm, 2pm-4pm', 'Mon 9.30am-12pm',
+                     'Weekdays: 14:00 - 16:00', 'By appointment'):
+            with self.subTest(text=text):
+                self.assertEqual(frozen._parse_timetable(text), parse_timetable(text))
+
+
+class BitmapTests(SimpleTestCase):
+    def test_weekly_slots_round_trip(self):
+        bitmap = hours(0, (9,), (12,)) | hours(6, (22,), (0,)) | hours(0, (0,), (1,))
+        slots = weekly_slots(bitmap)
+        self.assertEqual(slots[0], (0, time(0), time(1)))
+        self.assertEqual(slots[-1], (6, time(22), time(0)))
+        self.assertEqual(from_weekly_slots(slots), bitmap)
+
+    def test_meeting_past_sunday_midnight_wraps(self):
+        sunday = week_start_of(date(2030, 1, 7)) + timedelta(days=6, hours=23, minutes=30)
+        mask = meeting_mask(sunday, 60)
+        self.assertEqual(mask, hours(6, (23, 30), (0,)) | ((1 << 2) - 1))
+
+
+class FreeBusyTests(TestCase):
+    def setUp(self):
+        self.mentor = make_mentor()
+        self.mentee = make_mentee(self.mentor)
+        self.week = week_start_of(date(2030, 1, 7))
+
+    def test_meeting_is_busy_and_outside_availability_is_not_free(self):
+        client_for(self.mentor).put('/api/availability/', {'timetable': 'Mon 9am-12pm'}, format='json')
+        Meeting.objects.create(
+            mentor=self.mentor, mentee=self.mentee, scheduled_at=self.week + timedelta(hours=10), duration=30
+        )
+        result = free_busy([self.mentor.pk], self.week)['users'][self.mentor.pk]
+        self.assertTrue(result['availability_known'])
+        self.assertEqual([(b['start'], b['end']) for b in result['busy']],
+                         [(self.week + timedelta(hours=10), self.week + timedelta(hours=10, minutes=30))])
+        self.assertEqual([(f['start'], f['end']) for f in result['free']], [
+            (self.week + timedelta(hours=9), self.week + timedelta(hours=10)),
+            (self.week + timedelta(hours=10, minutes=30), self.week + timedelta(hours=12)),
+        ])
+
+    def test_migration_fills_availability_from_timetable(self):
+        Mentor.objects.filter(user=self.mentor).update(timetable='Mon 9.30am-12pm')
+        frozen.parse_timetables(apps, None)
+        mentor = Mentor.objects.get(user=self.mentor)
+        self.assertEqual(to_bitmap(mentor.availability), hours(0, (9, 30), (12,)))
@@ -0,0 +1,60 @@
+from datetime import datetime, timedelta
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from ..models import Meeting, MeetingSeries
+from .helpers import make_mentor, make_mentee, client_for
+
+
+class CalendarFeedTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.mentor = make_mentor()
+        self.mentee = make_mentee(self.mentor)
+        self.mentor.calendar_id = 'feed-id'
+        self.mentor.save(update_fields=['calendar_id'])
+
+    def fetch(self, **headers):
+        return self.client.get('/api/calendar/feed-id.ics', **headers)
+
+    def add_series(self):
+        start = timezone.make_aware(datetime(2030, 1, 7, 9))
+        return MeetingSeries.objects.create(
+            mentor=self.mentor, mentee=self.mentee, start_at=start, frequency='weekly', title='Weekly'
+        )
+
+    def test_utc_series_times_need_no_time_zone(self):
+        self.add_series()
+        body = self.fetch().content.decode()
+        self.assertIn('DTSTART:20300107T090000Z', body)
+        self.assertNotIn('TZID', body)
+
+    @override_settings(TIME_ZONE='Europe/Berlin')
+    def test_local_series_times_come_with_their_time_zone(self):
+        self.add_series()
+        body = self.fetch().content.decode()
+        self.assertIn('DTSTART;TZID=Europe/Berlin:20300107T090000', body)
+        timezone_block = body[body.index('BEGIN:VTIMEZONE'):body.index('END:VTIMEZONE')]
+        self.assertIn('TZID:Europe/Berlin', timezone_block)
+        self.assertIn('BEGIN:DAYLIGHT\r\nDTSTART:20300331T020000\r\n'
+                      'TZOFFSETFROM:+0100\r\nTZOFFSETTO:+0200\r\nTZNAME:CEST', timezone_block)
+        self.assertLess(body.index('END:VTIMEZONE'), body.index('BEGIN:VEVENT'))
+
+    def test_unchanged_feed_is_not_modified(self):
+        response = self.fetch()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.fetch(HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+    def test_meeting_change_refreshes_the_feed(self):
+        etag = self.fetch()['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            Meeting.objects.create(
+                mentor=self.mentor, mentee=self.mentee, title='Review',
+                scheduled_at=timezone.now() + timedelta(days=1), duration=30
+            )
+        response = self.fetch(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('SUMMARY:Review', response.content.decode())
+
+    def test_unknown_calendar_id(self):
+        self.assertEqual(client_for(self.mentor).get('/api/calendar/other.ics').status_code, 404)
@@ -0,0 +1,67 @@
+from datetime import timedelta
+from django.test import TestCase
+from django.utils import timezone
+from ..models import Meeting, MeetingSeries
+from .helpers import make_mentor, make_mentee, client_for
+
+
+class MeetingListTests(TestCase):
+    def setUp(self):
+        self.mentor = make_mentor()
+        self.mentee = make_mentee(self.mentor)
+        self.client = client_for(self.mentor)
+        self.now = timezone.now().replace(microsecond=0)
+
+    def meeting(self, delta, **fields):
+        return Meeting.objects.create(
+            mentor=self.mentor, mentee=self.mentee, scheduled_at=self.now + delta, duration=30, **fields
+        )
+
+    def listed(self, **params):
+        response = self.client.get('/api/meetings/', params)
+        self.assertEqual(response.status_code, 200, response.data)
+        return [meeting['id'] for meeting in response.data['results']]
+
+    def test_default_window_is_the_coming_days(self):
+        self.meeting(-timedelta(days=3))
+        soon = self.meeting(timedelta(days=3))
+        self.meeting(timedelta(days=60))
+        self.assertEqual(self.listed(), [soon.pk])
+
+    def test_end_alone_looks_back_from_it(self):
+        self.meeting(-timedelta(days=60))
+        past = self.meeting(-timedelta(days=3))
+        self.meeting(timedelta(days=3))
+        self.assertEqual(self.listed(end=self.now.isoformat()), [past.pk])
+
+    def test_window_and_status(self):
+        accepted = self.meeting(timedelta(days=40), status=Meeting.Status.ACCEPTED)
+        self.meeting(timedelta(days=41), status=Meeting.Status.REJECTED)
+        self.meeting(timedelta(days=50), status=Meeting.Status.ACCEPTED)
+        params = {
+            'start': (self.now + timedelta(days=35)).isoformat(),
+            'end': (self.now + timedelta(days=45)).isoformat(),
+        }
+        self.assertEqual(self.listed(status='accepted,pending', **params), [accepted.pk])
+
+    def test_bad_window(self):
+        response = self.client.get('/api/meetings/', {
+            'start': self.now.isoformat(), 'end': (self.now - timedelta(days=1)).isoformat()
+        })
+        self.assertEqual(response.status_code, 400)
+
+    def test_pages_merge_stored_meetings_and_occurrences(self):
+        MeetingSeries.objects.create(
+            mentor=self.mentor, mentee=self.mentee, frequency='weekly',
+            start_at=self.now + timedelta(days=1), duration=30
+        )
+        for day in (1, 8, 15):
+            self.meeting(timedelta(days=day, hours=2))
+        starts = []
+        url, params = '/api/meetings/', {'page_size': 2}
+        while url:
+            response = self.client.get(url, params)
+            starts += [meeting['scheduled_at'] for meeting in response.data['results']]
+            url, params = response.data['next'], None
+        self.assertEqual(len(starts), 8)
+        self.assertEqual(starts, sorted(starts))
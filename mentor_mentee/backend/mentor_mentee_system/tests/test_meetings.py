@@ -0,0 +1,90 @@
+from datetime import timedelta
+from django.test import TestCase
+from django.utils import timezone
+from ..models import Meeting
+from .helpers import make_user, make_mentor, make_mentee, client_for
+
+
+class MeetingTestCase(TestCase):
+    def setUp(self):
+        self.mentor = make_mentor()
+        self.mentee = make_mentee(self.mentor)
+        self.other_mentor = make_mentor('other_mentor')
+        self.other_mentee = make_mentee(self.other_mentor, 'other_mentee')
+        self.start = (timezone.now() + timedelta(days=1)).replace(hour=10, minute=0, second=0, microsecond=0)
+
+    def book(self, user, start=None, duration=30, **fields):
+        return client_for(user).post('/api/meetings/', {
+            'mentee': self.mentee.pk, 'scheduled_at': (start or self.start).isoformat(), 'duration': duration,
+            **fields,
+        }, format='json')
+
+
+class ConflictTests(MeetingTestCase):
+    def test_overlapping_meeting_is_refused(self):
+        self.assertEqual(self.book(self.mentor).status_code, 201)
+        response = self.book(self.mentor, self.start + timedelta(minutes=15))
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data['conflicts'], [Meeting.objects.get().pk])
+
+    def test_adjacent_meeting_is_accepted(self):
+        self.assertEqual(self.book(self.mentor).status_code, 201)
+        self.assertEqual(self.book(self.mentor, self.start + timedelta(minutes=30)).status_code, 201)
+
+    def test_rejected_meetings_do_not_block(self):
+        self.book(self.mentor)
+        Meeting.objects.update(status=Meeting.Status.REJECTED)
+        self.assertEqual(self.book(self.mentor).status_code, 201)
+
+    def test_check_slots(self):
+        self.book(self.mentor)
+        response = client_for(self.mentor).post('/api/meetings/check-slots/', {'slots': [
+            {'scheduled_at': self.start.isoformat(), 'duration': 30, 'mentee': self.mentee.pk},
+            {'scheduled_at': (self.start + timedelta(hours=1)).isoformat(), 'duration': 30},
+        ]}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([slot['available'] for slot in response.data], [False, True])
+
+
+class OwnershipTests(MeetingTestCase):
+    def test_mentor_cannot_book_someone_elses_mentee(self):
+        response = self.book(self.mentor, mentee=self.other_mentee.pk)
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Meeting.objects.exists())
+
+    def test_mentee_cannot_book_another_mentor(self):
+        response = client_for(self.mentee).post('/api/meetings/', {
+            'mentor': self.other_mentor.pk, 'scheduled_at': self.start.isoformat(), 'duration': 30,
+        }, format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_participants_cannot_be_changed(self):
+        meeting = self.book(self.mentor).data['id']
+        for user, field, value in [
+            (self.mentor, 'mentee', self.other_mentee.pk),
+            (self.mentee, 'mentor', self.other_mentor.pk),
+        ]:
+            response = client_for(user).patch(f'/api/meetings/{meeting}/', {field: value}, format='json')
+            self.assertEqual(response.status_code, 400)
+        meeting = Meeting.objects.get()
+        self.assertEqual((meeting.mentor, meeting.mentee), (self.mentor, self.mentee))
+
+    def test_check_slots_is_limited_to_own_mentees(self):
+        slot = {'scheduled_at': self.start.isoformat(), 'duration': 30}
+        client = client_for(self.mentor)
+        response = client.post('/api/meetings/check-slots/', {
+            'mentor': self.other_mentor.pk, 'slots': [slot]
+        }, format='json')
+        self.assertEqual(response.status_code, 403)
+        response = client.post('/api/meetings/check-slots/', {
+            'slots': [{**slot, 'mentee': self.other_mentee.pk}]
+        }, format='json')
+        self.assertEqual(response.status_code, 403)
+
+    def test_admin_may_check_any_mentor(self):
+        admin = make_user('admin', 'admin')
+        response = client_for(admin).post('/api/meetings/check-slots/', {
+            'mentor': self.other_mentor.pk,
+            'slots': [{'scheduled_at': self.start.isoformat(), 'duration': 30, 'mentee': self.other_mentee.pk}],
+        }, format='json')
+        self.assertEqual(response.status_code, 200)
@@ -0,0 +1,101 @@
+from datetime import datetime, timedelta
+from django.test import TestCase
+from django.utils import timezone
+from ..models import Meeting, MeetingSeries
+from ..recurrence import occurrences, expand, materialize
+from .helpers import make_mentor, make_mentee, client_for
+
+
+def aware(*args):
+    return timezone.make_aware(datetime(*args))
+
+
+class OccurrenceTests(TestCase):
+    def setUp(self):
+        self.mentor = make_mentor()
+        self.mentee = make_mentee(self.mentor)
+
+    def series(self, **fields):
+        return MeetingSeries.objects.create(mentor=self.mentor, mentee=self.mentee, **fields)
+
+    def test_monthly_skips_months_without_the_day(self):
+        series = self.series(start_at=aware(2030, 1, 31, 9), frequency='monthly')
+        starts = list(occurrences(series, aware(2030, 1, 1), aware(2030, 8, 1)))
+        self.assertEqual([start.month for start in starts], [1, 3, 5, 7])
+
+    def test_window_far_from_the_start(self):
+        series = self.series(start_at=aware(2030, 1, 7, 9), frequency='biweekly')
+        starts = list(occurrences(series, aware(2031, 1, 1), aware(2031, 2, 1)))
+        self.assertEqual([start.date().isoformat() for start in starts], ['2031-01-06', '2031-01-20'])
+
+    def test_count_until_and_exdates(self):
+        series = self.series(start_at=aware(2030, 1, 7, 9), frequency='weekly', count=4,
+                             exdates=[aware(2030, 1, 14, 9).isoformat()])
+        self.assertEqual(len(list(occurrences(series, aware(2030, 1, 1), aware(2031, 1, 1)))), 3)
+        series = self.series(start_at=aware(2030, 1, 7, 10), frequency='weekly', until=aware(2030, 1, 21, 10))
+        self.assertEqual(len(list(occurrences(series, aware(2030, 1, 1), aware(2031, 1, 1)))), 3)
+
+    def test_stored_occurrences_are_not_expanded_again(self):
+        series = self.series(start_at=aware(2030, 1, 7, 9), frequency='weekly')
+        materialize(series, aware(2030, 1, 14, 9))
+        expanded = expand([series], aware(2030, 1, 1), aware(2030, 2, 1))
+        self.assertEqual([meeting.scheduled_at.day for meeting in expanded], [7, 21, 28])
+
+    def test_materialize_refuses_other_starts(self):
+        series = self.series(start_at=aware(2030, 1, 7, 9), frequency='weekly')
+        with self.assertRaises(ValueError):
+            materialize(series, aware(2030, 1, 8, 9))
+
+
+class SeriesApiTests(TestCase):
+    def setUp(self):
+        self.mentor = make_mentor()
+        self.mentee = make_mentee(self.mentor)
+        self.start = (timezone.now() + timedelta(days=1)).replace(hour=10, minute=0, second=0, microsecond=0)
+
+    def create(self, user, **fields):
+        return client_for(user).post('/api/meeting-series/', {
+            'start_at': self.start.isoformat(), 'duration': 60, 'frequency': 'weekly', **fields
+        }, format='json')
+
+    def test_series_without_mentee_is_a_bad_request(self):
+        response = self.create(self.mentor)
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(MeetingSeries.objects.exists())
+
+    def test_series_with_someone_elses_mentee_is_refused(self):
+        other = make_mentee(make_mentor('other_mentor'), 'other_mentee')
+        self.assertEqual(self.create(self.mentor, mentee=other.pk).status_code, 400)
+
+    def test_meeting_over_an_occurrence_is_refused(self):
+        self.assertEqual(self.create(self.mentor, mentee=self.mentee.pk).status_code, 201)
+        response = client_for(self.mentor).post('/api/meetings/', {
+            'mentee': self.mentee.pk, 'duration': 30,
+            'scheduled_at': (self.start + timedelta(weeks=2, minutes=30)).isoformat(),
+        }, format='json')
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data['series_conflicts'], [MeetingSeries.objects.get().pk])
+
+    def test_overlapping_series_is_refused(self):
+        self.create(self.mentor, mentee=self.mentee.pk)
+        response = self.create(self.mentor, mentee=self.mentee.pk, start_at=(self.start + timedelta(weeks=1)).isoformat())
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(MeetingSeries.objects.count(), 1)
+
+    def test_changing_and_cancelling_occurrences(self):
+        series = self.create(self.mentor, mentee=self.mentee.pk).data['id']
+        client = client_for(self.mentee)
+        second = (self.start + timedelta(weeks=1)).isoformat()
+        response = client.patch(f'/api/meeting-series/{series}/occurrence/', {
+            'occurrence_start': second, 'status': 'accepted'
+        }, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Meeting.objects.get().status, Meeting.Status.ACCEPTED)
+
+        third = (self.start + timedelta(weeks=2)).isoformat()
+        response = client.delete(f'/api/meeting-series/{series}/occurrence/', {'occurrence_start': third}, format='json')
+        self.assertEqual(response.status_code, 204)
+        starts = [meeting.scheduled_at for meeting in expand(
+            MeetingSeries.objects.all(), self.start, self.start + timedelta(weeks=4)
+        )]
+        self.assertEqual(starts, [self.start, self.start + timedelta(weeks=3)])
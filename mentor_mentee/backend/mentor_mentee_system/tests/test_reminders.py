@@ -0,0 +1,57 @@
+from datetime import timedelta
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from ..models import Meeting, MeetingSeries, Notification
+from ..reminders import ReminderScheduler
+from .helpers import make_mentor, make_mentee
+
+
+class ReminderTests(TestCase):
+    def setUp(self):
+        self.mentor = make_mentor()
+        self.mentee = make_mentee(self.mentor)
+        self.now = timezone.now().replace(microsecond=0)
+
+    def reminders(self):
+        return Notification.objects.filter(notification_type=Notification.MEETING, title__startswith='Upcoming')
+
+    def test_meeting_is_reminded_once(self):
+        meeting = Meeting.objects.create(
+            mentor=self.mentor, mentee=self.mentee, scheduled_at=self.now + timedelta(hours=1), duration=30
+        )
+        scheduler = ReminderScheduler()
+        self.assertEqual(scheduler.tick(self.now), 0)
+        self.assertEqual(scheduler.tick(self.now + timedelta(minutes=31)), 1)
+        self.assertEqual(scheduler.tick(self.now + timedelta(minutes=32)), 0)
+        self.assertEqual(ReminderScheduler().tick(self.now + timedelta(minutes=33)), 0)
+        self.assertEqual(sorted(self.reminders().values_list('user_id', flat=True)),
+                         sorted([self.mentor.pk, self.mentee.pk]))
+        meeting.refresh_from_db()
+        self.assertIsNotNone(meeting.reminded_at)
+
+    def test_rescheduled_meeting_is_reminded_at_its_new_time(self):
+        meeting = Meeting.objects.create(
+            mentor=self.mentor, mentee=self.mentee, scheduled_at=self.now + timedelta(hours=1), duration=30
+        )
+        scheduler = ReminderScheduler()
+        scheduler.tick(self.now)
+        meeting.scheduled_at = self.now + timedelta(hours=2)
+        meeting.save()
+        self.assertEqual(scheduler.tick(self.now + timedelta(minutes=31)), 0)
+        self.assertEqual(scheduler.tick(self.now + timedelta(minutes=91)), 1)
+
+    def test_occurrence_is_not_reminded_again_after_a_restart(self):
+        MeetingSeries.objects.create(
+            mentor=self.mentor, mentee=self.mentee, frequency='weekly',
+            start_at=self.now + timedelta(hours=1), duration=30
+        )
+        due = self.now + timedelta(minutes=31)
+        self.assertEqual(ReminderScheduler().tick(due), 1)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(ReminderScheduler().tick(due), 0)
+        self.assertEqual(self.reminders().count(), 2)
+        lookup = next(query['sql'] for query in queries if 'source_key' in query['sql'] and 'SELECT' in query['sql'])
+        self.assertIn('"user_id" IN', lookup)
+        self.assertIn('"notification_type" =', lookup)
@@ -0,0 +1,128 @@
+from django.db import IntegrityError, transaction
+from django.db.models import F, OuterRef
+from .models import User, UnreadCounter, Message, Notification
+from .stats import count_subquery
+
+COUNTER_FIELDS = ('messages', 'notifications')
+
+
+def annotate_unread_counts(queryset):
+    """Annotate the exact unread message and notification counts on users"""
+    return queryset.annotate(
+        unread_messages=count_subquery(
+            Message.objects.filter(receiver=OuterRef('pk'), is_read=False), 'receiver'
+        ),
+        unread_notifications=count_subquery(
+            Notification.objects.filter(user=OuterRef('pk'), is_read=False), 'user'
+        ),
+    )
+
+
+def _compute(user_id):
+    row = annotate_unread_counts(User.objects.filter(pk=user_id)).values(
+        'unread_messages', 'unread_notifications'
+    ).first()
+    if row is None:
+        return None
+    return {'messages': row['unread_messages'], 'notifications': row['unread_notifications']}
+
+
+def _create_counter(user_id):
+    """Create the counter of a user from the source tables"""
+    values = _compute(user_id)
+    if values is None:
+        return None
+    try:
+        with transaction.atomic():
+            return UnreadCounter.objects.create(user_id=user_id, **values)
+    except IntegrityError:
+        # Created concurrently; that row already reflects the source tables
+        return UnreadCounter.objects.get(user_id=user_id)
+
+
+def adjust_unread(user_id, create_missing=True, **deltas):
+    """Atomically add deltas (messages=, notifications=) to a user's counters
+
+    Must run after the triggering row was written: a missing counter is
+    created from the source tables, which already include that row. Pass
+    create_missing=False from delete handlers, which may run while the
+    user itself is being deleted.
+    """
+    changes = {field: F(field) + delta for field, delta in deltas.items() if delta}
+    if not user_id or not changes:
+        return
+    updated = UnreadCounter.objects.filter(user_id=user_id).update(**changes)
+    if not updated and create_missing:
+        _create_counter(user_id)
+
+
+def adjust_unread_many(user_ids, **deltas):
+    """adjust_unread for many users at once: one UPDATE for the users that
+    have a counter, and counters built from the source tables for the rest"""
+    changes = {field: F(field) + delta for field, delta in deltas.items() if delta}
+    user_ids = set(user_ids)
+    user_ids.discard(None)
+    if not user_ids or not changes:
+        return
+    existing = set(
+        UnreadCounter.objects.filter(user_id__in=user_ids).values_list('user_id', flat=True)
+    )
+    if existing:
+        UnreadCounter.objects.filter(user_id__in=existing).update(**changes)
+    for user_id in user_ids - existing:
+        _create_counter(user_id)
+
+
+def get_unread_counts(user):
+    """Badge counts of user, read from its counter row"""
+    counter = UnreadCounter.objects.filter(user=user).values(*COUNTER_FIELDS).first()
+    if counter is None:
+        created = _create_counter(user.pk)
+        counter = {field: getattr(created, field) for field in COUNTER_FIELDS}
+    return counter
+
+
+def reconcile_unread_counters(queryset=None, batch_size=1000):
+    """Recompute UnreadCounter rows for every user in queryset
+
+    Users are processed in primary key order, batch_size at a time. Returns
+    (users checked, counters that had drifted or were missing).
+    """
+    if queryset is None:
+        queryset = User.objects.all()
+    queryset = queryset.order_by('pk')
+
+    checked = fixed = 0
+    last_pk = 0
+    while True:
+        rows = list(
+            annotate_unread_counts(queryset.filter(pk__gt=last_pk))
+            .values('pk', 'unread_messages', 'unread_notifications')[:batch_size]
+        )
+        if not rows:
+            break
+        last_pk = rows[-1]['pk']
+
+        with transaction.atomic():
+            existing = UnreadCounter.objects.select_for_update().in_bulk(
+                [row['pk'] for row in rows], field_name='user_id'
+            )
+            to_update, to_create = [], []
+            for row in rows:
+                values = {
+                    'messages': row['unread_messages'],
+                    'notifications': row['unread_notifications'],
+                }
+                counter = existing.get(row['pk'])
+                if counter is None:
+                    to_create.append(UnreadCounter(user_id=row['pk'], **values))
+                elif any(getattr(counter, field) != value for field, value in values.items()):
+                    for field, value in values.items():
+                        setattr(counter, field, value)
+                    to_update.append(counter)
+            UnreadCounter.objects.bulk_update(to_update, COUNTER_FIELDS)
+            UnreadCounter.objects.bulk_create(to_create)
+
+        checked += len(rows)
+        fixed += len(to_update) + len(to_create)
+    return checked, fixed
@@ -22,9 +22,14 @@ from drf_yasg.views import get_schema_view
 from drf_yasg import openapi
 from rest_framework_simplejwt.views import TokenRefreshView
 from .views import (
-    RegisterView, LoginView, logout, UserViewSet, 
-    get_user_profile, get_mentor_dashboard, test_auth
+    RegisterView, LoginView, logout, UserViewSet, MessageViewSet, BroadcastViewSet,
+    UploadViewSet, AttachmentViewSet, MeetingViewSet, MeetingSeriesViewSet,
+    review_meeting_request_batch, get_user_profile, availability, get_free_busy, calendar_subscription, calendar_feed,
+    get_badge_counts, mark_notifications_as_read, mark_communications_as_read,
+    get_notification_digest, search, get_mentor_dashboard, get_mentor_dashboard_cache_stats,
+    get_mentee_dashboard, get_admin_dashboard, test_auth
 )
+from .sse import notification_stream
 from rest_framework.routers import DefaultRouter
 
 # Add a simple root view
@@ -55,6 +60,13 @@ schema_view = get_schema_view(
 
 router = DefaultRouter()
 router.register(r'users', UserViewSet, basename='user')
+router.register(r'messages', MessageViewSet, basename='message')
+router.register(r'communications/broadcasts', BroadcastViewSet, basename='broadcast')
+router.register(r'meetings', MeetingViewSet, basename='meeting')
+router.register(r'meeting-series', MeetingSeriesViewSet, basename='meeting-series')
+# Registered before attachments so 'uploads' isn't taken for an attachment id
+router.register(r'attachments/uploads', UploadViewSet, basename='upload')
+router.register(r'attachments', AttachmentViewSet, basename='attachment')
 
 urlpatterns = [
     # Root path
@@ -76,8 +88,40 @@ urlpatterns = [
     # User Profile URLs
     path('api/profile/', get_user_profile, name='user-profile'),
     
+    # Accepting/rejecting meeting requests in bulk
+    path('api/meeting-requests/review/', review_meeting_request_batch, name='meeting-request-review'),
+    
+    # Weekly availability and free/busy lookup
+    path('api/availability/', availability, name='availability'),
+    path('api/availability/free-busy/', get_free_busy, name='free-busy'),
+    
+    # Calendar feed (iCalendar) and its subscription URL
+    path('api/calendar/', calendar_subscription, name='calendar-subscription'),
+    path('api/calendar/<str:calendar_id>.ics', calendar_feed, name='calendar-feed'),
+    
+    # Unread badge counts
+    path('api/badges/', get_badge_counts, name='badge-counts'),
+    
+    # Notification stream (Server-Sent Events)
+    path('api/notifications/stream/', notification_stream, name='notification-stream'),
+    
+    # Daily notification digest
+    path('api/notifications/digest/', get_notification_digest, name='notification-digest'),
+    
+    # Bulk mark-as-read
+    path('api/notifications/mark-read/', mark_notifications_as_read, name='notifications-mark-read'),
+    path('api/communications/mark-read/', mark_communications_as_read,
+         name='communications-mark-read'),
+    
+    # Full-text search
+    path('api/search/', search, name='search'),
+    
     # Dashboard URLs
     path('api/mentor/dashboard/', get_mentor_dashboard, name='mentor-dashboard'),
+    path('api/mentor/dashboard/cache-stats/', get_mentor_dashboard_cache_stats,
+         name='mentor-dashboard-cache-stats'),
+    path('api/mentee/dashboard/', get_mentee_dashboard, name='mentee-dashboard'),
+    path('api/admin/dashboard/', get_admin_dashboard, name='admin-dashboard'),
     
     # Test authentication URL
     path('api/test-auth/', test_auth, name='test-auth'),
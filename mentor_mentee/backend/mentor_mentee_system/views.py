@@ -1,13 +1,61 @@
-from rest_framework import status, viewsets, generics
-from rest_framework.decorators import api_view, permission_classes
+import secrets
+from datetime import date, timedelta
+from rest_framework import status, viewsets, generics, mixins
+from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework_simplejwt.tokens import RefreshToken
+from django.conf import settings
 from django.contrib.auth import authenticate
-from .models import User, Mentor, Mentee, Admin, Meeting, Message, Achievement
+from django.db import transaction
+from django.http import Http404, HttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from django.utils import timezone
+from django.views.decorators.http import require_safe
+from .models import (
+    User, Mentor, Mentee, Admin, Message, BroadcastJob, Conversation, NotificationDigest,
+    Attachment, Upload, Meeting, MeetingSeries
+)
 from .serializers import (
     UserSerializer, LoginSerializer, RegisterSerializer,
-    MentorProfileSerializer, MenteeProfileSerializer, AdminProfileSerializer
+    MentorProfileSerializer, MenteeProfileSerializer, AdminProfileSerializer,
+    MessageSerializer, BroadcastJobSerializer, ConversationSerializer,
+    ReadUpToSerializer, NotificationReadSerializer,
+    MessageSearchResultSerializer, CommunicationSearchResultSerializer, NotificationDigestSerializer,
+    AttachmentSerializer, UploadSerializer, MeetingSerializer, SlotCheckSerializer,
+    AutoScheduleSerializer, MeetingRequestReviewSerializer, AvailabilitySerializer, MeetingSeriesSerializer, OccurrenceSerializer
+)
+from .pagination import KeysetPagination, ConversationPagination, MeetingPagination
+from .filters import MeetingFilter
+from .unread import get_unread_counts
+from .broadcasts import enqueue_broadcast
+from .receipts import (
+    mark_messages_read, mark_notifications_read, mark_communications_read, read_receipts
+)
+from .attachments import (
+    write_chunk, complete_from_known_blob, can_access, download_response, UploadOffsetMismatch
+)
+from .scheduling import Slot, blocking_meetings, ensure_no_conflict, find_slot_conflicts
+from .bulk_scheduling import schedule_round
+from .meeting_requests import review_meeting_requests
+from .recurrence import (
+    expand, series_for, materialize, cancel_occurrence, ensure_series_free,
+    ensure_no_occurrence_conflict, DEFAULT_EXPANSION_DAYS, MAX_EXPANSION_DAYS
+)
+from .availability import (
+    to_bitmap, to_bytes, weekly_slots, week_start_of, free_busy, MAX_FREE_BUSY_USERS
+)
+from .calendar_feed import get_cached_feed
+from .search import (
+    search_messages, search_communications, SEARCH_RESULT_LIMIT, MAX_SEARCH_RESULT_LIMIT
+)
+from .dashboard import (
+    get_cached_mentor_dashboard, get_dashboard_cache_stats, get_cached_admin_dashboard,
+    get_mentee_with_relations, build_mentee_dashboard
 )
 
 class RegisterView(generics.CreateAPIView):
@@ -98,6 +146,449 @@ class UserViewSet(viewsets.ModelViewSet):
         else:
             return User.objects.filter(id=user.id)
 
+class MessageViewSet(mixins.CreateModelMixin, viewsets.GenericViewSet):
+    """Send messages and page through inbox, outbox and conversations"""
+    permission_classes = [IsAuthenticated]
+    serializer_class = MessageSerializer
+    pagination_class = KeysetPagination
+    
+    def get_queryset(self):
+        return Message.objects.filter(receiver=self.request.user)
+    
+    def perform_create(self, serializer):
+        serializer.save(sender=self.request.user)
+    
+    def _paginated(self, page):
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+    
+    @action(detail=False, methods=['get'])
+    def inbox(self, request):
+        """Messages received by the current user, newest first"""
+        return self._paginated(self.paginate_queryset(
+            Message.objects.filter(receiver=request.user)
+        ))
+    
+    @action(detail=False, methods=['get'])
+    def outbox(self, request):
+        """Messages sent by the current user, newest first"""
+        return self._paginated(self.paginate_queryset(
+            Message.objects.filter(sender=request.user)
+        ))
+    
+    @action(detail=False, methods=['get'], url_path=r'user/(?P<user_id>\d+)')
+    def conversation(self, request, user_id=None):
+        """Conversation history between the current user and another user"""
+        other = get_object_or_404(User, pk=user_id)
+        page = self.paginator.paginate_union([
+            Message.objects.filter(sender=request.user, receiver=other),
+            Message.objects.filter(sender=other, receiver=request.user),
+        ], request)
+        return self._paginated(page)
+    
+    @action(detail=False, methods=['get'])
+    def conversations(self, request):
+        """Conversations of the current user, most recently active first"""
+        paginator = ConversationPagination()
+        conversations = Conversation.objects.select_related('user_low', 'user_high', 'last_message')
+        page = paginator.paginate_union([
+            conversations.filter(user_low=request.user),
+            conversations.filter(user_high=request.user),
+        ], request)
+        serializer = ConversationSerializer(page, many=True, context=self.get_serializer_context())
+        return paginator.get_paginated_response(serializer.data)
+    
+    @action(detail=False, methods=['post'], url_path='mark-read')
+    def mark_read(self, request):
+        """Mark every message from a user up to message up_to as read"""
+        serializer = ReadUpToSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        updated = mark_messages_read(
+            request.user.id, serializer.validated_data['user'], serializer.validated_data['up_to']
+        )
+        return Response({'updated': updated})
+    
+    @action(detail=False, methods=['post'])
+    def receipts(self, request):
+        """Report messages as seen; applied in batches shortly afterwards"""
+        serializer = ReadUpToSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        read_receipts.add(
+            'message', request.user.id,
+            serializer.validated_data['user'], serializer.validated_data['up_to']
+        )
+        return Response(status=status.HTTP_202_ACCEPTED)
+
+class BroadcastViewSet(mixins.CreateModelMixin, mixins.RetrieveModelMixin,
+                       mixins.ListModelMixin, viewsets.GenericViewSet):
+    """Queue broadcasts and follow their fan-out progress"""
+    permission_classes = [IsAuthenticated]
+    serializer_class = BroadcastJobSerializer
+    
+    def get_queryset(self):
+        user = self.request.user
+        if user.role == 'admin':
+            return BroadcastJob.objects.order_by('-created_at')
+        return BroadcastJob.objects.filter(sender=user).order_by('-created_at')
+    
+    def create(self, request, *args, **kwargs):
+        if request.user.role not in ('mentor', 'admin'):
+            return Response(
+                {'detail': 'Only mentors and admins can broadcast'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        attachment = serializer.validated_data.get('attachment')
+        if attachment is not None and attachment.owner_id != request.user.id:
+            return Response(
+                {'detail': 'You can only broadcast your own attachments'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        audience = serializer.validated_data.get('audience', BroadcastJob.Audience.MY_MENTEES)
+        if audience == BroadcastJob.Audience.MY_MENTEES and request.user.role != 'mentor':
+            return Response(
+                {'detail': 'Only mentors can broadcast to their mentees'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        # The worker (manage.py run_broadcast_worker) writes the rows
+        job = enqueue_broadcast(sender=request.user, **serializer.validated_data)
+        return Response(self.get_serializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+class UploadViewSet(mixins.CreateModelMixin, mixins.RetrieveModelMixin, viewsets.GenericViewSet):
+    """Resumable attachment uploads
+
+    POST declares filename, content_type, size and optionally sha256. Each
+    PATCH sends the next chunk as the raw request body with an Upload-Offset
+    header; GET (or HEAD) reports the offset to resume from after an
+    interruption.
+    """
+    permission_classes = [IsAuthenticated]
+    serializer_class = UploadSerializer
+    
+    def get_queryset(self):
+        return Upload.objects.filter(owner=self.request.user)
+    
+    def perform_create(self, serializer):
+        upload = serializer.save(owner=self.request.user)
+        # Contents already stored: the upload comes back complete, nothing to send
+        complete_from_known_blob(upload)
+    
+    def _with_offset(self, upload, status_code=status.HTTP_200_OK):
+        response = Response(self.get_serializer(upload).data, status=status_code)
+        response['Upload-Offset'] = upload.offset
+        return response
+    
+    def retrieve(self, request, *args, **kwargs):
+        return self._with_offset(self.get_object())
+    
+    def partial_update(self, request, pk=None):
+        try:
+            offset = int(request.headers['Upload-Offset'])
+            length = int(request.headers['Content-Length'])
+        except (KeyError, ValueError):
+            return Response(
+                {'detail': 'Upload-Offset and Content-Length headers are required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        try:
+            # Read the body straight from the request instead of request.data
+            upload = write_chunk(pk, request.user, offset, request._request, length)
+        except Upload.DoesNotExist:
+            return Response({'detail': 'Not found.'}, status=status.HTTP_404_NOT_FOUND)
+        except UploadOffsetMismatch as e:
+            response = Response({'detail': str(e)}, status=status.HTTP_409_CONFLICT)
+            response['Upload-Offset'] = e.offset
+            return response
+        except ValueError as e:
+            return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return self._with_offset(upload)
+
+class AttachmentViewSet(mixins.RetrieveModelMixin, mixins.DestroyModelMixin, viewsets.GenericViewSet):
+    """Attachment metadata and downloads, for users allowed to see them
+
+    DELETE removes an attachment for its uploader (or an admin); its blob is
+    freed by collect_attachment_garbage once nothing refers to it.
+    """
+    permission_classes = [IsAuthenticated]
+    serializer_class = AttachmentSerializer
+    queryset = Attachment.objects.select_related('blob')
+    
+    def get_object(self):
+        attachment = super().get_object()
+        if not can_access(self.request.user, attachment):
+            raise Http404
+        return attachment
+    
+    def destroy(self, request, *args, **kwargs):
+        attachment = self.get_object()
+        if request.user.role != 'admin' and attachment.owner_id != request.user.pk:
+            return Response(
+                {'detail': 'Only the uploader can delete an attachment'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        attachment.delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+    
+    @action(detail=True, methods=['get'])
+    def download(self, request, pk=None):
+        """Stream the file; a single-range Range header gets a 206 response"""
+        return download_response(self.get_object(), request.headers.get('Range'))
+
+def _ensure_assigned(mentor, mentee):
+    """Meetings are only booked between a mentor and a mentee assigned to them"""
+    if not Mentee.objects.filter(user=mentee, mentor__user=mentor).exists():
+        raise ValidationError({'detail': 'The mentee is not assigned to this mentor'})
+
+def _save_meeting_without_conflict(serializer, **fields):
+    """Save a MeetingSerializer, refusing a pending or accepted meeting that
+    overlaps another meeting or series occurrence of either participant"""
+    data = {**serializer.validated_data, **fields}
+    instance = serializer.instance
+    
+    def current(field):
+        return data[field] if field in data else getattr(instance, field, None)
+    
+    mentor, mentee = current('mentor'), current('mentee')
+    if mentor is None or mentee is None:
+        raise ValidationError({'detail': 'A meeting needs both a mentor and a mentee'})
+    if instance is None:
+        _ensure_assigned(mentor, mentee)
+    
+    with transaction.atomic():
+        status_value = current('status') or Meeting.Status.PENDING
+        if status_value in (Meeting.Status.PENDING, Meeting.Status.ACCEPTED):
+            ensure_no_conflict(
+                blocking_meetings(), mentor.pk, mentee.pk,
+                current('scheduled_at'), current('duration'),
+                exclude_pk=instance.pk if instance else None
+            )
+            ensure_no_occurrence_conflict(
+                mentor.pk, mentee.pk, current('scheduled_at'), current('duration')
+            )
+        return serializer.save(**fields)
+
+def _series_owner_fields(user):
+    if user.role == 'mentor':
+        return {'mentor': user}
+    if user.role == 'mentee':
+        return {'mentee': user}
+    return {}
+
+class MeetingViewSet(viewsets.ModelViewSet):
+    """Meetings of the current user; bookings may not overlap for either participant"""
+    permission_classes = [IsAuthenticated]
+    serializer_class = MeetingSerializer
+    pagination_class = MeetingPagination
+    
+    def get_queryset(self):
+        user = self.request.user
+        if user.role == 'admin':
+            return Meeting.objects.all()
+        elif user.role == 'mentor':
+            return Meeting.objects.filter(mentor=user)
+        return Meeting.objects.filter(mentee=user)
+    
+    def list(self, request):
+        """Meetings plus the unchanged occurrences of recurring meetings,
+        soonest first, a page at a time
+
+        Both are limited to ?start= to ?end=; a missing bound is taken
+        DEFAULT_EXPANSION_DAYS from the other, or from now when neither is
+        given.
+        """
+        filterset = MeetingFilter(request.query_params, queryset=self.get_queryset(), request=request)
+        if not filterset.is_valid():
+            raise ValidationError(filterset.errors)
+        params = filterset.form.cleaned_data
+        start, end = params.get('start'), params.get('end')
+        if start is None:
+            start = end - timedelta(days=DEFAULT_EXPANSION_DAYS) if end else timezone.now()
+        end = end or start + timedelta(days=DEFAULT_EXPANSION_DAYS)
+        if not timedelta(0) < end - start <= timedelta(days=MAX_EXPANSION_DAYS):
+            raise ValidationError({
+                'detail': f'end must be after start and at most {MAX_EXPANSION_DAYS} days later'
+            })
+        
+        # Computed occurrences take mentor, mentee and status from their series
+        series = series_for(request.user)
+        for field in ('mentor', 'mentee'):
+            if params.get(field):
+                series = series.filter(**{field: params[field]})
+        if params.get('status'):
+            series = series.filter(status__in=params['status'])
+        
+        def occurrences(since):
+            found = expand(series, max(start, since) if since else start, end)
+            if params.get('scheduled_at'):
+                found = [meeting for meeting in found if meeting.scheduled_at == params['scheduled_at']]
+            return found
+        
+        meetings = filterset.qs.filter(scheduled_at__gte=start, scheduled_at__lt=end)
+        page = self.paginator.paginate_with_occurrences(meetings, occurrences, request)
+        return self.paginator.get_paginated_response(MeetingSerializer(page, many=True).data)
+    
+    def perform_create(self, serializer):
+        _save_meeting_without_conflict(serializer, **_series_owner_fields(self.request.user))
+    
+    def perform_update(self, serializer):
+        _save_meeting_without_conflict(serializer)
+    
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            if instance.series_id and instance.occurrence_start:
+                # Keep the occurrence from coming back from the series rule
+                cancel_occurrence(instance.series_id, instance.occurrence_start)
+            instance.delete()
+    
+    @action(detail=False, methods=['post'], url_path='check-slots')
+    def check_slots(self, request):
+        """Report which of the proposed slots are free for the mentor and mentee"""
+        serializer = SlotCheckSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        mentor_id = serializer.validated_data.get('mentor', request.user.id)
+        if request.user.role != 'admin':
+            # Busy times of others are only shown for the caller's own mentees
+            mentee_ids = {slot['mentee'] for slot in serializer.validated_data['slots'] if slot.get('mentee')}
+            own_mentees = set(
+                Mentee.objects.filter(mentor__user=request.user, user_id__in=mentee_ids)
+                .values_list('user_id', flat=True)
+            )
+            if mentor_id != request.user.id or mentee_ids - own_mentees:
+                return Response(
+                    {'detail': 'Slots can only be checked for yourself and your mentees'},
+                    status=status.HTTP_403_FORBIDDEN
+                )
+        slots = [
+            Slot(slot['scheduled_at'], slot['duration'], mentor_id, slot.get('mentee'))
+            for slot in serializer.validated_data['slots']
+        ]
+        conflicts = find_slot_conflicts(blocking_meetings(), slots)
+        return Response([{
+            'scheduled_at': slot.start,
+            'duration': slot.duration,
+            'mentee': slot.mentee_id,
+            'available': not slot_conflicts,
+            'conflicts': slot_conflicts
+        } for slot, slot_conflicts in zip(slots, conflicts)])
+    
+    @action(detail=False, methods=['post'], url_path='auto-schedule')
+    def auto_schedule(self, request):
+        """Book a one-on-one with every mentee of a mentor in free slots of a date range"""
+        if request.user.role not in ('mentor', 'admin'):
+            return Response(
+                {'detail': 'Only mentors and admins can schedule rounds'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        serializer = AutoScheduleSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        
+        mentor_user = request.user
+        if request.user.role == 'admin':
+            if 'mentor' not in data:
+                return Response(
+                    {'detail': 'mentor is required'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            mentor_user = get_object_or_404(User, pk=data['mentor'], role='mentor')
+        
+        meetings, unscheduled = schedule_round(
+            mentor_user, data['start_date'], data['end_date'], data['duration'],
+            data['day_start'], data['day_end'], weekdays=data['weekdays'],
+            title=data['title'], skip_scheduled=data['skip_scheduled']
+        )
+        return Response({
+            'created': MeetingSerializer(meetings, many=True).data,
+            'unscheduled_mentees': unscheduled
+        }, status=status.HTTP_201_CREATED)
+
+class MeetingSeriesViewSet(viewsets.ModelViewSet):
+    """Recurring meetings; occurrences are listed through MeetingViewSet"""
+    permission_classes = [IsAuthenticated]
+    serializer_class = MeetingSeriesSerializer
+    
+    def get_queryset(self):
+        return series_for(self.request.user)
+    
+    def _save_without_conflict(self, serializer, **fields):
+        data = {**serializer.validated_data, **fields}
+        instance = serializer.instance
+        mentor = data.get('mentor', getattr(instance, 'mentor', None))
+        mentee = data.get('mentee', getattr(instance, 'mentee', None))
+        if mentor is None or mentee is None:
+            raise ValidationError({'detail': 'A series needs both a mentor and a mentee'})
+        if instance is None:
+            _ensure_assigned(mentor, mentee)
+        
+        with transaction.atomic():
+            ensure_series_free(serializer.save(**fields))
+    
+    def perform_create(self, serializer):
+        self._save_without_conflict(serializer, **_series_owner_fields(self.request.user))
+    
+    def perform_update(self, serializer):
+        self._save_without_conflict(serializer)
+    
+    @action(detail=True, methods=['patch', 'delete'])
+    def occurrence(self, request, pk=None):
+        """Change (PATCH, with meeting fields) or cancel (DELETE) the
+        occurrence starting at occurrence_start; changing one stores it as a meeting"""
+        series = self.get_object()
+        serializer = OccurrenceSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        occurrence_start = serializer.validated_data['occurrence_start']
+        
+        if request.method == 'DELETE':
+            meeting = Meeting.objects.filter(series=series, occurrence_start=occurrence_start).first()
+            with transaction.atomic():
+                cancel_occurrence(series.pk, occurrence_start)
+                if meeting is not None:
+                    meeting.delete()
+            return Response(status=status.HTTP_204_NO_CONTENT)
+        
+        with transaction.atomic():
+            try:
+                meeting = materialize(series, occurrence_start)
+            except ValueError as e:
+                return Response({'detail': str(e)}, status=status.HTTP_404_NOT_FOUND)
+            changes = {
+                key: value for key, value in request.data.items()
+                if key not in ('occurrence_start', 'mentor', 'mentee')
+            }
+            meeting_serializer = MeetingSerializer(meeting, data=changes, partial=True)
+            meeting_serializer.is_valid(raise_exception=True)
+            _save_meeting_without_conflict(meeting_serializer)
+        return Response(meeting_serializer.data)
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def review_meeting_request_batch(request):
+    """Accept and reject many pending meeting requests sent to the mentor at once
+
+    Accepted requests that overlap another meeting stay pending and are
+    listed under skipped with the conflicting meetings.
+    """
+    if request.user.role != 'mentor':
+        return Response(
+            {'detail': 'Only mentors can review meeting requests'},
+            status=status.HTTP_403_FORBIDDEN
+        )
+    serializer = MeetingRequestReviewSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    data = serializer.validated_data
+    
+    meetings, rejected, skipped = review_meeting_requests(
+        request.user, data['accept'], data['reject'], data['duration']
+    )
+    return Response({
+        'accepted': MeetingSerializer(meetings, many=True).data,
+        'rejected': rejected,
+        'skipped': skipped
+    })
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_user_profile(request):
@@ -114,6 +605,206 @@ def get_user_profile(request):
     
     return Response(serializer.data)
 
+@api_view(['GET', 'PUT'])
+@permission_classes([IsAuthenticated])
+def availability(request):
+    """Get or replace the current user's weekly availability"""
+    user = request.user
+    if user.role == 'mentor':
+        profile = get_object_or_404(Mentor, user=user)
+    elif user.role == 'mentee':
+        profile = get_object_or_404(Mentee, user=user)
+    else:
+        return Response(
+            {'detail': 'Only mentors and mentees have availability'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    if request.method == 'PUT':
+        serializer = AvailabilitySerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        profile.availability = to_bytes(serializer.validated_data['bitmap'])
+        update_fields = ['availability']
+        if user.role == 'mentor' and 'timetable' in serializer.validated_data:
+            profile.timetable = serializer.validated_data['timetable']
+            update_fields.append('timetable')
+        profile.save(update_fields=update_fields)
+    
+    bitmap = to_bitmap(profile.availability)
+    return Response({
+        'timetable': getattr(profile, 'timetable', None),
+        'known': bitmap is not None,
+        'slots': [
+            {'weekday': weekday, 'start': start.strftime('%H:%M'), 'end': end.strftime('%H:%M')}
+            for weekday, start, end in weekly_slots(bitmap or 0)
+        ]
+    })
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_free_busy(request):
+    """Free and busy times of ?users= (comma-separated ids) for the week of
+    ?week= (YYYY-MM-DD, this week by default), and the times all are free"""
+    try:
+        user_ids = list(dict.fromkeys(
+            int(user_id) for user_id in request.query_params.get('users', '').split(',') if user_id.strip()
+        ))
+        day = timezone.localdate()
+        if 'week' in request.query_params:
+            day = date.fromisoformat(request.query_params['week'])
+    except ValueError:
+        return Response(
+            {'detail': 'users must be comma-separated ids and week YYYY-MM-DD'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    if not user_ids or len(user_ids) > MAX_FREE_BUSY_USERS:
+        return Response(
+            {'detail': f'Give between 1 and {MAX_FREE_BUSY_USERS} users'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    # Anyone may look up mentors and themselves, mentors also their own
+    # mentees and admins everyone
+    users = User.objects.filter(pk__in=user_ids)
+    if request.user.role != 'admin':
+        visible = set(users.filter(role='mentor').values_list('pk', flat=True)) | {request.user.pk}
+        if request.user.role == 'mentor':
+            visible.update(Mentee.objects.filter(
+                mentor__user=request.user, user_id__in=user_ids
+            ).values_list('user_id', flat=True))
+        hidden = set(user_ids) - visible
+        if hidden:
+            return Response(
+                {'detail': f'Not allowed to see the times of users {sorted(hidden)}'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+    missing = set(user_ids) - set(users.values_list('pk', flat=True))
+    if missing:
+        return Response(
+            {'detail': f'Unknown users {sorted(missing)}'},
+            status=status.HTTP_404_NOT_FOUND
+        )
+    
+    week_start = week_start_of(day)
+    return Response({'week_start': week_start, **free_busy(user_ids, week_start)})
+
+@api_view(['GET', 'POST'])
+@permission_classes([IsAuthenticated])
+def calendar_subscription(request):
+    """Get the current user's calendar feed URL; POST issues a new one,
+    revoking the old"""
+    user = request.user
+    if request.method == 'POST':
+        user.calendar_id = secrets.token_urlsafe(24)
+        user.save(update_fields=['calendar_id'])
+    
+    url = None
+    if user.calendar_id:
+        url = request.build_absolute_uri(reverse('calendar-feed', args=[user.calendar_id]))
+    return Response({'calendar_id': user.calendar_id, 'url': url})
+
+@require_safe
+def calendar_feed(request, calendar_id):
+    """iCalendar feed of a user's meetings; the calendar id is the credential"""
+    user = User.objects.filter(calendar_id=calendar_id).only('pk').first()
+    if user is None:
+        raise Http404
+    
+    feed = get_cached_feed(user)
+    last_modified = int(feed['last_modified'].timestamp()) if feed['last_modified'] else None
+    response = get_conditional_response(request, etag=feed['etag'], last_modified=last_modified)
+    if response is None:
+        response = HttpResponse(feed['body'], content_type='text/calendar; charset=utf-8')
+    response['ETag'] = feed['etag']
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+    patch_cache_control(response, private=True, max_age=settings.CALENDAR_FEED_MAX_AGE)
+    return response
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_badge_counts(request):
+    """Get unread message and notification counts for the current user"""
+    return Response(get_unread_counts(request.user))
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def mark_notifications_as_read(request):
+    """Mark the given notifications (all when no ids are sent) as read"""
+    serializer = NotificationReadSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    updated = mark_notifications_read(request.user.id, serializer.validated_data.get('ids'))
+    return Response({'updated': updated})
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_notification_digest(request):
+    """Get the current user's notification digest for ?date= (latest by default)"""
+    digests = NotificationDigest.objects.filter(user=request.user)
+    if 'date' in request.query_params:
+        try:
+            digests = digests.filter(date=date.fromisoformat(request.query_params['date']))
+        except ValueError:
+            return Response(
+                {'detail': 'date must be YYYY-MM-DD'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+    
+    digest = digests.order_by('-date').first()
+    if digest is None:
+        return Response(
+            {'detail': 'No digest available'},
+            status=status.HTTP_404_NOT_FOUND
+        )
+    return Response(NotificationDigestSerializer(digest).data)
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def mark_communications_as_read(request):
+    """Mark every communication from a user up to up_to as read"""
+    serializer = ReadUpToSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    updated = mark_communications_read(
+        request.user.id, serializer.validated_data['user'], serializer.validated_data['up_to']
+    )
+    return Response({'updated': updated})
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def search(request):
+    """Full-text search over the current user's messages and communications"""
+    query = request.query_params.get('q', '').strip()
+    if not query:
+        return Response(
+            {'detail': 'q is required'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    scope = request.query_params.get('type')
+    if scope not in (None, 'messages', 'communications'):
+        return Response(
+            {'detail': 'type must be messages or communications'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    try:
+        limit = int(request.query_params.get('limit', SEARCH_RESULT_LIMIT))
+    except ValueError:
+        return Response(
+            {'detail': 'limit must be an integer'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    limit = min(max(limit, 1), MAX_SEARCH_RESULT_LIMIT)
+    
+    results = {'query': query}
+    if scope in (None, 'messages'):
+        results['messages'] = MessageSearchResultSerializer(
+            search_messages(request.user, query, limit), many=True
+        ).data
+    if scope in (None, 'communications'):
+        results['communications'] = CommunicationSearchResultSerializer(
+            search_communications(request.user, query, limit), many=True
+        ).data
+    return Response(results)
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_mentor_dashboard(request):
@@ -125,76 +816,65 @@ def get_mentor_dashboard(request):
         )
     
     try:
-        mentor = Mentor.objects.get(user=request.user)
-        mentees = Mentee.objects.filter(mentor=mentor).select_related('user')
-        
-        # Get upcoming meetings
-        upcoming_meetings = Meeting.objects.filter(
-            mentor=request.user,
-            status='pending'
-        ).order_by('scheduled_at')[:5]
-        
-        # Get unread messages count
-        unread_messages = Message.objects.filter(
-            receiver=request.user,
-            is_read=False
-        ).count()
-        
-        # Get recent achievements
-        recent_achievements = Achievement.objects.filter(
-            mentor=mentor
-        ).order_by('-date_awarded')[:5]
-        
-        # Prepare mentee data
-        mentee_data = []
-        for mentee in mentees:
-            mentee_info = {
-                'id': mentee.id,
-                'user': {
-                    'id': mentee.user.id,
-                    'name': f"{mentee.user.first_name} {mentee.user.last_name}",
-                    'email': mentee.user.email,
-                    'profile_picture': mentee.user.profile_picture
-                },
-                'course': mentee.course,
-                'year': mentee.year,
-                'attendance': mentee.attendance,
-                'academic': mentee.academic,
-                'upcoming_event': mentee.upcoming_event
-            }
-            mentee_data.append(mentee_info)
-        
-        response_data = {
-            'mentees': mentee_data,
-            'stats': {
-                'total_mentees': len(mentee_data),
-                'unread_messages': unread_messages,
-                'upcoming_meetings': len(upcoming_meetings),
-                'recent_achievements': len(recent_achievements)
-            },
-            'upcoming_meetings': [{
-                'id': meeting.id,
-                'title': meeting.title,
-                'scheduled_at': meeting.scheduled_at,
-                'mentee_name': f"{meeting.mentee.first_name} {meeting.mentee.last_name}",
-                'status': meeting.status
-            } for meeting in upcoming_meetings],
-            'recent_achievements': [{
-                'id': achievement.id,
-                'title': achievement.name,
-                'mentee_name': f"{achievement.mentee.user.first_name} {achievement.mentee.user.last_name}",
-                'date_awarded': achievement.created_at
-            } for achievement in recent_achievements]
-        }
-        
-        return Response(response_data)
-    
+        return Response(get_cached_mentor_dashboard(request.user))
     except Mentor.DoesNotExist:
         return Response(
             {'detail': 'Mentor profile not found'},
             status=status.HTTP_404_NOT_FOUND
         )
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_mentee_dashboard(request):
+    """Get all dashboard data for a mentee"""
+    if request.user.role != 'mentee':
+        return Response(
+            {'detail': 'Only mentees can access this endpoint'},
+            status=status.HTTP_403_FORBIDDEN
+        )
+    
+    try:
+        mentee = get_mentee_with_relations(request.user)
+        return Response(build_mentee_dashboard(mentee))
+    except Mentee.DoesNotExist:
+        return Response(
+            {'detail': 'Mentee profile not found'},
+            status=status.HTTP_404_NOT_FOUND
+        )
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_mentor_dashboard_cache_stats(request):
+    """Get hit/miss counters of the mentor dashboard cache"""
+    if request.user.role != 'admin':
+        return Response(
+            {'detail': 'Only admins can access this endpoint'},
+            status=status.HTTP_403_FORBIDDEN
+        )
+    
+    return Response(get_dashboard_cache_stats())
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_admin_dashboard(request):
+    """Get cohort-wide statistics for admins"""
+    if request.user.role != 'admin':
+        return Response(
+            {'detail': 'Only admins can access this endpoint'},
+            status=status.HTTP_403_FORBIDDEN
+        )
+    
+    try:
+        days = int(request.query_params.get('days', 30))
+    except ValueError:
+        return Response(
+            {'detail': 'days must be an integer'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    days = min(max(days, 1), 365)
+    
+    return Response(get_cached_admin_dashboard(days))
+
 @api_view(['POST'])
 @permission_classes([AllowAny])
 def test_auth(request):